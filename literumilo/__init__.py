@@ -1,4 +1,7 @@
 from .literumilo import analyze_file
 from .literumilo import analyze_string
+from .literumilo_check_word import Checker
 from .literumilo_check_word import check_word
+from .literumilo_check_word import check_words
+from .literumilo_check_word import is_valid_word
 from .literumilo_utils import x_to_accent
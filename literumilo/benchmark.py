@@ -0,0 +1,474 @@
+#! -*- coding: utf-8
+#
+# benchmark.py
+# Benchmarks for the literumilo package. From the folder above 'literumilo' run:
+#
+# python3 -m literumilo.benchmark
+#
+# The benchmark corpus is made from the dictionary. It contains roots with
+# grammatical endings, compound words with prefixes and suffixes, and
+# some misspelled words. The corpus is the same for every run.
+#
+# Cleve (Klivo) Lendon, 2026-10-19
+
+import os, io, re, sys, time, random, tracemalloc, asyncio, tempfile, lzma
+
+from literumilo import literumilo_check_word
+from literumilo.literumilo_check_word import check_word, check_words, is_valid_word
+from literumilo.literumilo_check_word import esperanto_dictionary
+from literumilo.literumilo_order import longest_first, by_rarity
+from literumilo.literumilo_negative_cache import NegativeCache
+from literumilo.literumilo_lexicon import build_lexicon
+from literumilo.literumilo_load import load_dictionary
+from literumilo.literumilo import analyze_string
+from literumilo.literumilo_async import analyze_string_async
+from literumilo.literumilo_threads import check_words_threaded, is_free_threaded
+from literumilo.literumilo_input import open_text
+from literumilo.literumilo_stream import analyze_stream
+from literumilo.literumilo_mmap import iter_file_mmap
+from literumilo.literumilo import analyze_file, find_bad_words
+from literumilo.literumilo_aggregate import TopCounter, count_bad_words
+from literumilo.literumilo_index import IndexAnalyzer, ROOTS, AFFIXES
+from literumilo.literumilo_columns import analyze_column
+from literumilo.literumilo_block_cache import BlockCache
+from literumilo.literumilo_language import LanguageGate
+from literumilo.literumilo_entry import PERSON_MEANINGS, Synthesis, is_person
+from literumilo.literumilo_complete import Completer
+
+CORPUS_SIZE = 20000
+SEED = 2020
+
+ENDINGS = ["o", "on", "oj", "ojn", "a", "aj", "an", "ajn", "e", "en", "is", "as", "os", "us", "i", "u"]
+PREFIXES = ["mal", "re", "ne", "dis", "ek", "mis", "for", "ge", "sen", "pra", "eks", "kun"]
+SUFFIXES = ["ul", "ej", "in", "et", "eg", "ist", "ig", "iĝ", "ad", "aĵ", "ec", "ebl", "em", "ar", "il", "it", "ant"]
+TYPO_LETTERS = "abcdefghijklmnoprstuvzĉĝŝqwxy"
+
+def make_corpus(size = CORPUS_SIZE, seed = SEED):
+    """Makes a list of words from the dictionary, for benchmarking.
+    Params:
+        size - number of words
+        seed - for the random number generator
+    Return:
+        list of words
+    """
+    rng = random.Random(seed)
+    keys = sorted(esperanto_dictionary)
+    words = []
+    for _ in range(size):
+        word = rng.choice(keys)
+        if rng.random() < 0.3: word = rng.choice(PREFIXES) + word
+        if rng.random() < 0.5: word += rng.choice(SUFFIXES)
+        if rng.random() < 0.3: word += rng.choice(SUFFIXES)
+        word += rng.choice(ENDINGS)
+        if rng.random() < 0.25:   # Make a typo.
+            n = rng.randrange(len(word))
+            word = word[:n] + rng.choice(TYPO_LETTERS) + word[n + 1:]
+        words.append(word)
+    return words
+
+def make_token_stream(words, size = 100000, seed = SEED):
+    """Makes a stream of tokens, in which some words are much more frequent
+    than others, as in real text. (The frequency of the word of rank n is
+    proportional to 1/n.)
+    Params:
+        words - distinct words
+        size - number of tokens
+    Return:
+        list of tokens
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / rank for rank in range(1, len(words) + 1)]
+    return rng.choices(words, weights, k = size)
+
+def timed(function, *args):
+    """Return: (result of function, elapsed seconds)"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def run_order(words, order):
+    """Analyzes the words with the given ordering policy.
+    Return: (list of (word, valid), seconds, statistics)
+    """
+    literumilo_check_word.set_search_order(order)
+    literumilo_check_word.reset_statistics()
+    results, seconds = timed(lambda: [check_word(w) for w in words])
+    literumilo_check_word.set_search_order(longest_first)
+    return [(r.word, r.valid) for r in results], seconds, literumilo_check_word.get_statistics()
+
+def benchmark_order(words):
+    """Compares ordering policies for candidate morphemes.
+    Reports the number of backtracks (rejected candidates), and the number
+    of words which were divided differently from longest_first().
+    """
+    print("--- Ordering of candidate morphemes")
+    baseline, seconds, stats = run_order(words, longest_first)
+    baseline_backtracks = stats["backtracks"]
+    print("longest: {:.3f} s, searches {}, backtracks {}".format(
+          seconds, stats["searches"], baseline_backtracks))
+    analyses, seconds, stats = run_order(words, by_rarity)
+    print(" rarity: {:.3f} s, searches {}, backtracks {}, saved {}".format(
+          seconds, stats["searches"], stats["backtracks"],
+          baseline_backtracks - stats["backtracks"]))
+    different_valid = sum(1 for a, b in zip(baseline, analyses) if a[1] != b[1])
+    different_split = sum(1 for a, b in zip(baseline, analyses) if a != b)
+    print("         differences from longest: validity {}, division {}".format(
+          different_valid, different_split))
+
+def benchmark_ngram_filter(words):
+    """Reports how many compound searches were avoided by the n-gram filter."""
+    print("--- N-gram filter")
+    literumilo_check_word.reset_statistics()
+    results, seconds = timed(lambda: [check_word(w) for w in words])
+    stats = literumilo_check_word.get_statistics()
+    print("{:.3f} s, searches {}, avoided by n-gram filter {}".format(
+          seconds, stats["searches"], stats["ngram_rejections"]))
+
+def benchmark_negative_cache(words):
+    """Analyzes the corpus twice, with a negative cache. The second time,
+    failed searches should be avoided.
+    """
+    print("--- Negative cache")
+    literumilo_check_word.set_negative_cache(NegativeCache())
+    for run in ("first", "second"):
+        literumilo_check_word.reset_statistics()
+        results, seconds = timed(lambda: [check_word(w) for w in words])
+        stats = literumilo_check_word.get_statistics()
+        print("{:>6}: {:.3f} s, searches {}, negative cache hits {}".format(
+              run, seconds, stats["searches"], stats["negative_cache_hits"]))
+    literumilo_check_word.set_negative_cache(None)
+
+def benchmark_lexicon(words):
+    """Compares analysis with and without the lexicon of full word forms."""
+    print("--- Lexicon of full word forms")
+    lexicon, seconds = timed(build_lexicon, esperanto_dictionary, check_word)
+    print("   build: {:.3f} s, {} forms".format(seconds, len(lexicon)))
+    results, seconds = timed(lambda: [check_word(w) for w in words])
+    print(" without: {:.3f} s".format(seconds))
+    literumilo_check_word.set_lexicon(lexicon)
+    literumilo_check_word.reset_statistics()
+    results, seconds = timed(lambda: [check_word(w) for w in words])
+    stats = literumilo_check_word.get_statistics()
+    print("    with: {:.3f} s, lexicon hits {}".format(seconds, stats["lexicon_hits"]))
+    literumilo_check_word.set_lexicon(None)
+
+def benchmark_compact_dictionary(words):
+    """Compares the memory and speed of a dict and a compact dictionary."""
+    print("--- Compact dictionary")
+    for compact in (False, True):
+        tracemalloc.start()
+        dictionary = load_dictionary(compact)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        literumilo_check_word.set_dictionary(dictionary)
+        results, seconds = timed(lambda: [check_word(w) for w in words])
+        name = "compact" if compact else "dict"
+        print("{:>8}: {:.1f} MB, {:.3f} s".format(name, memory / 1e6, seconds))
+    literumilo_check_word.set_dictionary(esperanto_dictionary)
+
+def benchmark_check_words(words):
+    """Compares check_words() with calling check_word() in a loop."""
+    print("--- Batch analysis")
+    tokens = make_token_stream(words)
+    results, loop_seconds = timed(lambda: [check_word(w) for w in tokens])
+    results, batch_seconds = timed(check_words, tokens)
+    print("{} tokens, loop {:.3f} s ({:.0f} tokens/s), check_words {:.3f} s ({:.0f} tokens/s)".format(
+          len(tokens), loop_seconds, len(tokens) / loop_seconds,
+          batch_seconds, len(tokens) / batch_seconds))
+
+def benchmark_valid_only(words):
+    """Compares is_valid_word() with check_word() (including the divided word)."""
+    print("--- Validity only")
+    results, seconds = timed(lambda: [check_word(w).word for w in words])
+    print("   check_word: {:.3f} s".format(seconds))
+    results, seconds = timed(lambda: [is_valid_word(w) for w in words])
+    print("is_valid_word: {:.3f} s".format(seconds))
+
+async def measure_loop_latency(coroutine):
+    """Runs a coroutine, while a ticker measures how late the event loop
+    wakes it up (every millisecond).
+    Return: (result of coroutine, list of delays in seconds)
+    """
+    delays = []
+    done = False
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append(time.perf_counter() - start - 0.001)
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    result = await coroutine
+    done = True
+    await task
+    return result, delays
+
+def percentile(values, p):
+    """Return: the p-th percentile of the values"""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def benchmark_async(words):
+    """Measures the p99 delay of the event loop, while a large text is analyzed
+    by analyze_string() (blocking) and by analyze_string_async()."""
+    print("--- Event loop latency")
+    text = " ".join(make_token_stream(words))
+    async def blocking():
+        return analyze_string(text, True)
+    for name, coroutine_function in (("blocking", blocking),
+                                     ("async", lambda: analyze_string_async(text, True))):
+        start = time.perf_counter()
+        result, delays = asyncio.run(measure_loop_latency(coroutine_function()))
+        seconds = time.perf_counter() - start
+        print("{:>8}: {:.3f} s, loop delay p99 {:.1f} ms, max {:.1f} ms".format(
+              name, seconds, percentile(delays, 99) * 1000, max(delays) * 1000))
+
+def benchmark_threads(words):
+    """Measures check_words_threaded() with 1, 2 and 4 threads."""
+    print("--- Threads (free-threaded: {})".format(is_free_threaded()))
+    # Distinct misspelled words, so that no work is skipped by a cache.
+    tokens = [word + suffix for suffix in ("", "x", "q", "w") for word in words]
+    saved_cache = literumilo_check_word.negative_cache
+    literumilo_check_word.set_negative_cache(None)
+    try:
+        base = None
+        for workers in (1, 2, 4):
+            results, seconds = timed(lambda: check_words_threaded(tokens, max_workers = workers))
+            if base is None: base = seconds
+            print("{:>8} threads: {:.3f} s, {:.0f} words/s, speed-up {:.2f}".format(
+                  workers, seconds, len(tokens) / seconds, base / seconds))
+    finally:
+        literumilo_check_word.set_negative_cache(saved_cache)
+
+def benchmark_compressed_input(words):
+    """Measures the analysis of a plain text file and an xz file, with and
+    without decompression in a background thread."""
+    print("--- Compressed input")
+    text = "\n".join(" ".join(words[i:i + 12]) for i in range(0, len(words), 12)) * 5
+    with tempfile.TemporaryDirectory() as folder:
+        plain = os.path.join(folder, "corpus.txt")
+        with open(plain, "w", encoding = "utf-8") as fout:
+            fout.write(text)
+        compressed = plain + ".xz"
+        with lzma.open(compressed, "wt", encoding = "utf-8") as fout:
+            fout.write(text)
+        def analyze(path, prefetch):
+            with open_text(path, prefetch = prefetch) as fin:
+                analyze_stream(fin, io.StringIO(), True)
+        def decompress(path):
+            with open_text(path, prefetch = False) as fin:
+                return len(fin.read())
+        result, seconds = timed(decompress, compressed)
+        print("{:>13}: {:.3f} s".format("xz, read only", seconds))
+        for name, path, prefetch in (("plain", plain, False),
+                                     ("xz", compressed, False),
+                                     ("xz, prefetch", compressed, True)):
+            result, seconds = timed(analyze, path, prefetch)
+            print("{:>13}: {:.3f} s".format(name, seconds))
+
+def benchmark_mmap(words):
+    """Measures the peak memory (Python allocations) of spell checking
+    a file with analyze_file() and with the memory-mapped path."""
+    print("--- Memory-mapped file")
+    text = "\n".join(" ".join(words[i:i + 12]) for i in range(0, len(words), 12)) * 2
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "corpus.txt")
+        with open(path, "w", encoding = "utf-8") as fout:
+            fout.write(text)
+        size = os.path.getsize(path)
+        def count_mmap():
+            return sum(1 for item in iter_file_mmap(path, False))
+        for name, function in (("analyze_file", lambda: analyze_file(path, False)),
+                               ("mmap", count_mmap)):
+            tracemalloc.start()
+            result, seconds = timed(function)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("{:>12}: {:.3f} s, peak {:.1f} MB (file {:.1f} MB)".format(
+                  name, seconds, peak / 1e6, size / 1e6))
+
+def benchmark_aggregate(words):
+    """Measures the peak memory of collecting misspelled words in a set,
+    and of counting the top words with a TopCounter."""
+    print("--- Misspelling aggregation")
+    rng = random.Random(SEED)
+    junk = ["".join(rng.choice(TYPO_LETTERS) for i in range(rng.randint(5, 12))) for n in range(30000)]
+    frequent = junk[:20] * 500
+    tokens = junk + frequent
+    rng.shuffle(tokens)
+    text = " ".join(tokens)
+    def top_counter():
+        counter = TopCounter(1000)
+        count_bad_words(text, counter)
+        return counter
+    for name, function in (("set", lambda: find_bad_words(text)), ("top 1000", top_counter)):
+        tracemalloc.start()
+        result, seconds = timed(function)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("{:>9}: {:.3f} s, peak {:.1f} MB, {} words kept".format(name, seconds, peak / 1e6, len(result)))
+
+def benchmark_index(words):
+    """Measures the index analyzer, on a text with a realistic distribution
+    of words. The first pass fills the cache of word terms."""
+    print("--- Index analyzer")
+    text = " ".join(make_token_stream(sorted(set(words)), 200000))
+    for output in (ROOTS, AFFIXES):
+        analyzer = IndexAnalyzer(output)
+        for name, reuse in (("first pass", True), ("reused token", True), ("new tokens", False)):
+            count, seconds = timed(lambda: sum(1 for token in analyzer.tokens(text, reuse = reuse)))
+            print("{:>9}, {:>12}: {} tokens, {:.3f} s, {:,.0f} tokens/s".format(output, name,
+                  count, seconds, count / seconds))
+
+def benchmark_columns(words):
+    """Compares analyze_column() (7 columns) with a list of (valid, divided word)
+    tuples made from AnalysisResults, for a column of tokens with a realistic
+    distribution of words. Memory is the memory kept by the output."""
+    print("--- Columnar output")
+    tokens = make_token_stream(sorted(set(words)), 500000)
+    def results():
+        return [(result.valid, result.word) for result in check_words(tokens)]
+    for name, function in (("results", results), ("columns", lambda: analyze_column(tokens))):
+        result, seconds = timed(function)
+        del result
+        tracemalloc.start()
+        result = function()
+        kept = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("{:>8}: {:.3f} s, {:.1f} MB".format(name, seconds, kept / 1e6))
+
+def benchmark_block_cache(words):
+    """Checks a document of 300 paragraphs, then a revision in which
+    3 paragraphs have changed, with and without a BlockCache."""
+    print("--- Paragraph cache")
+    rng = random.Random(SEED)
+    paragraphs = [" ".join(rng.choice(words) for n in range(60)) + "." for p in range(300)]
+    revised = list(paragraphs)
+    for n in rng.sample(range(len(revised)), 3):
+        revised[n] = revised[n].replace(" ", " ĉiutage ", 1)
+    document = "\n\n".join(paragraphs)
+    revision = "\n\n".join(revised)
+    for mode in (False, True):
+        cache = BlockCache()
+        first, seconds1 = timed(analyze_string, document, mode, None, cache)
+        second, seconds2 = timed(analyze_string, revision, mode, None, cache)
+        uncached, seconds3 = timed(analyze_string, revision, mode)
+        assert second == uncached or sorted(second.split()) == sorted(uncached.split())
+        print("mode {}: first {:.3f} s, revision {:.3f} s (without cache {:.3f} s)".format(
+              mode, seconds1, seconds2, seconds3))
+
+def benchmark_markup(words):
+    """Checks an HTML document in one pass, which skips the markup, and
+    with a pre-pass, which replaces the markup with spaces first."""
+    print("--- Markup")
+    rng = random.Random(SEED)
+    paragraphs = ["<p class=\"teksto\">{} <a href=\"https://ekz.org/{}\">{}</a> &amp; {}</p>".format(
+                  " ".join(rng.choice(words) for n in range(30)), rng.choice(words),
+                  rng.choice(words), " ".join(rng.choice(words) for n in range(30)))
+                  for p in range(1000)]
+    document = "\n<pre>kodo 123</pre>\n".join(paragraphs)
+    markup = re.compile(r"<pre>.*?</pre>|<[^>]*>|&\w+;|\w*\d\w*", re.DOTALL)
+    def pre_pass():
+        return find_bad_words(markup.sub(" ", document))
+    plain, seconds0 = timed(find_bad_words, document)    # Also fills the caches.
+    one_pass, seconds1 = timed(find_bad_words, document, None, "html")
+    stripped, seconds2 = timed(pre_pass)
+    assert one_pass == stripped and len(plain) > len(one_pass)
+    print("one pass {:.3f} s, pre-pass {:.3f} s, plain text (markup checked) {:.3f} s".format(
+          seconds1, seconds2, seconds0))
+
+FOREIGN_SENTENCES = [
+    "The government announced new laws to protect nature and the forests.",
+    "Click here to subscribe to our newsletter and get the latest news.",
+    "Yesterday we visited the museum, where we saw many old paintings.",
+    "El gobierno anunció nuevas leyes para proteger la naturaleza y los bosques.",
+    "Me gusta leer libros sobre historia, pero mi hermana prefiere la ciencia ficción.",
+    "Le chien court dans le parc avec son maître, et les enfants jouent près du lac.",
+    "J'aime lire des livres d'histoire, mais ma sœur préfère la science-fiction.",
+    "Der Hund läuft mit seinem Besitzer im Park, und die Kinder spielen am See.",
+    "Ich lese gern Bücher über Geschichte, aber meine Schwester mag Science-Fiction.",
+    "Ieri abbiamo visitato il museo, dove abbiamo visto molti dipinti antichi.",
+]
+
+def benchmark_language_gate(words):
+    """Checks a document in which half of the lines are foreign sentences,
+    with and without a LanguageGate."""
+    print("--- Language gate")
+    rng = random.Random(SEED)
+    lines = []
+    for n in range(2000):
+        if n % 2: lines.append(rng.choice(FOREIGN_SENTENCES))
+        else: lines.append(" ".join(rng.choice(words) for n in range(12)) + ".")
+    document = "\n".join(lines)
+    analyze_string(document, False)     # So that both runs start warm.
+    gate = LanguageGate()
+    model, seconds0 = timed(gate.get_model)
+    print("model: {:.3f} s, {} trigrams".format(seconds0, len(model.trigram_scores)))
+    gated, seconds1 = timed(analyze_string, document, False, None, None, None, gate)
+    everything, seconds2 = timed(analyze_string, document, False)
+    print("gate {:.3f} s ({} Esperanto, {} foreign, {} short lines), without gate {:.3f} s".format(
+          seconds1, gate.esperanto_blocks, gate.foreign_blocks, gate.short_blocks, seconds2))
+    print("misspelled words: {} with gate, {} without".format(len(gated.split()), len(everything.split())))
+
+def benchmark_dictionary_index(words):
+    """Finds all morphemes which represent people, and all morphemes with
+    limited synthesis, by scanning the dictionary, and with the index."""
+    print("--- Dictionary index")
+    dictionary = literumilo_check_word.default_checker.dictionary
+    def scan():
+        return (sorted(key for key, entry in dictionary.items() if is_person(entry.meaning)),
+                sorted(key for key, entry in dictionary.items() if entry.synthesis == Synthesis.Limited))
+    index, seconds0 = timed(literumilo_check_word.get_dictionary_index)
+    def query():
+        return (index.query(meaning = PERSON_MEANINGS), index.morphemes("synthesis", Synthesis.Limited))
+    scanned, seconds1 = timed(scan)
+    queried, seconds2 = timed(query)
+    assert [tuple(keys) for keys in scanned] == list(queried)
+    print("index made in {:.3f} s; scan {:.2f} ms, query {:.3f} ms".format(
+          seconds0, seconds1 * 1000, seconds2 * 1000))
+
+def benchmark_complete(words):
+    """Completes every prefix of 1 to 3 letters of the corpus, with a warm
+    index, and reports the latency percentiles."""
+    print("--- Completion")
+    completer = Completer()
+    index, seconds0 = timed(completer.get_index)
+    prefixes = sorted(set(word[:n].lower() for word in words for n in (1, 2, 3) if len(word) >= n))
+    for prefix in prefixes:      # warm the caches of the checker
+        completer.complete(prefix)
+    latencies = []
+    for prefix in prefixes:
+        results, seconds = timed(completer.complete, prefix)
+        latencies.append(seconds)
+    print("index of {} forms made in {:.3f} s; {} prefixes: p50 {:.0f} us, p99 {:.0f} us".format(
+          len(index), seconds0, len(prefixes),
+          percentile(latencies, 50) * 1e6, percentile(latencies, 99) * 1e6))
+
+def main():
+    words = make_corpus()
+    print("Corpus: {} words, {} distinct".format(len(words), len(set(words))))
+    benchmark_order(words)
+    benchmark_ngram_filter(words)
+    benchmark_negative_cache(words)
+    benchmark_lexicon(words)
+    benchmark_compact_dictionary(words)
+    benchmark_check_words(words)
+    benchmark_valid_only(words)
+    benchmark_async(words)
+    benchmark_threads(words)
+    benchmark_compressed_input(words)
+    benchmark_mmap(words)
+    benchmark_aggregate(words)
+    benchmark_index(words)
+    benchmark_columns(words)
+    benchmark_block_cache(words)
+    benchmark_markup(words)
+    benchmark_language_gate(words)
+    benchmark_dictionary_index(words)
+    benchmark_complete(words)
+
+# ----------------------------------------------------
+# Program starts here.
+
+if __name__ == '__main__':
+    main()
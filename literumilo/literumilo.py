@@ -6,14 +6,26 @@
 # Please refer to HOW_TO_USE below.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-11-11
+# Last edit date: 2026-10-19
 #
 
 from __future__ import print_function
 
-import os, sys
-from .literumilo_utils import is_word_char, x_to_accent
-from .literumilo_check_word import check_word
+import os, sys, argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from .literumilo_utils import WORD_PATTERN, x_to_accent
+from .literumilo_check_word import check_word, get_checker
+from .literumilo_stream import analyze_stream, analyze_path, analyze_path_with_gate
+from .literumilo_stream import expand_paths, STDIN_NAME
+from .literumilo_input import open_binary_stream, open_text, read_text, DEFAULT_ENCODING
+from .literumilo_aggregate import TopCounter, ExactCounter, count_stream, format_counts
+from .literumilo_checkpoint import analyze_corpus, merge_counts
+from .literumilo_block_cache import split_into_blocks, block_key
+from .literumilo_markup import find_words, substitute_words, MARKUP_FORMATS
+from .literumilo_language import LanguageGate, THRESHOLD
+
+TOP_CAPACITY = 10   # A TopCounter for the top K words counts 10 * K words.
 
 HOW_TO_USE = """\nLiterumilo   version: 1.0.8\n
     ----- (Esperanto sekvas.)\n
@@ -21,23 +33,46 @@ HOW_TO_USE = """\nLiterumilo   version: 1.0.8\n
     To list misspelled words from a file: python literumilo.py file.txt
     To divide words from a file into morphemes: python literumilo.py -m file.txt
     To check the spelling of a single word: python literumilo.py ĉiutage
-    Accents can be represented by 'x': python literumilo.py cxiutage\n
+    Accents can be represented by 'x': python literumilo.py cxiutage
+    To analyze several files and folders: python literumilo.py file1.txt folder
+    To analyze standard input, line by line: python literumilo.py -
+    Options: -m (morphemes), --json (JSON lines), -j N (N worker processes),
+             --encoding E (default UTF-8). Compressed files (.gz, .bz2, .xz) are accepted.
+    To count misspelled words: --counts (all words), --top K (the K most frequent)
+    To analyze a large file in shards, which can be resumed: --checkpoint FOLDER file.txt
+    To skip markup, code, URLs and numbers: --markup F (F = text, html, markdown, latex)
+    To skip lines which are not Esperanto: --language-gate (--gate-threshold T, default 0.8)\n
     -----\n
     Ĉi tiu programo estas literumilo kaj analizilo de morfemoj por Esperanto.\n
     Por listigi misliterumitajn vortojn de dosiero: python literumilo.py file.txt
     Por dividi vortojn de dosiero laŭ morfemoj: python literumilo.py -m file.txt
     Por kontroli la literumadon de unu vorto: python literumilo.py ĉiutage
-    Oni povas anstataŭigi supersignon per 'x': python literumilo.py cxiutage\n
+    Oni povas anstataŭigi supersignon per 'x': python literumilo.py cxiutage
+    Por analizi plurajn dosierojn kaj dosierujojn: python literumilo.py file1.txt dosierujo
+    Por analizi la norman enigon, linion post linio: python literumilo.py -
+    Opcioj: -m (morfemoj), --json (JSON-linioj), -j N (N laborprocezoj),
+            --encoding E (implicite UTF-8). Kunpremitaj dosieroj (.gz, .bz2, .xz) estas akceptataj.
+    Por kalkuli misliterumitajn vortojn: --counts (ĉiuj vortoj), --top K (la K plej oftaj)
+    Por analizi grandan dosieron en partoj, daŭrigeble: --checkpoint DOSIERUJO file.txt
+    Por preterlasi markadon, kodon, URL-ojn kaj nombrojn: --markup F (F = text, html, markdown, latex)
+    Por preterlasi liniojn, kiuj ne estas Esperantaj: --language-gate (--gate-threshold T, implicite 0.8)\n
     Klivo <indriko@yahoo.com> 2020
 """
 
-def analyze_file(filename, mode):
+def analyze_file(filename, mode, checker = None, encoding = DEFAULT_ENCODING, block_cache = None,
+                 markup = None, language_gate = None):
     """
     This function reads text from a file and calls analyze_string(),
     which does a morphological analysis or spell check on the text.
+    The file may be compressed (gzip, bzip2, xz, zstd). See literumilo_input.py.
     Params:
         file name
         mode - True = morphological analyzer, False = spell checker
+        checker - Checker (None = default checker)
+        encoding - text encoding of the file
+        block_cache - BlockCache, to reuse the results of paragraphs (optional)
+        markup - format of the text: 'text', 'html', 'markdown', 'latex' (optional)
+        language_gate - LanguageGate, to skip lines which are not Esperanto (optional)
     Return:
         analyzed text, or list of misspelled words  (str)
     """
@@ -47,21 +82,15 @@ def analyze_file(filename, mode):
         sys.exit(0)
 
     # Read the file into a string.
-    fin = open(filename, 'r')
-    if not fin:
-        print("Could not open {}.".format(file_or_word))
-        sys.exit(0)
-
-    # Read the file into a string.
-    s = fin.read()
-    fin.close()
+    s = read_text(filename, encoding)
 
-    return analyze_string(s, mode)
+    return analyze_string(s, mode, checker, block_cache, markup, language_gate)
 
 # ------------------------ analyze_file
 
 
-def analyze_string(text, mode):
+def analyze_string(text, mode, checker = None, block_cache = None, markup = None,
+                   language_gate = None):
     """
     Analyzes a string of Esperanto text. If the mode is False, this function
     checks the spelling of each word and returns a list of unknown words.
@@ -70,51 +99,295 @@ def analyze_string(text, mode):
     Params:
         text
         morpheme mode: True = morphological analyzer, False = spell checker
+        checker - Checker (None = default checker)
+        block_cache - BlockCache, to reuse the results of paragraphs which
+                      have been analyzed before (see literumilo_block_cache.py)
+        markup - format of the text: 'text', 'html', 'markdown' or 'latex'.
+                 Markup, code, URLs, e-mail addresses and numbers are skipped,
+                 and copied unchanged in morpheme mode (see literumilo_markup.py).
+                 None = every word is analyzed.
+        language_gate - LanguageGate. Lines which are not Esperanto are skipped,
+                        and copied unchanged in morpheme mode (see literumilo_language.py).
     Return:
         analyzed text, or list of misspelled words (str)
     """
+    if block_cache is not None:
+        return analyze_blocks(text, mode, checker, block_cache, markup, language_gate)
+    if language_gate is not None:
+        result = analyze_esperanto(text, mode, checker, markup, language_gate)
+        return result if mode else format_word_list(result)
+    if mode:
+        return divide_text(text, checker, markup)
+    else:
+        return format_word_list(find_bad_words(text, checker, markup))
 
-    bad_words = set()    # To output list of misspelled words in spell-check mode.
-    new_text = ""   # To output analyzed text in morphological analysis mode (-m).
+def divide_text(text, checker = None, markup = None):
+    """
+    Divides every word of a text into morphemes. Characters which are not
+    word characters (see is_word_char()) are copied unchanged.
+    Params:
+        text
+        checker - Checker (None = default checker)
+        markup - format of the text (see analyze_string()), or None
+    Return:
+        analyzed text
+    """
+    check_word = get_checker(checker).check_word
+    if markup is not None:
+        return substitute_words(text, markup, lambda word: check_word(word).word)
+    return WORD_PATTERN.sub(lambda match: check_word(match.group()).word, text)
 
-    in_word = False
-    collected_chars = ""
-    for ch in text:   # Iterate over each character.
-        if is_word_char(ch):
-            in_word = True
-            collected_chars += ch
-        else:
-            if in_word:
-                result = check_word(collected_chars);
-                if mode:
-                    new_text += result.word
-                else:
-                    if not result.valid:
-                        bad_words.add(collected_chars)
-                collected_chars = ""
-            in_word = False
-            if mode:
-                new_text += ch
-
-    if in_word:
-        result = check_word(collected_chars)
-        if mode:
-            new_text += result.word
-        else:
-            if not result.valid:
-                bad_words.add(collected_chars)
-        collected_chars = ""
+def find_bad_words(text, checker = None, markup = None):
+    """
+    Finds the misspelled (unknown) words in a text.
+    Params:
+        text
+        checker - Checker (None = default checker)
+        markup - format of the text (see analyze_string()), or None
+    Return:
+        set of misspelled words
+    """
+    is_valid_word = get_checker(checker).is_valid_word
+    if markup is not None:
+        return {word for word in find_words(text, markup) if not is_valid_word(word)}
+    return {word for word in WORD_PATTERN.findall(text) if not is_valid_word(word)}
 
+def analyze_esperanto(text, mode, checker, markup, language_gate):
+    """
+    Analyzes the lines of a text which are Esperanto, according to the
+    language gate. See analyze_string().
+    Return:
+        analyzed text (foreign lines unchanged), or set of misspelled words
+    """
     if mode:
-        return new_text
-    else:
-        bad_str = ""
-        for word in bad_words:
-            bad_str += "{}\n".format(word)
-        return bad_str
+        return "".join(divide_text(block, checker, markup) if is_esperanto else block
+                       for block, is_esperanto in language_gate.split(text, markup))
+    bad_words = set()
+    for block, is_esperanto in language_gate.split(text, markup):
+        if is_esperanto:
+            bad_words |= find_bad_words(block, checker, markup)
+    return bad_words
+
+def analyze_blocks(text, mode, checker, block_cache, markup = None, language_gate = None):
+    """
+    Analyzes a text paragraph by paragraph, and reuses the results of
+    paragraphs which are in the cache. See analyze_string().
+    Return:
+        analyzed text, or list of misspelled words (str)
+    """
+    checker = get_checker(checker)
+    block_cache.use_checker(checker)
+    results = []
+    gate = None if language_gate is None else language_gate.settings()
+    for block in split_into_blocks(text, markup):
+        key = block_key(block, mode, markup, gate, checker.search_order)
+        cached = block_cache.get(key)
+        if cached is None:
+            signature = checker.dictionary_signature()
+            if language_gate is not None:
+                # The counts of the gate for this block are kept with the result.
+                before = language_gate.counts()
+                result = analyze_esperanto(block, mode, checker, markup, language_gate)
+                if not mode: result = frozenset(result)
+                counts = tuple(n - m for n, m in zip(language_gate.counts(), before))
+                block_cache.put(key, (result, counts), signature)
+            else:
+                result = divide_text(block, checker, markup) if mode else \
+                         frozenset(find_bad_words(block, checker, markup))
+                block_cache.put(key, (result, None), signature)
+        else:
+            result, counts = cached
+            if language_gate is not None:
+                language_gate.add_counts(counts)
+        results.append(result)
+    if mode: return "".join(results)
+    return format_word_list(set().union(*results))
+
+def format_word_list(words):
+    """
+    Return: the words as a string, one word per line
+    """
+    bad_str = ""
+    for word in words:
+        bad_str += "{}\n".format(word)
+    return bad_str
+
+WORDS_PER_CHUNK = 2000  # default number of words in a chunk of text
+
+def split_into_chunks(text, words_per_chunk = WORDS_PER_CHUNK):
+    """Generator which divides a text into chunks of about words_per_chunk
+    words. Chunks are divided after a word, so no word is split. The text is
+    scanned lazily, one chunk at a time.
+    Params:
+        text
+        words_per_chunk
+    Return:
+        chunks of text (str)
+    """
+    start = 0
+    count = 0
+    for match in WORD_PATTERN.finditer(text):
+        count += 1
+        if count == words_per_chunk:
+            yield text[start:match.end()]
+            start = match.end()
+            count = 0
+    if start < len(text):
+        yield text[start:]
+
+def analyze_chunk(chunk, mode, checker = None):
+    """Analyzes one chunk of text. See split_into_chunks().
+    Return:
+        analyzed text (mode True), or set of misspelled words (mode False)
+    """
+    if mode: return divide_text(chunk, checker)
+    return find_bad_words(chunk, checker)
 
 # ------------------------ analyze_string
 
+def parse_arguments(arguments):
+    """Parses the command line arguments (without the program name).
+    Return:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(prog = "literumilo", add_help = False)
+    parser.add_argument("-m", dest = "morpheme_mode", action = "store_true")
+    parser.add_argument("--json", dest = "json", action = "store_true")
+    parser.add_argument("-j", "--jobs", dest = "jobs", type = int, default = 1)
+    parser.add_argument("--encoding", dest = "encoding", default = DEFAULT_ENCODING)
+    parser.add_argument("--top", dest = "top", type = int, default = None)
+    parser.add_argument("--counts", dest = "counts", action = "store_true")
+    parser.add_argument("--checkpoint", dest = "checkpoint", default = None)
+    parser.add_argument("--markup", dest = "markup", choices = MARKUP_FORMATS, default = None)
+    parser.add_argument("--language-gate", dest = "language_gate", action = "store_true")
+    parser.add_argument("--gate-threshold", dest = "gate_threshold", type = float, default = THRESHOLD)
+    parser.add_argument("inputs", nargs = "+")
+    return parser.parse_args(arguments)
+
+def analyze_inputs(inputs, mode, output_format = "text", jobs = 1, encoding = DEFAULT_ENCODING,
+                   markup = None, language_gate = None):
+    """Analyzes files, folders (recursively) and standard input ('-'), and
+    writes the results to standard output, chunk by chunk. If jobs is more
+    than 1, files are analyzed by that many worker processes, and the output
+    of each file is written, in order, when the file is finished. Compressed
+    files are decompressed while they are read.
+    Params:
+        inputs - list of file names, folder names, or '-'
+        mode - True = morphological analyzer, False = spell checker
+        output_format - 'text' or 'json'
+        jobs - number of worker processes
+        encoding - text encoding of the files
+        markup - format of the files: 'text', 'html', 'markdown', 'latex', or None
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None
+    Return:
+        exit status: 0 = success, 1 = a file could not be read
+    """
+    files = list(expand_paths(inputs))
+    def prefix(filename):
+        # Misspelled words are preceded by the file name, if there are many files.
+        return filename + ":" if len(files) > 1 else ""
+    status = 0
+    if jobs > 1 and len(files) > 1 and STDIN_NAME not in files:
+        # The language gate is made again by each worker, from its settings.
+        # The counts of the workers are added to the gate.
+        with ProcessPoolExecutor(max_workers = jobs) as pool:
+            if language_gate is None:
+                futures = [pool.submit(analyze_path, filename, mode, output_format,
+                                       prefix(filename), None, encoding, markup)
+                           for filename in files]
+            else:
+                futures = [pool.submit(analyze_path_with_gate, filename, mode, output_format,
+                                       prefix(filename), encoding, markup, language_gate.settings())
+                           for filename in files]
+            for filename, future in zip(files, futures):
+                try:
+                    output = future.result()
+                    if language_gate is not None:
+                        output, counts = output
+                        language_gate.add_counts(counts)
+                    sys.stdout.write(output)
+                    sys.stdout.flush()
+                except (OSError, EOFError, ValueError) as error:
+                    print("Cannot read file: {} ({})".format(filename, error), file = sys.stderr)
+                    status = 1
+        return status
+    for filename in files:
+        try:
+            if filename == STDIN_NAME:
+                stdin = open_binary_stream(sys.stdin.buffer, encoding)
+                analyze_stream(stdin, sys.stdout, mode, output_format, lines_per_chunk = 1,
+                               markup = markup, language_gate = language_gate)
+                continue
+            with open_text(filename, encoding) as fin:
+                analyze_stream(fin, sys.stdout, mode, output_format, filename, prefix(filename),
+                               markup = markup, language_gate = language_gate)
+        except (OSError, EOFError, ValueError) as error:
+            print("Cannot read file: {} ({})".format(filename, error), file = sys.stderr)
+            status = 1
+    return status
+
+def count_inputs(inputs, counter, top = None, output_format = "text", encoding = DEFAULT_ENCODING,
+                 markup = None, language_gate = None):
+    """Counts the misspelled words of files, folders (recursively) and
+    standard input ('-'), and writes a report, sorted by frequency, to
+    standard output. See literumilo_aggregate.py.
+    Params:
+        inputs - list of file names, folder names, or '-'
+        counter - TopCounter or ExactCounter
+        top - number of words in the report (None = all)
+        output_format - 'text' or 'json'
+        encoding - text encoding of the files
+        markup - format of the files: 'text', 'html', 'markdown', 'latex', or None
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None
+    Return:
+        exit status: 0 = success, 1 = a file could not be read
+    """
+    status = 0
+    for filename in expand_paths(inputs):
+        try:
+            if filename == STDIN_NAME:
+                count_stream(open_binary_stream(sys.stdin.buffer, encoding), counter,
+                             markup = markup, language_gate = language_gate)
+                continue
+            with open_text(filename, encoding) as fin:
+                count_stream(fin, counter, markup = markup, language_gate = language_gate)
+        except (OSError, EOFError, ValueError) as error:
+            print("Cannot read file: {} ({})".format(filename, error), file = sys.stderr)
+            status = 1
+    for item in islice(counter.iter_report(), top):
+        sys.stdout.write(format_counts([item], output_format))
+    return status
+
+def analyze_with_checkpoint(filename, folder, mode, output_format = "text", encoding = DEFAULT_ENCODING,
+                            language_gate = None):
+    """Analyzes a file in shards, with a checkpoint in the given folder.
+    If the analysis was interrupted, it continues from the checkpoint.
+    The results are written to the folder (see literumilo_checkpoint.py).
+    In spell checking mode, the counts of misspelled words are written
+    to standard output.
+    Params:
+        filename
+        folder - output folder
+        mode - True = morphological analyzer, False = spell checker
+        output_format - 'text' or 'json' (for the counts)
+        encoding - text encoding of the file
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None
+    Return:
+        exit status: 0 = success, 1 = the file could not be analyzed
+    """
+    try:
+        shards = analyze_corpus(filename, folder, mode, encoding = encoding,
+                                language_gate = language_gate)
+    except (OSError, EOFError, ValueError) as error:
+        print("Cannot analyze file: {} ({})".format(filename, error), file = sys.stderr)
+        return 1
+    print("{}: {} shards in {}".format(filename, shards, folder), file = sys.stderr)
+    if not mode:
+        with merge_counts(folder) as counter:
+            for item in counter.iter_report():
+                sys.stdout.write(format_counts([item], output_format))
+    return 0
+
 def main(params):
 
     if (len(params) < 2):      # If no parameters.
@@ -127,33 +400,55 @@ def main(params):
         print("This program requires Python 3. Your version is {}.{}.".format(major, minor))
         print("Ĉi tiu programo bezonas 'Python 3'. Via versio estas {}.{}.".format(major, minor))
         sys.exit(0)
-    
-    morpheme_mode = False;
-    first_arg = params[1]
-    second_arg = ""
-    if (len(params) > 2):
-        second_arg = params[2]
-
-    file_or_word = first_arg
-    if len(params) > 2:
-        if first_arg == "-m":
-            morpheme_mode = True
-            file_or_word = second_arg
-
-    if os.path.exists(file_or_word):   # If there is a file.
-        result = analyze_file(file_or_word, morpheme_mode)
-        print(result)
-
-    else: # If not a file, must be a word.
+
+    options = parse_arguments(params[1:])
+    inputs = options.inputs
+    file_or_word = inputs[0]
+
+    # If there is one parameter, which is not a file, it must be a word.
+    if len(inputs) == 1 and file_or_word != STDIN_NAME and not os.path.exists(file_or_word):
         word = x_to_accent(file_or_word)
         result = check_word(word)
         if result.valid:
             print("{} ✓".format(result.word))
         else:
             print("✘{}".format(file_or_word))
-
         sys.exit(0)
 
+    output_format = "json" if options.json else "text"
+
+    # Skip lines which are not Esperanto.
+    gate = None
+    if options.language_gate:
+        gate = LanguageGate(options.gate_threshold)
+
+    # Analyze one large file in shards, with a checkpoint.
+    if options.checkpoint is not None:
+        if len(inputs) != 1 or file_or_word == STDIN_NAME:
+            print("--checkpoint needs one input file.", file = sys.stderr)
+            sys.exit(1)
+        if options.markup is not None:
+            print("--checkpoint cannot be used with --markup.", file = sys.stderr)
+            sys.exit(1)
+        status = analyze_with_checkpoint(file_or_word, options.checkpoint, options.morpheme_mode,
+                                         output_format, options.encoding, gate)
+    # Count misspelled words: approximate top K, or exact counts.
+    elif options.top is not None:
+        counter = TopCounter(TOP_CAPACITY * max(1, options.top))
+        status = count_inputs(inputs, counter, options.top, output_format, options.encoding,
+                              options.markup, gate)
+    elif options.counts:
+        with ExactCounter() as counter:
+            status = count_inputs(inputs, counter, None, output_format, options.encoding,
+                                  options.markup, gate)
+    else:
+        status = analyze_inputs(inputs, options.morpheme_mode, output_format,
+                                options.jobs, options.encoding, options.markup, gate)
+    if gate is not None:
+        print("Lines: {} Esperanto, {} foreign (skipped), {} short".format(
+              gate.esperanto_blocks, gate.foreign_blocks, gate.short_blocks), file = sys.stderr)
+    sys.exit(status)
+
 # ----------------------------------------------------
 # Program starts here.
 
@@ -0,0 +1,264 @@
+#! -*- coding: utf-8
+# literumilo_aggregate.py
+#
+# This module counts misspelled words in bounded memory. In spell checking
+# mode, analyze_string() returns a set of all distinct misspelled words,
+# which has no counts, and which can be very large for web text. There are
+# two counters here:
+#
+#   TopCounter - an approximate count of the most frequent words, by the
+#                Space-Saving algorithm. It keeps at most 'capacity' words.
+#                When a new word arrives and the counter is full, the word
+#                with the lowest count is replaced, and the new word inherits
+#                that count (as its possible error). Any word which occurs
+#                more than N / capacity times (N = total) is always kept.
+#
+#   ExactCounter - exact counts of all words. When more than 'memory_limit'
+#                  distinct words are in memory, they are written, sorted,
+#                  to a temporary file (a run). The runs are merged at the end.
+#
+# Both counters give a report sorted by frequency (highest first), and then
+# alphabetically, so the report is the same for the same input.
+#
+# Example:
+#
+#     counter = TopCounter(1000)
+#     count_bad_words(text, counter)
+#     print(format_counts(counter.report(100)))
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import os, json, heapq, shutil, tempfile, weakref
+from itertools import groupby, islice
+
+from .literumilo_utils import WORD_PATTERN
+from .literumilo_check_word import get_checker
+from .literumilo_stream import iter_chunks
+from .literumilo_markup import find_words
+
+MEMORY_LIMIT = 1000000   # distinct words in memory, before they are written to disk
+
+def frequency_order(item):
+    """Sort key for (word, count): highest count first, then alphabetical."""
+    return (-item[1], item[0])
+
+
+class TopCounter:
+    """Approximate counts of the most frequent words (Space-Saving)."""
+
+    def __init__(self, capacity):
+        """
+        Params:
+            capacity - maximum number of words which are counted
+        """
+        if capacity < 1:
+            raise ValueError("TopCounter, bad capacity: {}".format(capacity))
+        self.capacity = capacity
+        self.counts = {}    # word -> count (an upper bound)
+        self.errors = {}    # word -> maximum overestimate of the count
+        self.heap = []      # (count, word); entries with an old count are skipped
+        self.total = 0
+
+    def __contains__(self, word):
+        return word in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, word, n = 1):
+        """Counts a word n times."""
+        self.total += n
+        counts = self.counts
+        if word in counts:
+            counts[word] += n
+        elif len(counts) < self.capacity:
+            counts[word] = n
+            self.errors[word] = 0
+        else:
+            # Replace the word with the lowest count.
+            minimum, old_word = self.pop_minimum()
+            del counts[old_word]
+            del self.errors[old_word]
+            counts[word] = minimum + n
+            self.errors[word] = minimum
+        heapq.heappush(self.heap, (counts[word], word))
+        if len(self.heap) > 4 * self.capacity:
+            # Remove the entries with an old count.
+            self.heap = [(count, word) for word, count in counts.items()]
+            heapq.heapify(self.heap)
+
+    def pop_minimum(self):
+        """Return: (count, word) with the lowest count (ties: the first word alphabetically)"""
+        counts = self.counts
+        while True:
+            count, word = heapq.heappop(self.heap)
+            if counts.get(word) == count:
+                return count, word
+
+    def report(self, k = None):
+        """Return: list of (word, count, error) tuples, sorted by frequency.
+        The true count is between count - error and count.
+        Params:
+            k - number of words (None = all counted words)
+        """
+        items = sorted(self.counts.items(), key = frequency_order)
+        if k is not None: items = items[:k]
+        return [(word, count, self.errors[word]) for word, count in items]
+
+    def iter_report(self):
+        """Generator which yields (word, count, error) tuples, sorted by frequency."""
+        return iter(self.report())
+
+# end of class TopCounter
+
+
+def write_run(items, folder, number):
+    """Writes (word, count) tuples to a run file. Return: file name"""
+    filename = os.path.join(folder, "run{}.tsv".format(number))
+    with open(filename, "w", encoding = "utf-8") as fout:
+        for word, count in items:
+            fout.write("{}\t{}\n".format(word, count))
+    return filename
+
+def read_run(filename):
+    """Generator which reads (word, count) tuples from a run file."""
+    with open(filename, "r", encoding = "utf-8") as fin:
+        for line in fin:
+            word, count = line.rstrip("\n").split("\t")
+            yield word, int(count)
+
+
+class ExactCounter:
+    """Exact counts of words, which are written to disk when there are too
+    many to keep in memory.
+    """
+
+    def __init__(self, memory_limit = MEMORY_LIMIT, folder = None):
+        """
+        Params:
+            memory_limit - maximum number of distinct words in memory
+            folder - for temporary files (None = system default)
+        """
+        self.memory_limit = memory_limit
+        self.counts = {}
+        self.folder = tempfile.mkdtemp(prefix = "literumilo-", dir = folder)
+        # The folder is deleted by close(), or when the counter is garbage collected.
+        self.finalizer = weakref.finalize(self, shutil.rmtree, self.folder, True)
+        self.runs = []       # run files, sorted by word
+        self.total = 0
+
+    def __contains__(self, word):
+        return word in self.counts
+
+    def add(self, word, n = 1):
+        """Counts a word n times."""
+        self.total += n
+        self.counts[word] = self.counts.get(word, 0) + n
+        if len(self.counts) >= self.memory_limit:
+            self.spill()
+
+    def spill(self):
+        """Writes the counts in memory to a run file, sorted by word."""
+        if not self.counts: return
+        self.runs.append(write_run(sorted(self.counts.items()), self.folder, len(self.runs)))
+        self.counts = {}
+
+    def iter_counts(self):
+        """Generator which yields (word, count) tuples, in alphabetical order,
+        with the counts of all runs added together."""
+        sources = [read_run(run) for run in self.runs]
+        sources.append(iter(sorted(self.counts.items())))
+        merged = heapq.merge(*sources)
+        for word, items in groupby(merged, key = lambda item: item[0]):
+            yield word, sum(count for w, count in items)
+
+    def iter_report(self):
+        """Generator which yields (word, count, 0) tuples, sorted by frequency.
+        (The error of an exact count is 0.) The words are sorted in runs of
+        memory_limit words, on disk, and merged, so memory use is bounded.
+        """
+        runs = []
+        counts = self.iter_counts()
+        while True:
+            chunk = list(islice(counts, self.memory_limit))
+            if not chunk: break
+            chunk.sort(key = frequency_order)
+            runs.append(write_run(chunk, self.folder, "f{}".format(len(runs))))
+        sources = [read_run(run) for run in runs]
+        for word, count in heapq.merge(*sources, key = frequency_order):
+            yield word, count, 0
+
+    def report(self, k = None):
+        """Return: list of (word, count, 0) tuples, sorted by frequency.
+        Params:
+            k - number of words (None = all words)
+        """
+        return list(islice(self.iter_report(), k))
+
+    def close(self):
+        """Deletes the temporary files."""
+        self.finalizer()
+        self.runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+# end of class ExactCounter
+
+
+def count_bad_words(text, counter, checker = None, markup = None, language_gate = None):
+    """Counts the misspelled words of a text.
+    Params:
+        text
+        counter - TopCounter or ExactCounter
+        checker - Checker (None = default checker)
+        markup - format of the text (see literumilo_markup.py), or None
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None
+    """
+    is_valid_word = get_checker(checker).is_valid_word
+    if language_gate is None:
+        blocks = [text]
+    else:
+        blocks = [block for block, is_esperanto in language_gate.split(text, markup) if is_esperanto]
+    for block in blocks:
+        words = WORD_PATTERN.findall(block) if markup is None else find_words(block, markup)
+        for word in words:
+            # A word which is being counted is known to be misspelled.
+            if word in counter or not is_valid_word(word):
+                counter.add(word)
+
+def count_stream(stream, counter, checker = None, markup = None, language_gate = None):
+    """Counts the misspelled words of a text stream, chunk by chunk.
+    If the text has markup, the stream is read as one chunk, because a
+    code block can be longer than a chunk (as in analyze_stream()).
+    Params:
+        stream - text stream
+        counter - TopCounter or ExactCounter
+        checker - Checker (None = default checker)
+        markup - format of the text (see literumilo_markup.py), or None
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None
+    """
+    chunks = iter_chunks(stream) if markup is None else [(0, stream.read())]
+    for offset, chunk in chunks:
+        count_bad_words(chunk, counter, checker, markup, language_gate)
+
+def format_counts(report, output_format = "text"):
+    """Formats a report of counts, one word per line: word, count (tab separated).
+    Or, if the output format is 'json', one record per line:
+    {"token": "xyz", "count": 12, "error": 0}
+    Params:
+        report - list of (word, count, error) tuples
+        output_format - 'text' or 'json'
+    Return:
+        report (str)
+    """
+    if output_format == "json":
+        return "".join(json.dumps({"token": word, "count": count, "error": error},
+                                  ensure_ascii = False) + "\n"
+                       for word, count, error in report)
+    return "".join("{}\t{}\n".format(word, count) for word, count, error in report)
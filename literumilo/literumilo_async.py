@@ -0,0 +1,120 @@
+#! -*- coding: utf-8
+# literumilo_async.py
+#
+# This module has asyncio versions of check_word(), analyze_string() and
+# analyze_file(), for servers which run on an event loop. Analyzing a large
+# text takes a long time, so the work is done by an executor (one worker
+# thread by default), and the text is divided into chunks of N words. Each
+# chunk is a separate job, so the event loop gets control between chunks.
+#
+# At most 'max_pending' chunks are submitted to the executor at one time.
+# The async generator iter_analysis() submits a new chunk only when the
+# consumer takes a result, so a slow consumer applies backpressure. If the
+# task is cancelled, chunks which have not started are cancelled too.
+#
+# Example:
+#
+#     result = await analyze_string_async(text, True)
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import asyncio, collections
+from concurrent.futures import ThreadPoolExecutor
+
+from .literumilo import analyze_chunk, split_into_chunks, format_word_list, WORDS_PER_CHUNK
+from .literumilo_check_word import get_checker
+from .literumilo_input import read_text, DEFAULT_ENCODING
+
+MAX_PENDING = 2         # maximum number of chunks submitted to the executor
+
+# The analysis is CPU-bound. Under the GIL, several busy threads compete with
+# the event loop for the interpreter, and the loop may wait a long time. So by
+# default, the chunks are analyzed by a single worker thread.
+default_executor = None
+
+def get_executor(executor):
+    """Return: the given executor, or the default single-thread executor"""
+    global default_executor
+    if executor is not None: return executor
+    if default_executor is None:
+        default_executor = ThreadPoolExecutor(max_workers = 1)
+    return default_executor
+
+async def check_word_async(word, executor = None, checker = None):
+    """Asynchronous check_word(). The word is analyzed by the executor.
+    Params:
+        word
+        executor - concurrent.futures executor (None = single worker thread)
+        checker - Checker (None = default checker)
+    Return:
+        AnalysisResult
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(executor), get_checker(checker).check_word, word)
+
+async def iter_analysis(text, mode, executor = None,
+                        words_per_chunk = WORDS_PER_CHUNK, max_pending = MAX_PENDING,
+                        checker = None):
+    """Async generator which analyzes a text chunk by chunk, and yields the
+    result of each chunk in order. At most max_pending chunks are submitted
+    to the executor ahead of the consumer.
+    Params:
+        text
+        mode - True = morphological analyzer, False = spell checker
+        executor - concurrent.futures executor (None = single worker thread)
+        words_per_chunk
+        max_pending
+        checker - Checker (None = default checker)
+    Return:
+        analyzed text (mode True), or set of misspelled words (mode False),
+        for each chunk
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor(executor)
+    chunks = split_into_chunks(text, words_per_chunk)
+    pending = collections.deque()
+    try:
+        while True:
+            while len(pending) < max_pending:
+                chunk = next(chunks, None)
+                if chunk is None: break
+                pending.append(loop.run_in_executor(executor, analyze_chunk, chunk, mode, checker))
+            if not pending: break
+            yield await pending.popleft()
+    finally:
+        # On cancellation (or if the consumer stops early), cancel the rest.
+        for future in pending:
+            future.cancel()
+
+async def analyze_string_async(text, mode, executor = None,
+                               words_per_chunk = WORDS_PER_CHUNK, max_pending = MAX_PENDING,
+                               checker = None):
+    """Asynchronous analyze_string(). The result is the same.
+    For a description of parameters see iter_analysis().
+    Return:
+        analyzed text, or list of misspelled words (str)
+    """
+    if mode:
+        pieces = []
+        async for piece in iter_analysis(text, mode, executor, words_per_chunk, max_pending, checker):
+            pieces.append(piece)
+        return "".join(pieces)
+    bad_words = set()
+    async for words in iter_analysis(text, mode, executor, words_per_chunk, max_pending, checker):
+        bad_words |= words
+    return format_word_list(bad_words)
+
+async def analyze_file_async(filename, mode, executor = None,
+                             words_per_chunk = WORDS_PER_CHUNK, max_pending = MAX_PENDING,
+                             checker = None, encoding = DEFAULT_ENCODING):
+    """Asynchronous analyze_file(). The file is read by the executor.
+    It may be compressed.
+    For a description of parameters see iter_analysis().
+    Return:
+        analyzed text, or list of misspelled words (str)
+    """
+    loop = asyncio.get_running_loop()
+    text = await loop.run_in_executor(get_executor(executor), read_text, filename, encoding)
+    return await analyze_string_async(text, mode, executor, words_per_chunk, max_pending, checker)
@@ -0,0 +1,161 @@
+#! -*- coding: utf-8
+# literumilo_block_cache.py
+#
+# This module defines a cache of the results of blocks of text (paragraphs),
+# for documents which are checked again after small changes. When a cache
+# is given to analyze_string(), the text is divided into blocks at blank
+# lines, and each block is identified by a hash of its text. (If the text
+# has markup, blank lines inside code blocks or comments are not block ends.)
+# The result of a block which is in the cache (the analyzed text, or the
+# misspelled words) is reused, so only the changed paragraphs of a document
+# are analyzed. If a language gate is used, the counts of the blocks which
+# it classified are kept with each result, and added to the gate when the
+# result is reused.
+#
+# A cache holds results for one Checker. If the cache is used with another
+# Checker, or the dictionary of the Checker changes (it is reloaded, or an
+# overlay is added or removed), or its lexicon is replaced, the cache is
+# cleared. The search order of the Checker is part of the key of each block,
+# because it can change the division of a word. The least recently
+# used blocks are removed when the cache is full. The cache can be shared
+# by threads.
+#
+# Example:
+#
+#     cache = BlockCache()
+#     bad_words = analyze_string(article, False, block_cache = cache)
+#     ...
+#     bad_words = analyze_string(revised_article, False, block_cache = cache)
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import re, hashlib, threading
+from collections import OrderedDict
+
+from .literumilo_markup import skip_pattern_source
+
+BLOCK_CAPACITY = 10000    # blocks in a cache
+
+# Blocks end at blank lines. The blank lines belong to the block before them.
+BLOCK_END_PATTERN = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+LINE_END_PATTERN = re.compile(r"\n")    # for blocks which are lines
+
+block_end_patterns = {}   # patterns for text with markup, by format and block end
+
+def block_end_pattern(markup, end_pattern = BLOCK_END_PATTERN):
+    """Return: a pattern which matches block ends, or spans of markup
+    (group 'end' is None), for the given markup format"""
+    key = (markup, end_pattern.pattern)
+    pattern = block_end_patterns.get(key)
+    if pattern is None:
+        source = "(?:{})|(?P<end>{})".format(skip_pattern_source(markup), end_pattern.pattern)
+        pattern = re.compile(source, re.MULTILINE)
+        block_end_patterns[key] = pattern
+    return pattern
+
+def split_into_blocks(text, markup = None, end_pattern = BLOCK_END_PATTERN):
+    """Generator which divides a text into blocks (paragraphs), which end
+    at blank lines. The blocks, joined together, are the text.
+    Params:
+        text
+        markup - format of the text (see literumilo_markup.py), or None
+        end_pattern - pattern of block ends (LINE_END_PATTERN for lines)
+    Return:
+        blocks of text (str)
+    """
+    start = 0
+    if markup is None:
+        matches = end_pattern.finditer(text)
+    else:
+        matches = (match for match in block_end_pattern(markup, end_pattern).finditer(text)
+                   if match.group("end") is not None)
+    for match in matches:
+        yield text[start:match.end()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+def block_key(block, mode, markup = None, gate = None, search_order = None):
+    """Return: the cache key of a block of text, for the given mode, markup,
+    language gate settings (see LanguageGate.settings()) and search order"""
+    return (mode, markup, gate, search_order,
+            hashlib.blake2b(block.encode("utf-8"), digest_size = 16).digest())
+
+
+class BlockCache:
+    """A cache of the results of blocks of text. See the description above."""
+
+    def __init__(self, capacity = BLOCK_CAPACITY):
+        """
+        Params:
+            capacity - maximum number of blocks
+        """
+        if capacity < 1:
+            raise ValueError("BlockCache, bad capacity: {}".format(capacity))
+        self.capacity = capacity
+        self.blocks = OrderedDict()     # key -> result, least recently used first
+        self.checker = None
+        self.signature = None           # see Checker.dictionary_signature()
+        self.lexicon = None             # lexicon of the checker
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def use_checker(self, checker):
+        """Clears the cache if the checker, its dictionary or its lexicon has changed."""
+        signature = checker.dictionary_signature()
+        lexicon = checker.lexicon
+        with self.lock:
+            if self.checker is not checker or self.signature != signature or \
+               self.lexicon is not lexicon:
+                self.blocks.clear()
+                self.checker = checker
+                self.signature = signature
+                self.lexicon = lexicon
+
+    def get(self, key):
+        """Return: the result of a block (see block_key()), or None"""
+        with self.lock:
+            result = self.blocks.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.blocks.move_to_end(key)
+            return result
+
+    def put(self, key, result, signature = None):
+        """Stores the result of a block.
+        Params:
+            key - see block_key()
+            result
+            signature - signature of the dictionary which made the result.
+                        If the dictionary has changed since, the result is not stored.
+        """
+        with self.lock:
+            if signature is not None and signature != self.signature: return
+            self.blocks[key] = result
+            self.blocks.move_to_end(key)
+            if len(self.blocks) > self.capacity:
+                self.blocks.popitem(last = False)
+
+    def clear(self):
+        """Removes all blocks."""
+        with self.lock:
+            self.blocks.clear()
+
+# end of class BlockCache
@@ -2,12 +2,14 @@
 # literumilo_check_word.py     - (kontrolu_vorton)
 #
 # This file has functions which check the spelling of an Esperanto word.
+# The class Checker holds a dictionary and its settings. The module functions
+# check_word(), is_valid_word() and check_words() use a default Checker.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-05-01
+# Last edit date: 2026-10-19
 #
 
-import os, sys
+import os, sys, time, threading
 from .literumilo_entry import *
 from .literumilo_ending import *
 from .literumilo_suffix import check_suffix
@@ -15,23 +17,73 @@ from .literumilo_morpheme_list import MorphemeList
 from .literumilo_scan_morphemes import scan_morphemes
 from .literumilo_utils import *
 from .literumilo_load import load_dictionary
-
-esperanto_dictionary = load_dictionary()
+from .literumilo_order import longest_first
+from .literumilo_ngram import make_ngram_table, passes_ngram_filter
+from .literumilo_layers import LayeredDictionary
+from .literumilo_dictionary_index import DictionaryIndex
+
+# Exceptions.
+# A few words cause difficulties for the algorithm, especially accusative pronouns.
+# For example, the pronoun 'vin' means 'you' (accusative), but it is also the root for 'wine' (vino).
+# I want the pronoun to divided as 'vi.n' and the beverage to be 'vin.o' (not vi.n.o). The dictionary
+# has 'vin' as a key, but the keys in a dictionary must be unique. To solve this problem, some
+# pronouns (etc.) will be excluded from the dictionary, and handled as exceptions in check_word().
+EXCEPTIONS = {
+    "ĝin": "ĝi.n",
+    "lin": "li.n",
+    "min": "mi.n",
+    "sin": "si.n",
+    "vin": "vi.n",
+    "lian": "li.an",
+    "cian": "ci.an",
+}
 
 # AnalysisResult
 # 'word' has the original word divided into morphemes, eg. 'mis.dir.it.a'.
 # valid is True if the word is a valid Esperanto word. (correctly spelled)
+# The divided word is made when 'word' is first read. Until then, the
+# result holds only the lower case word and the boundaries between morphemes.
 
 class AnalysisResult:
-    def __init__(self, original, word, valid):
+
+    __slots__ = ("original", "source", "valid", "_boundaries", "_word")
+
+    def __init__(self, original, word, valid, boundaries = None):
         """
         Params:
             original word
-            word - divided into morphemes
+            word - divided into morphemes, or, if boundaries are given,
+                   the lower case word without periods
             valid - True or False
+            boundaries - offsets of the boundaries between morphemes (optional)
         """
-        self.word = restore_capitals(original, word)
+        self.original = original
+        self.source = word
         self.valid = valid
+        self._boundaries = boundaries
+        self._word = None
+
+    @property
+    def boundaries(self):
+        """Offsets of the boundaries between morphemes (tuple of int).
+        For example, for 'mis.dir.it.a', the boundaries are (3, 6, 8)."""
+        if self._boundaries is None:
+            self._boundaries = part_boundaries(self.source.split("."))
+        return self._boundaries
+
+    @property
+    def word(self):
+        """The original word divided into morphemes, eg. 'Mis.dir.it.a'."""
+        if self._word is None:
+            if self._boundaries is None:
+                self._word = restore_capitals(self.original, self.source)
+            elif len(self.source) == len(self.original):
+                # All letters come from the original word.
+                self._word = insert_periods(self.original, self._boundaries)
+            else:
+                analyzed = insert_periods(self.source, self._boundaries)
+                self._word = restore_capitals(self.original, analyzed)
+        return self._word
 
 def check_synthesis(rest_of_word, dictionary, index, morpheme_list, last_morpheme):
     """check_synthesis (kontrolu sintezon)
@@ -100,22 +152,19 @@ def find_morpheme(rest_of_word, dictionary, index, morpheme_list):
                 morpheme_list.put(index, entry)
                 valid = check_synthesis(rest_of_word, dictionary, index, morpheme_list, True)
                 if valid: return True
+                morpheme_list.backtracks += 1
 
     length_of_word = len(rest_of_word)
-    min_length = 2;  # minimum length of a morpheme
-    max_length = length_of_word - 2
 
     # Try to find a valid morpheme, by dividing the rest of the word.
-    for size in range(max_length, min_length - 1, -1):
-        morpheme = rest_of_word[0:size]
-        entry = dictionary.get(morpheme)
-        if entry:
-            # Do we allow this morpheme to join with others?
-            if entry.synthesis != Synthesis.No:
-                rest_of_word2 = rest_of_word[size:]  # Careful, rest_of_word != rest_of_word2
-                morpheme_list.put(index, entry)
-                valid = check_synthesis(rest_of_word2, dictionary, index, morpheme_list, False)
-                if valid: return True
+    # The ordering policy decides which candidate is tried first.
+    candidates = candidate_morphemes(rest_of_word, dictionary)
+    for size, entry in morpheme_list.order(candidates):
+        rest_of_word2 = rest_of_word[size:]  # Careful, rest_of_word != rest_of_word2
+        morpheme_list.put(index, entry)
+        valid = check_synthesis(rest_of_word2, dictionary, index, morpheme_list, False)
+        if valid: return True
+        morpheme_list.backtracks += 1
 
     # Sometimes there is a separator (a grammatical ending) between morphemes.
     # This is usually done to aid pronunciation. Instead of 'fingr.montri.', most would
@@ -128,89 +177,572 @@ def find_morpheme(rest_of_word, dictionary, index, morpheme_list):
         rest_of_word2 = rest_of_word[1:]
         valid = check_synthesis(rest_of_word2, dictionary, index, morpheme_list, False)
         if valid: return True
+        morpheme_list.backtracks += 1
 
     return False
 
-def check_word(original_word):
-    """This function tests whether a word is correctly spelled.
+def candidate_morphemes(rest_of_word, dictionary):
+    """This generator yields the morphemes at the start of rest_of_word,
+    which are in the dictionary and can join with other morphemes.
+    Morphemes are yielded from longest to shortest. At least two letters
+    are left for the rest of the word.
     Params:
-        original word
+        rest_of_word - the remainder to be analyzed
         dictionary - a map of word data
     Return:
-        AnalysisResult
+        (size, entry) tuples
     """
+    min_length = 2;  # minimum length of a morpheme
+    max_length = len(rest_of_word) - 2
+    for size in range(max_length, min_length - 1, -1):
+        entry = dictionary.get(rest_of_word[0:size])
+        if entry:
+            # Do we allow this morpheme to join with others?
+            if entry.synthesis != Synthesis.No:
+                yield (size, entry)
 
-    if len(original_word) == 1:   # Just a letter or hyphen.
-        if is_word_char(original_word):
-            return AnalysisResult(original_word, original_word, True)
-        else:
-            return AnalysisResult(original_word, original_word, False)
 
-    # Check for abbreviations, such as n-r.oj, s-in.oj
-    if len(original_word) > 2:
-        second_char = original_word[1]
-        if is_hyphen(second_char):
-            entry = esperanto_dictionary.get(original_word)
-            if entry:
-                return AnalysisResult(original_word, entry.morpheme, True)
+def make_result(valid_only, original, word, valid, boundaries = None):
+    """Makes the result of analyze_word(). See AnalysisResult.
+    Return:
+        valid (True/False) if valid_only is True, otherwise AnalysisResult
+    """
+    if valid_only: return valid
+    return AnalysisResult(original, word, valid, boundaries)
+
+
+# DictionaryState
+# A dictionary, with the tables which are derived from it: the n-gram table
+# and the secondary indexes (made when they are first needed), and the
+# lexicon of full word forms. A Checker replaces its state in one assignment,
+# so an analysis which has started finishes with the old dictionary and
+# tables. (See swap_state().)
+
+class DictionaryState:
+
+    __slots__ = ("dictionary", "ngram_table", "lexicon", "version", "load_time",
+                 "dictionary_index")
+
+    def __init__(self, dictionary, lexicon = None, ngram_table = None, load_time = None):
+        """
+        Params:
+            dictionary - a map of word data, indexed by morpheme
+            lexicon - Lexicon of full word forms, or None
+            ngram_table - NgramTable, or None (made when it is needed)
+            load_time - time when the dictionary was loaded (None = now)
+        """
+        self.dictionary = dictionary
+        self.lexicon = lexicon
+        self.ngram_table = ngram_table
+        self.version = 1     # set by Checker.swap_state()
+        self.load_time = time.time() if load_time is None else load_time
+        self.dictionary_index = None
+
+    def get_ngram_table(self):
+        """Return: the n-gram table for the dictionary (NgramTable)"""
+        if self.ngram_table is None:
+            self.ngram_table = make_ngram_table(self.dictionary)
+        return self.ngram_table
+
+    def get_dictionary_index(self):
+        """Return: the secondary indexes of the dictionary (DictionaryIndex).
+        They are made again if an overlay has been added or removed."""
+        index = self.dictionary_index
+        if index is None or index.changes != getattr(self.dictionary, "changes", 0):
+            index = DictionaryIndex(self.dictionary)
+            self.dictionary_index = index
+        return index
+
+# end of class DictionaryState
+
+
+# Checker
+# A Checker owns a dictionary, its derived tables and caches, its options and
+# its statistics. Several checkers with different dictionaries can be used in
+# one process. A checker can be shared by threads, and it can be pickled, to
+# send it to worker processes. (The locks are remade when it is unpickled.)
+#
+# The module functions check_word(), is_valid_word() and check_words() use
+# the default checker, which has the dictionary in data/vortaro.tsv.
+
+class Checker:
+
+    def __init__(self, dictionary = None, search_order = longest_first,
+                 negative_cache = None, lexicon = None):
+        """
+        Params:
+            dictionary - a map of word data, indexed by morpheme
+                         (None = load the dictionary in data/vortaro.tsv)
+            search_order - ordering policy for candidate morphemes (see literumilo_order.py)
+            negative_cache - NegativeCache, or None (see literumilo_negative_cache.py)
+            lexicon - Lexicon of full word forms, or None (see literumilo_lexicon.py)
+        """
+        if dictionary is None:
+            dictionary = load_dictionary()
+        # The dictionary, n-gram table and lexicon. See DictionaryState.
+        self.state = DictionaryState(dictionary, lexicon)
+        self.search_order = search_order
+        self.negative_cache = negative_cache
+        # Statistics for compound word analysis.
+        #     searches - number of times find_morpheme() was called for a word
+        #     backtracks - number of candidate morphemes which were tried and rejected
+        #     ngram_rejections - searches avoided, because the word had an impossible n-gram
+        #     negative_cache_hits - searches avoided, because the word was in the negative cache
+        #     lexicon_hits - words found in the lexicon of full word forms
+        self.statistics = {"searches": 0, "backtracks": 0, "ngram_rejections": 0,
+                           "negative_cache_hits": 0, "lexicon_hits": 0}
+        self.statistics_lock = threading.Lock()   # The counters are updated by many threads.
+        self.update_lock = threading.RLock()      # for changes to the dictionary
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["statistics_lock"]
+        del state["update_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.statistics_lock = threading.Lock()
+        self.update_lock = threading.RLock()
+
+    @property
+    def dictionary(self):
+        """The dictionary, a map of word data, indexed by morpheme."""
+        return self.state.dictionary
+
+    @property
+    def ngram_table(self):
+        """The n-gram table, or None if it has not been made yet."""
+        return self.state.ngram_table
+
+    @property
+    def lexicon(self):
+        """The lexicon of full word forms, or None."""
+        return self.state.lexicon
+
+    @lexicon.setter
+    def lexicon(self, new_lexicon):
+        self.state.lexicon = new_lexicon
+
+    @property
+    def version(self):
+        """The version of the dictionary. It is 1 at first, and it increases
+        each time the dictionary is replaced."""
+        return self.state.version
+
+    def dictionary_signature(self):
+        """Return: a value which changes whenever the dictionary changes, that is,
+        when it is replaced, or an overlay is added or removed. (For caches.)"""
+        state = self.state
+        return (state.version, getattr(state.dictionary, "changes", 0))
+
+    @property
+    def load_time(self):
+        """The time when the dictionary was loaded (seconds since the epoch)."""
+        return self.state.load_time
+
+    def set_dictionary(self, dictionary):
+        """Replaces the dictionary, for example, with a compact dictionary:
+        checker.set_dictionary(load_dictionary(compact = True)).
+        The n-gram table is remade when it is needed, and the negative cache
+        is cleared, because they depend on the dictionary. The lexicon of
+        full word forms is turned off, because it was built from the old
+        dictionary. (A DictionaryReloader builds a new lexicon.)
+        Params:
+            dictionary - a map of word data, indexed by morpheme
+        """
+        self.swap_state(DictionaryState(dictionary))
+
+    def swap_state(self, new_state):
+        """Replaces the dictionary and its tables in one step. Analyses which
+        have started finish with the old state. The negative cache is cleared.
+        If the old dictionary has overlays (see add_overlay()), they are put on
+        the new dictionary.
+        Params:
+            new_state - DictionaryState
+        """
+        with self.update_lock:
+            old_state = self.state
+            old_dictionary = old_state.dictionary
+            if isinstance(old_dictionary, LayeredDictionary) and \
+               not isinstance(new_state.dictionary, LayeredDictionary):
+                new_state.dictionary = old_dictionary.rebase(new_state.dictionary)
+                if new_state.ngram_table is not None:
+                    new_state.ngram_table.add_units([key for key, entry in
+                        new_state.dictionary.merged.items() if entry.synthesis != Synthesis.No])
+            new_state.version = old_state.version + 1
+            self.state = new_state
+            if self.negative_cache is not None:
+                self.negative_cache.clear()
+
+    def add_overlay(self, name, overlay):
+        """Adds an overlay of extra morphemes on top of the dictionary.
+        (See literumilo_layers.py.) The n-gram table is extended, and the
+        negative cache is cleared, because invalid words might now be valid.
+        If the overlay replaces entries of the base dictionary, the lexicon
+        of full word forms might be wrong, so it is turned off.
+        Params:
+            name - name of the overlay (str)
+            overlay - a map of word data, indexed by morpheme (see make_dictionary())
+        """
+        with self.update_lock:
+            state = self.state
+            if not isinstance(state.dictionary, LayeredDictionary):
+                state.dictionary = LayeredDictionary(state.dictionary)
+            base = state.dictionary.base
+            state.dictionary.add_layer(name, overlay)
+            if state.ngram_table is not None:
+                state.ngram_table.add_units([key for key, entry in overlay.items()
+                                             if entry.synthesis != Synthesis.No])
+            if self.negative_cache is not None:
+                self.negative_cache.clear()
+            if state.lexicon is not None and any(key in base for key in overlay):
+                state.lexicon = None
+
+    def remove_overlay(self, name):
+        """Removes an overlay which was added by add_overlay().
+        The negative cache is cleared. (The n-gram table is kept. It may
+        have a few extra n-grams, but it never rejects a valid word.)
+        Params:
+            name - name of the overlay
+        """
+        with self.update_lock:
+            dictionary = self.state.dictionary
+            if not isinstance(dictionary, LayeredDictionary):
+                raise KeyError(name)
+            dictionary.remove_layer(name)
+            if self.negative_cache is not None:
+                self.negative_cache.clear()
+
+    def get_ngram_table(self):
+        """Return: the n-gram table for the dictionary (NgramTable)"""
+        return self.state.get_ngram_table()
+
+    def get_dictionary_index(self):
+        """Return: the secondary indexes of the dictionary, for queries such as
+        'all morphemes which represent people' (see literumilo_dictionary_index.py)"""
+        return self.state.get_dictionary_index()
+
+    def add_statistic(self, key, n = 1):
+        """Adds n to a statistics counter. (Thread safe.)"""
+        with self.statistics_lock:
+            self.statistics[key] += n
+
+    def get_statistics(self):
+        """Return: a copy of the statistics for compound word analysis (dict)"""
+        with self.statistics_lock:
+            return dict(self.statistics)
+
+    def reset_statistics(self):
+        """Sets all statistics counters to zero."""
+        with self.statistics_lock:
+            for key in self.statistics:
+                self.statistics[key] = 0
+
+    def check_word(self, original_word):
+        """This method tests whether a word is correctly spelled.
+        Params:
+            original word
+        Return:
+            AnalysisResult
+        """
+        return self.analyze_word(original_word, False)
+
+    def is_valid_word(self, original_word):
+        """This method tests whether a word is correctly spelled. It is faster
+        than check_word(), because it does not keep the division into morphemes.
+        Params:
+            original word
+        Return:
+            True if the word is valid, False otherwise
+        """
+        return self.analyze_word(original_word, True)
+
+    def analyze_word(self, original_word, valid_only, state = None):
+        """This method tests whether a word is correctly spelled, and divides
+        it into morphemes. The search stops at the first valid division.
+        Params:
+            original word
+            valid_only - True to return only the validity of the word
+            state - DictionaryState (None = current state)
+        Return:
+            AnalysisResult, or True/False if valid_only is True
+        """
+
+        # The state is read once, so the analysis uses one version of the dictionary.
+        if state is None: state = self.state
+        dictionary = state.dictionary
+
+        if len(original_word) == 1:   # Just a letter or hyphen.
+            if is_word_char(original_word):
+                return make_result(valid_only, original_word, original_word, True)
             else:
-                return AnalysisResult(original_word, original_word, False)
-
-    original_word = remove_hyphens(original_word)
-
-    # Lower case for analysis.
-    word = original_word.lower()
-    length_of_word = len(word)
-
-    # Exceptions.
-    # A few words cause difficulties for the algorithm, especially accusative pronouns.
-    # For example, the pronoun 'vin' means 'you' (accusative), but it is also the root for 'wine' (vino).
-    # I want the pronoun to divided as 'vi.n' and the beverage to be 'vin.o' (not vi.n.o). The dictionary
-    # has 'vin' as a key, but the keys in a dictionary must be unique. To solve this problem, some
-    # pronouns (etc.) will be excluded from the dictionary, and handled as exceptions here.
-
-    if length_of_word < 5:
-        if (word == "ĝin"): return AnalysisResult(original_word, "ĝi.n", True)
-        if (word == "lin"): return AnalysisResult(original_word, "li.n", True)
-        if (word == "min"): return AnalysisResult(original_word, "mi.n", True)
-        if (word == "sin"): return AnalysisResult(original_word, "si.n", True)
-        if (word == "vin"): return AnalysisResult(original_word, "vi.n", True)
-        if (word == "lian"): return AnalysisResult(original_word, "li.an", True)
-        if (word == "cian"): return AnalysisResult(original_word, "ci.an", True)
-
-    # First, check the dictionary for words which have no
-    # grammatical ending, eg. 'ne', 'dum', 'post'.
-    entry = esperanto_dictionary.get(word)
-    if entry:
-        if entry.without_ending == WithoutEnding.Yes:
-            return AnalysisResult(original_word, entry.morpheme, True)
-
-    ending = get_ending(word)
-    if ending == None:
-        return AnalysisResult(original_word, word, False)
-    else:
-        length = length_of_word - ending.length
-        word_without_ending = word[0:length]
-        entry = esperanto_dictionary.get(word_without_ending)
+                return make_result(valid_only, original_word, original_word, False)
+
+        # Check for abbreviations, such as n-r.oj, s-in.oj
+        if len(original_word) > 2:
+            second_char = original_word[1]
+            if is_hyphen(second_char):
+                entry = dictionary.get(original_word)
+                if entry:
+                    return make_result(valid_only, original_word, entry.morpheme, True)
+                else:
+                    return make_result(valid_only, original_word, original_word, False)
+
+        original_word = remove_hyphens(original_word)
+
+        # Lower case for analysis.
+        word = original_word.lower()
+        length_of_word = len(word)
+
+        # Common words are in the lexicon of full word forms.
+        lexicon = state.lexicon
+        if lexicon is not None:
+            boundaries = lexicon.find(word)
+            if boundaries is not None:
+                self.add_statistic("lexicon_hits")
+                return make_result(valid_only, original_word, word, True, boundaries)
+
+        # Exceptions. (See EXCEPTIONS above.)
+        if length_of_word < 5:
+            exception = EXCEPTIONS.get(word)
+            if exception: return make_result(valid_only, original_word, exception, True)
+
+        # First, check the dictionary for words which have no
+        # grammatical ending, eg. 'ne', 'dum', 'post'.
+        entry = dictionary.get(word)
         if entry:
-            if entry.with_ending == WithEnding.Yes:
-                word_with_ending = entry.morpheme + "." + ending.ending
-                return AnalysisResult(original_word, word_with_ending, True)
+            if entry.without_ending == WithoutEnding.Yes:
+                return make_result(valid_only, original_word, entry.morpheme, True)
+
+        ending = get_ending(word)
+        if ending == None:
+            return make_result(valid_only, original_word, word, False)
         else:
-            # The root was not found. Maybe it's a compound word.
-            # Do a morphological analysis.
+            length = length_of_word - ending.length
+            word_without_ending = word[0:length]
+            entry = dictionary.get(word_without_ending)
+            if entry:
+                if entry.with_ending == WithEnding.Yes:
+                    if valid_only: return True
+                    boundaries = part_boundaries((entry.morpheme, ending.ending))
+                    return AnalysisResult(original_word, word, True, boundaries)
+            else:
+                # The root was not found. Maybe it's a compound word.
+                # If the word has an impossible combination of letters,
+                # it is not necessary to divide it.
+                if not passes_ngram_filter(word, state.get_ngram_table()):
+                    self.add_statistic("ngram_rejections")
+                    return make_result(valid_only, original_word, word, False)
+
+                # Has this word failed before?
+                negative_cache = self.negative_cache
+                if negative_cache is not None and word in negative_cache:
+                    self.add_statistic("negative_cache_hits")
+                    return make_result(valid_only, original_word, word, False)
+
+                # Do a morphological analysis.
+
+                # The morpheme list needs the ending for later analysis.
+                morpheme_list = MorphemeList(ending, self.search_order)
+
+                valid_word = find_morpheme(word_without_ending, dictionary, 0, morpheme_list)
+                with self.statistics_lock:
+                    self.statistics["searches"] += 1
+                    self.statistics["backtracks"] += morpheme_list.backtracks
+
+                if valid_word:
+                    if valid_only: return True
+                    return AnalysisResult(original_word, word, True, morpheme_list.boundaries())
+                else:
+                    if negative_cache is not None:
+                        negative_cache.add(word)
+                    return make_result(valid_only, original_word, word, False)
+
+        return make_result(valid_only, original_word, word, False)
+
+    # analyze_word
+
+    def check_words(self, words):
+        """This method checks the spelling of a sequence of words. It gives the same
+        results as calling check_word() for each word, but it is faster for large batches.
+        Duplicate words are analyzed only once. The words are lower-cased and the hyphens
+        removed in bulk, then the simple cases (exceptions, words without endings, roots
+        with endings) are resolved together, with one dictionary lookup per word. Only the
+        remaining words are analyzed by check_word().
+        Params:
+            words - an iterable of words
+        Return:
+            list of AnalysisResult, aligned with the input words
+            (Duplicate words share one AnalysisResult.)
+        """
+        words = list(words)
+        results = {}
+        state = self.state
+        dictionary = state.dictionary
+        lexicon = state.lexicon
+
+        # Single letters and abbreviations (n-r.oj) are handled by check_word().
+        remaining = []
+        for word in dict.fromkeys(words):
+            if len(word) == 1 or (len(word) > 2 and is_hyphen(word[1])):
+                results[word] = self.analyze_word(word, False, state)
+            else:
+                remaining.append(word)
+        # (word, word without hyphens, lower case word without hyphens)
+        stripped = [remove_hyphens(word) for word in remaining]
+        lowered = [word.lower() for word in stripped]
+        pending = list(zip(remaining, stripped, lowered))
+
+        # The lexicon of full word forms.
+        if lexicon is not None:
+            found = [lexicon.find(item[2]) for item in pending]
+            next_pending = []
+            for item, boundaries in zip(pending, found):
+                if boundaries is None:
+                    next_pending.append(item)
+                else:
+                    results[item[0]] = AnalysisResult(item[1], item[2], True, boundaries)
+            self.add_statistic("lexicon_hits", len(pending) - len(next_pending))
+            pending = next_pending
+
+        # Exceptions, and words without a grammatical ending.
+        next_pending = []
+        for item in pending:
+            token, original, word = item
+            exception = EXCEPTIONS.get(word) if len(word) < 5 else None
+            if exception:
+                results[token] = AnalysisResult(original, exception, True)
+                continue
+            entry = dictionary.get(word)
+            if entry and entry.without_ending == WithoutEnding.Yes:
+                results[token] = AnalysisResult(original, entry.morpheme, True)
+                continue
+            next_pending.append(item)
+        pending = next_pending
+
+        # Roots with a grammatical ending. Words which have no valid ending, or whose
+        # root does not accept an ending, are invalid. The rest are compound words.
+        endings = [get_ending(item[2]) for item in pending]
+        for (token, original, word), ending in zip(pending, endings):
+            if ending == None:
+                results[token] = AnalysisResult(original, word, False)
+                continue
+            entry = dictionary.get(word[0:len(word) - ending.length])
+            if entry:
+                if entry.with_ending == WithEnding.Yes:
+                    boundaries = part_boundaries((entry.morpheme, ending.ending))
+                    results[token] = AnalysisResult(original, word, True, boundaries)
+                else:
+                    results[token] = AnalysisResult(original, word, False)
+            else:
+                results[token] = self.analyze_word(token, False, state)
 
-            # The morpheme list needs the ending for later analysis.
-            morpheme_list = MorphemeList(ending)
+        return [results[word] for word in words]
 
-            valid_word = find_morpheme(word_without_ending, esperanto_dictionary, 0, morpheme_list)
+    # check_words
 
-            if valid_word:
-                display_form = morpheme_list.display_form()
-                return AnalysisResult(original_word, display_form, True)
-            else:
-                return AnalysisResult(original_word, word, False)
+# end of class Checker
+
+
+# The default checker, which is used by the module functions below.
+default_checker = Checker(load_dictionary())
+
+def get_checker(checker = None):
+    """Return: the given checker, or the default checker"""
+    if checker is None: return default_checker
+    return checker
+
+def check_word(original_word):
+    """This function tests whether a word is correctly spelled.
+    (See Checker.check_word().)
+    Params:
+        original word
+    Return:
+        AnalysisResult
+    """
+    return default_checker.analyze_word(original_word, False)
 
-    return AnalysisResult(original_word, word, False)
+def is_valid_word(original_word):
+    """This function tests whether a word is correctly spelled, without
+    keeping the division into morphemes. (See Checker.is_valid_word().)
+    Params:
+        original word
+    Return:
+        True if the word is valid, False otherwise
+    """
+    return default_checker.analyze_word(original_word, True)
+
+def analyze_word(original_word, valid_only):
+    """See Checker.analyze_word()."""
+    return default_checker.analyze_word(original_word, valid_only)
 
-# check_word
+def check_words(words):
+    """This function checks the spelling of a sequence of words.
+    (See Checker.check_words().)
+    Params:
+        words - an iterable of words
+    Return:
+        list of AnalysisResult, aligned with the input words
+    """
+    return default_checker.check_words(words)
+
+def set_dictionary(dictionary):
+    """Replaces the dictionary of the default checker. See Checker.set_dictionary()."""
+    default_checker.set_dictionary(dictionary)
+
+def set_search_order(order):
+    """Sets the ordering policy for candidate morphemes. (See literumilo_order.py.)
+    Params:
+        order - ordering policy, eg. longest_first, by_rarity
+    """
+    default_checker.search_order = order
+
+def set_negative_cache(cache):
+    """Sets the cache of invalid words. None turns the cache off.
+    Params:
+        cache - NegativeCache (see literumilo_negative_cache.py), or None
+    """
+    default_checker.negative_cache = cache
+
+def set_lexicon(new_lexicon):
+    """Sets the lexicon of full word forms. None turns the lexicon off.
+    Params:
+        new_lexicon - Lexicon (see literumilo_lexicon.py), or None
+    """
+    default_checker.lexicon = new_lexicon
+
+def get_ngram_table():
+    """Return: the n-gram table for the dictionary of the default checker (set)"""
+    return default_checker.get_ngram_table()
+
+def get_dictionary_index():
+    """Return: the secondary indexes of the dictionary of the default checker (DictionaryIndex)"""
+    return default_checker.get_dictionary_index()
+
+def get_statistics():
+    """Return: a copy of the statistics of the default checker (dict)"""
+    return default_checker.get_statistics()
+
+def reset_statistics():
+    """Sets all statistics counters of the default checker to zero."""
+    default_checker.reset_statistics()
+
+# The settings of the default checker can be read as module attributes,
+# as in earlier versions, eg. literumilo_check_word.esperanto_dictionary.
+DEFAULT_CHECKER_ATTRIBUTES = {
+    "esperanto_dictionary": "dictionary",
+    "search_order": "search_order",
+    "negative_cache": "negative_cache",
+    "lexicon": "lexicon",
+    "ngram_table": "ngram_table",
+    "statistics": "statistics",
+    "dictionary_version": "version",
+    "load_time": "load_time",
+}
+
+def __getattr__(name):
+    attribute = DEFAULT_CHECKER_ATTRIBUTES.get(name)
+    if attribute is None:
+        raise AttributeError("module {} has no attribute {}".format(__name__, name))
+    return getattr(default_checker, attribute)
@@ -0,0 +1,221 @@
+#! -*- coding: utf-8
+# literumilo_checkpoint.py
+#
+# This module analyzes a large corpus file in shards, and can resume an
+# interrupted analysis where it stopped. The input is read in shards of
+# about SHARD_BYTES bytes (ending at the end of a line). For each shard,
+# two files are written to the output folder:
+#
+#   shard-00000.txt         - the analyzed text (morpheme mode only)
+#   shard-00000.counts.tsv  - counts of misspelled words: word, count
+#
+# Then the checkpoint file (checkpoint.json) is updated. It records the
+# input file with its size and modification time, the byte offset of the
+# next shard, the next shard number, the mode, and a fingerprint of the
+# dictionary. All files are written to a temporary name and renamed, so an
+# interruption never leaves a partial file. When analyze_corpus() is called
+# again for the same input, it continues from the checkpoint. If the input
+# file or the dictionary has changed since the checkpoint, the results would
+# be inconsistent, so an error is raised (unless restart is True). The counts
+# of all shards can be merged with merge_counts(). Misspelled words are
+# counted by their token in the text, in both modes, as by --counts.
+#
+# A language gate (see literumilo_language.py) can skip lines which are not
+# Esperanto. Markup is not supported, because a shard could divide a code
+# block or a comment.
+#
+# The input may be compressed (see literumilo_input.py). A compressed input
+# cannot be positioned directly, so it is decompressed up to the offset.
+# The encoding must be compatible with ASCII (eg. UTF-8, Latin-3), because
+# shards are divided at the byte '\n'.
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import io, os, json, hashlib
+
+from .literumilo_utils import WORD_PATTERN
+from .literumilo_check_word import get_checker
+from .literumilo_input import detect_compression, decompressing_reader, PrefetchReader, DEFAULT_ENCODING
+from .literumilo_aggregate import ExactCounter, read_run
+
+SHARD_BYTES = 1 << 20         # approximate size of a shard of input
+CHECKPOINT_FILE = "checkpoint.json"
+SKIP_BLOCK = 1 << 20          # bytes read at one time, to skip to the offset
+
+def dictionary_fingerprint(dictionary):
+    """Makes a fingerprint of a dictionary, which changes if any entry changes.
+    Params:
+        dictionary - a map of word data, indexed by morpheme
+    Return:
+        fingerprint (hexadecimal str)
+    """
+    digest = hashlib.blake2b(digest_size = 16)
+    for key, entry in sorted(dictionary.items(), key = lambda item: item[0]):
+        fields = (key, entry.morpheme, entry.part_of_speech, entry.meaning, entry.transitivity,
+                  entry.without_ending, entry.with_ending, entry.synthesis, entry.rarity, entry.flag)
+        digest.update("\t".join(map(str, fields)).encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+def input_status(path):
+    """Return: (size, modification time) of an input file, to detect changes"""
+    status = os.stat(path)
+    return status.st_size, status.st_mtime
+
+def write_atomic(filename, text):
+    """Writes a text file under a temporary name, then renames it."""
+    temporary = filename + ".tmp"
+    with open(temporary, "w", encoding = "utf-8") as fout:
+        fout.write(text)
+    os.replace(temporary, filename)
+
+def shard_name(folder, shard, extension):
+    """Return: file name of a shard, eg. folder/shard-00012.txt"""
+    return os.path.join(folder, "shard-{:05d}{}".format(shard, extension))
+
+def read_checkpoint(folder):
+    """Return: the checkpoint of an output folder (dict), or None"""
+    filename = os.path.join(folder, CHECKPOINT_FILE)
+    if not os.path.exists(filename): return None
+    with open(filename, "r", encoding = "utf-8") as fin:
+        return json.load(fin)
+
+def open_input(path, offset):
+    """Opens an input file (binary), which may be compressed, at the given
+    offset of the (decompressed) data. Return: binary stream"""
+    with open(path, "rb") as fin:
+        compression = detect_compression(fin.read(8))
+    if compression is None:
+        stream = open(path, "rb")
+        stream.seek(offset)
+        return stream
+    stream = io.BufferedReader(PrefetchReader(decompressing_reader(path, compression)))
+    remaining = offset
+    while remaining > 0:
+        block = stream.read(min(remaining, SKIP_BLOCK))
+        if not block: break
+        remaining -= len(block)
+    return stream
+
+def read_shard(stream, shard_bytes):
+    """Reads whole lines from a binary stream, up to about shard_bytes bytes.
+    Return: bytes (empty at the end of the input)"""
+    lines = []
+    size = 0
+    while size < shard_bytes:
+        line = stream.readline()
+        if not line: break
+        lines.append(line)
+        size += len(line)
+    return b"".join(lines)
+
+def analyze_shard(text, mode, checker, language_gate = None):
+    """Analyzes a shard of text.
+    Params:
+        text
+        mode - True = morphological analyzer, False = spell checker
+        checker - Checker
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None
+    Return:
+        (analyzed text or None, dict of misspelled word counts)
+    """
+    if language_gate is None:
+        blocks = [(text, True)]
+    else:
+        blocks = list(language_gate.split(text))
+    counts = {}
+    if mode:
+        check_word = checker.check_word
+        def divide(match):
+            token = match.group()
+            result = check_word(token)
+            if not result.valid:
+                counts[token] = counts.get(token, 0) + 1
+            return result.word
+        return "".join(WORD_PATTERN.sub(divide, block) if is_esperanto else block
+                       for block, is_esperanto in blocks), counts
+    is_valid_word = checker.is_valid_word
+    for block, is_esperanto in blocks:
+        if not is_esperanto: continue
+        for word in WORD_PATTERN.findall(block):
+            if word in counts or not is_valid_word(word):
+                counts[word] = counts.get(word, 0) + 1
+    return None, counts
+
+def analyze_corpus(input_path, folder, mode, checker = None, encoding = DEFAULT_ENCODING,
+                   shard_bytes = SHARD_BYTES, restart = False, language_gate = None):
+    """Analyzes a corpus file in shards, with a checkpoint after each shard.
+    If the output folder has a checkpoint for the same input and mode,
+    the analysis continues from the checkpoint.
+    Params:
+        input_path - corpus file (may be compressed)
+        folder - output folder (made if necessary)
+        mode - True = morphological analyzer, False = spell checker
+        checker - Checker (None = default checker)
+        encoding - text encoding of the input (compatible with ASCII)
+        shard_bytes - approximate size of a shard of input
+        restart - True to ignore an existing checkpoint
+        language_gate - LanguageGate, to skip lines which are not Esperanto, or None.
+                        Its settings are part of the checkpoint.
+    Return:
+        number of shards
+    """
+    checker = get_checker(checker)
+    fingerprint = dictionary_fingerprint(checker.dictionary)
+    size, mtime = input_status(input_path)
+    gate = None if language_gate is None else list(language_gate.settings())
+    os.makedirs(folder, exist_ok = True)
+    checkpoint = None if restart else read_checkpoint(folder)
+    if checkpoint is not None:
+        if checkpoint["input"] != os.path.abspath(input_path) or checkpoint["mode"] != mode or \
+           checkpoint.get("language_gate") != gate:
+            raise ValueError("The folder {} has a checkpoint for another analysis.".format(folder))
+        if checkpoint.get("input_size") != size or checkpoint.get("input_mtime") != mtime:
+            raise ValueError("The input file {} has changed since the checkpoint. "
+                             "Use restart = True.".format(input_path))
+        if checkpoint["dictionary"] != fingerprint:
+            raise ValueError("The dictionary has changed since the checkpoint. Use restart = True.")
+    else:
+        checkpoint = {"input": os.path.abspath(input_path), "input_size": size,
+                      "input_mtime": mtime, "mode": mode, "language_gate": gate,
+                      "offset": 0, "shard": 0,
+                      "dictionary": fingerprint, "complete": False}
+    if checkpoint["complete"]: return checkpoint["shard"]
+
+    checkpoint_file = os.path.join(folder, CHECKPOINT_FILE)
+    stream = open_input(input_path, checkpoint["offset"])
+    try:
+        while True:
+            data = read_shard(stream, shard_bytes)
+            if not data: break
+            analyzed, counts = analyze_shard(data.decode(encoding), mode, checker, language_gate)
+            shard = checkpoint["shard"]
+            if analyzed is not None:
+                write_atomic(shard_name(folder, shard, ".txt"), analyzed)
+            write_atomic(shard_name(folder, shard, ".counts.tsv"),
+                         "".join("{}\t{}\n".format(word, count) for word, count in sorted(counts.items())))
+            checkpoint["offset"] += len(data)
+            checkpoint["shard"] = shard + 1
+            write_atomic(checkpoint_file, json.dumps(checkpoint, ensure_ascii = False))
+    finally:
+        stream.close()
+    checkpoint["complete"] = True
+    write_atomic(checkpoint_file, json.dumps(checkpoint, ensure_ascii = False))
+    return checkpoint["shard"]
+
+def merge_counts(folder, counter = None):
+    """Adds the counts of misspelled words of all shards in an output folder.
+    Params:
+        folder - output folder of analyze_corpus()
+        counter - TopCounter or ExactCounter (None = new ExactCounter)
+    Return:
+        counter (call close() for an ExactCounter, to delete its temporary files)
+    """
+    if counter is None: counter = ExactCounter()
+    checkpoint = read_checkpoint(folder)
+    shards = checkpoint["shard"] if checkpoint else 0
+    for shard in range(shards):
+        for word, count in read_run(shard_name(folder, shard, ".counts.tsv")):
+            counter.add(word, count)
+    return counter
@@ -0,0 +1,224 @@
+#! -*- coding: utf-8
+# literumilo_columns.py
+#
+# This module analyzes a column of words, for data pipelines, and returns
+# the results as parallel columns, instead of an AnalysisResult per word:
+#
+#   valid        - 1 = valid, 0 = not valid (array of unsigned bytes)
+#   segmentation - the word divided into morphemes, eg. 'mis.kompren.it.aj'
+#   root         - the last root (the head of a compound), eg. 'kompren'
+#   ending       - the grammatical ending, eg. 'aj' ('' if none)
+#   pos          - part of speech of the word (POS value, 0 = unknown)
+#   morphemes    - number of morphemes, without the ending and separators
+#   meaning      - meaning of the root (Meaning value, 0 = unknown)
+#
+# Numeric columns are arrays (array module). Text columns are StringColumns,
+# which have the layout of an Arrow string array: a buffer of UTF-8 bytes,
+# and an array of offsets (int32), one more than the number of words.
+#
+# Each distinct word is analyzed once (see Checker.check_words()). The columns
+# are then filled from the results of the distinct words, by C-level map()
+# and join(), so no Python object is made for each word.
+#
+# NumPy and pyarrow are optional. If they are installed, ColumnBatch.to_numpy()
+# and ColumnBatch.to_arrow() make arrays which share the buffers (no copy).
+#
+# Example:
+#
+#     batch = analyze_column(words)
+#     for valid, root in zip(batch.valid, batch.root): ...
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+from array import array
+from itertools import accumulate, chain
+
+from .literumilo_ending import ENDINGS
+from .literumilo_check_word import get_checker
+from .literumilo_index import classify_parts
+
+# NumPy and pyarrow are optional.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ENDING_POS = {ending.ending: ending.part_of_speech for ending in ENDINGS}
+JOIN_BLOCK = 65536   # strings joined at one time
+COLUMNS = ("valid", "segmentation", "root", "ending", "pos", "morphemes", "meaning")
+
+
+class StringColumn:
+    """A column of strings, as UTF-8 bytes and offsets (Arrow layout).
+    The string at index i is data[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, offsets, data):
+        """
+        Params:
+            offsets - array('i'), one more than the number of strings
+            data - bytes or bytearray (UTF-8)
+        """
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("StringColumn, bad index")
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+    def __iter__(self):
+        data = self.data
+        offsets = self.offsets
+        for index in range(len(offsets) - 1):
+            yield data[offsets[index]:offsets[index + 1]].decode("utf-8")
+
+    def to_list(self):
+        """Return: list of str"""
+        return list(self)
+
+# end of class StringColumn
+
+
+def make_string_column(rows, ids):
+    """Makes a StringColumn from the encoded strings of distinct words.
+    Params:
+        rows - list of bytes, one per distinct word
+        ids - array of row numbers, one per word
+    Return:
+        StringColumn
+    """
+    lengths = [len(row) for row in rows]
+    offsets = array("i", chain((0,), accumulate(map(lengths.__getitem__, ids))))
+    # The strings are joined in blocks, because join() needs memory
+    # for every item it joins.
+    data = bytearray()
+    for start in range(0, len(ids), JOIN_BLOCK):
+        data += b"".join(map(rows.__getitem__, ids[start:start + JOIN_BLOCK]))
+    return StringColumn(offsets, data)
+
+
+class ColumnBatch:
+    """The results of analyze_column(), as parallel columns.
+    See the description above.
+    """
+
+    def __init__(self, valid, segmentation, root, ending, pos, morphemes, meaning):
+        self.valid = valid
+        self.segmentation = segmentation
+        self.root = root
+        self.ending = ending
+        self.pos = pos
+        self.morphemes = morphemes
+        self.meaning = meaning
+
+    def __len__(self):
+        return len(self.valid)
+
+    def columns(self):
+        """Return: dict of the columns, by name"""
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def to_numpy(self):
+        """Makes NumPy arrays which share the buffers of the columns.
+        A string column becomes a tuple: (offsets (int32), data (uint8)).
+        Return:
+            dict of arrays, by name
+        """
+        if numpy is None:
+            raise ImportError("ColumnBatch.to_numpy() needs NumPy. (pip install numpy)")
+        arrays = {"valid": numpy.frombuffer(self.valid, dtype = numpy.bool_)}
+        for name in ("segmentation", "root", "ending"):
+            column = getattr(self, name)
+            arrays[name] = (numpy.frombuffer(column.offsets, dtype = numpy.int32),
+                            numpy.frombuffer(column.data, dtype = numpy.uint8))
+        arrays["pos"] = numpy.frombuffer(self.pos, dtype = numpy.int8)
+        arrays["morphemes"] = numpy.frombuffer(self.morphemes, dtype = numpy.int8)
+        arrays["meaning"] = numpy.frombuffer(self.meaning, dtype = numpy.int16)
+        return arrays
+
+    def to_arrow(self):
+        """Makes a pyarrow RecordBatch which shares the buffers of the columns.
+        (The valid column is converted to Arrow's bit-packed booleans.)
+        Return:
+            pyarrow.RecordBatch
+        """
+        if pyarrow is None:
+            raise ImportError("ColumnBatch.to_arrow() needs pyarrow. (pip install pyarrow)")
+        n = len(self)
+        def numeric(values, arrow_type):
+            return pyarrow.Array.from_buffers(arrow_type, n, [None, pyarrow.py_buffer(values)])
+        def strings(column):
+            return pyarrow.Array.from_buffers(pyarrow.utf8(), n, [None,
+                       pyarrow.py_buffer(column.offsets), pyarrow.py_buffer(column.data)])
+        arrays = [numeric(self.valid, pyarrow.uint8()).cast(pyarrow.bool_()),
+                  strings(self.segmentation), strings(self.root), strings(self.ending),
+                  numeric(self.pos, pyarrow.int8()), numeric(self.morphemes, pyarrow.int8()),
+                  numeric(self.meaning, pyarrow.int16())]
+        return pyarrow.RecordBatch.from_arrays(arrays, names = list(COLUMNS))
+
+# end of class ColumnBatch
+
+
+def describe_result(word, result, dictionary):
+    """Finds the values of the columns for one distinct word.
+    Params:
+        word
+        result - AnalysisResult
+        dictionary - a map of word data
+    Return:
+        (valid, segmentation, root, ending, pos, morphemes, meaning)
+        (Strings are UTF-8 bytes.)
+    """
+    segmentation = result.word.encode("utf-8")
+    if not result.valid:
+        return (0, segmentation, b"", b"", 0, 0, 0)
+    parts = result.word.lower().split(".")
+    morphemes, ending = classify_parts(parts, dictionary)
+    roots = [item for item in morphemes if item[2] == "root"]
+    index, root, kind, entry = roots[-1] if roots else morphemes[-1]
+    if ending is not None and ending in ENDING_POS:
+        pos = ENDING_POS[ending]
+    else:
+        # A word without an ending (eg. 'ne'), or a pronoun with -n (vi.n).
+        pos = entry.part_of_speech if entry is not None else 0
+    meaning = entry.meaning.value if entry is not None else 0
+    return (1, segmentation, root.encode("utf-8"), (ending or "").encode("utf-8"),
+            pos, len(morphemes), meaning)
+
+def analyze_column(words, checker = None):
+    """Analyzes a column of words. See the description above.
+    Params:
+        words - a sequence or iterable of words, or a pyarrow string array
+        checker - Checker (None = default checker)
+    Return:
+        ColumnBatch
+    """
+    if hasattr(words, "to_pylist"): words = words.to_pylist()
+    elif not isinstance(words, (list, tuple)): words = list(words)
+    checker = get_checker(checker)
+    distinct = list(dict.fromkeys(words))
+    row_of = {word: row for row, word in enumerate(distinct)}
+    ids = array("i", map(row_of.__getitem__, words))   # row number of each word
+    results = checker.check_words(distinct)
+    dictionary = checker.dictionary
+    rows = [describe_result(word, result, dictionary) for word, result in zip(distinct, results)]
+    valid, segmentation, root, ending, pos, morphemes, meaning = \
+        zip(*rows) if rows else ((),) * len(COLUMNS)
+    return ColumnBatch(array("B", map(valid.__getitem__, ids)),
+                       make_string_column(segmentation, ids),
+                       make_string_column(root, ids),
+                       make_string_column(ending, ids),
+                       array("b", map(pos.__getitem__, ids)),
+                       array("b", map(morphemes.__getitem__, ids)),
+                       array("h", map(meaning.__getitem__, ids)))
@@ -0,0 +1,254 @@
+#! -*- coding: utf-8
+# literumilo_compact.py
+#
+# This module defines a compact, read-only form of the Esperanto dictionary.
+# A Python dict of about 10,000 string keys, with an EspDictEntry object
+# for each key, uses a lot of memory. The compact dictionary has:
+#
+#   - a minimal perfect hash function over the keys (hash and displace),
+#     made from a blake2b hash of each key, with double hashing,
+#   - one contiguous UTF-8 string pool for the keys and morphemes,
+#   - arrays of small integers for the other fields of the entries.
+#
+# The method get() is O(1). It hashes the key, confirms that the key is
+# in the pool, and creates an EspDictEntry from the arrays. Because a new
+# entry is created for each lookup, changes made by the suffix checks
+# (literumilo_suffix.py) never alter the dictionary.
+#
+# The compact dictionary has the same lookup interface as a dict, so it can
+# replace the dict which is used by find_morpheme() and check_word().
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import struct, hashlib
+from array import array
+
+from .literumilo_entry import *
+
+BUCKET_SIZE = 2    # average number of keys per bucket of the hash function
+MAX_SEED = 10000   # seeds which are tried for a bucket
+MAX_SALT = 8       # hash functions which are tried, before an error is raised
+
+# Enumerations are stored by value.
+TRANSITIVITY = {t.value: t for t in Transitivity}
+WITHOUT_ENDING = {w.value: w for w in WithoutEnding}
+WITH_ENDING = {w.value: w for w in WithEnding}
+SYNTHESIS = {s.value: s for s in Synthesis}
+MEANING = {m.value: m for m in Meaning}
+
+HASH_FORMAT = struct.Struct("<QII")    # bucket hash, h1, h2
+hashers = {}    # blake2b hash objects with a salt, by salt. They are copied.
+
+def hash_key(key_bytes, salt = 0):
+    """Hashes a key. The salt selects a different hash function.
+    The slot of a key, for the seed of its bucket, is (h1 + seed * h2) % n.
+    (Double hashing: two keys which have the same slot for one seed
+    usually have different slots for the next seed.)
+    Params:
+        key_bytes - key (bytes)
+        salt - number of the hash function (int)
+    Return:
+        (bucket hash, h1, h2)
+    """
+    hasher = hashers.get(salt)
+    if hasher is None:
+        hasher = hashlib.blake2b(digest_size = 16, salt = salt.to_bytes(8, "little"))
+        hashers[salt] = hasher
+    hasher = hasher.copy()
+    hasher.update(key_bytes)
+    bucket_hash, h1, h2 = HASH_FORMAT.unpack(hasher.digest())
+    return bucket_hash, h1, h2 | 1
+
+def place_keys(hashes):
+    """Tries to make a minimal perfect hash function with one hash function.
+    Params:
+        hashes - list of (bucket hash, h1, h2) of the keys, see hash_key()
+    Return:
+        (displacements, slots), or None if a bucket could not be placed
+    """
+    n = len(hashes)
+    number_of_buckets = n // BUCKET_SIZE + 1
+    buckets = [[] for _ in range(number_of_buckets)]
+    for index, (bucket_hash, h1, h2) in enumerate(hashes):
+        buckets[bucket_hash % number_of_buckets].append(index)
+    order = sorted(range(number_of_buckets), key = lambda b: -len(buckets[b]))
+
+    displacements = array("i", [0] * number_of_buckets)
+    slots = [None] * n
+    occupied = bytearray(n)
+    free_slot = 0
+    for b in order:
+        bucket = buckets[b]
+        if len(bucket) == 0: break
+        if len(bucket) == 1:
+            while occupied[free_slot]: free_slot += 1
+            occupied[free_slot] = 1
+            slots[bucket[0]] = free_slot
+            displacements[b] = -free_slot - 1
+            continue
+        for seed in range(1, MAX_SEED + 1):
+            candidate = [(hashes[i][1] + seed * hashes[i][2]) % n for i in bucket]
+            if len(set(candidate)) == len(candidate) and \
+               not any(occupied[slot] for slot in candidate):
+                break
+        else:
+            return None
+        for i, slot in zip(bucket, candidate):
+            occupied[slot] = 1
+            slots[i] = slot
+        displacements[b] = seed
+    return displacements, slots
+
+def make_perfect_hash(keys):
+    """Makes a minimal perfect hash function for the given keys.
+    The keys are distributed into buckets. For each bucket, from largest
+    to smallest, a seed is found which puts all its keys into free slots.
+    Buckets with only one key are put directly into a free slot. The
+    displacement of a bucket is the seed (positive), or -(slot + 1) for a
+    direct slot, or 0 for an empty bucket. If no seed up to MAX_SEED works
+    for a bucket, another hash function (salt) is tried.
+    Params:
+        keys - list of bytes (distinct)
+    Return:
+        (displacements, slots, salt) - displacement array, slot of each key,
+        and the number of the hash function
+    """
+    for salt in range(MAX_SALT):
+        result = place_keys([hash_key(key, salt) for key in keys])
+        if result is not None:
+            displacements, slots = result
+            return displacements, slots, salt
+    raise ValueError("CompactDictionary, cannot make a perfect hash for {} keys.".format(len(keys)))
+# make_perfect_hash
+
+
+class CompactDictionary:
+    """A read-only dictionary of morphemes, with a minimal perfect hash,
+    a UTF-8 string pool, and array-backed entry fields.
+    """
+
+    def __init__(self, dictionary):
+        """
+        Params:
+            dictionary - a map of word data, indexed by morpheme (see make_dictionary())
+        """
+        keys = [key.encode("utf-8") for key in dictionary]
+        entries = list(dictionary.values())
+        n = len(keys)
+        self.size = n
+        self.displacements, slots, self.salt = make_perfect_hash(keys)
+
+        # Put the keys and morphemes into the string pool, in slot order.
+        by_slot = [None] * n
+        for index, slot in enumerate(slots):
+            by_slot[slot] = index
+        pool = bytearray()
+        self.key_offsets = array("I", [0] * (n + 1))
+        self.morpheme_offsets = array("I", [0] * (n + 1))
+        self.part_of_speech = array("B", [0] * n)
+        self.meaning = array("B", [0] * n)
+        self.transitivity = array("B", [0] * n)
+        self.without_ending = array("B", [0] * n)
+        self.with_ending = array("B", [0] * n)
+        self.synthesis = array("B", [0] * n)
+        self.rarity = array("B", [0] * n)
+        self.flag = array("B", [0] * n)
+        self.flags = []    # distinct flags, eg. 'R', 'K'
+        for slot, index in enumerate(by_slot):
+            entry = entries[index]
+            self.key_offsets[slot] = len(pool)
+            pool += keys[index]
+            self.morpheme_offsets[slot] = len(pool)
+            pool += entry.morpheme.encode("utf-8")
+            self.part_of_speech[slot] = entry.part_of_speech
+            self.meaning[slot] = entry.meaning.value
+            self.transitivity[slot] = entry.transitivity.value
+            self.without_ending[slot] = entry.without_ending.value
+            self.with_ending[slot] = entry.with_ending.value
+            self.synthesis[slot] = entry.synthesis.value
+            self.rarity[slot] = entry.rarity
+            if entry.flag not in self.flags:
+                self.flags.append(entry.flag)
+            self.flag[slot] = self.flags.index(entry.flag)
+        self.key_offsets[n] = len(pool)
+        self.morpheme_offsets[n] = len(pool)
+        self.pool = bytes(pool)
+
+    def find_slot(self, key):
+        """Finds the slot of a key.
+        Params:
+            key (str)
+        Return:
+            slot (int), or -1 if the key is not in the dictionary
+        """
+        if self.size == 0: return -1
+        key_bytes = key.encode("utf-8")
+        bucket_hash, h1, h2 = hash_key(key_bytes, self.salt)
+        d = self.displacements[bucket_hash % len(self.displacements)]
+        if d < 0:
+            slot = -d - 1
+        elif d > 0:
+            slot = (h1 + d * h2) % self.size
+        else:
+            return -1
+        start = self.key_offsets[slot]
+        if self.pool[start:self.morpheme_offsets[slot]] == key_bytes:
+            return slot
+        return -1
+
+    def key_at(self, slot):
+        """Return: key (str) in the given slot"""
+        return self.pool[self.key_offsets[slot]:self.morpheme_offsets[slot]].decode("utf-8")
+
+    def entry_at(self, slot):
+        """Creates a dictionary entry from the arrays.
+        Params:
+            slot
+        Return:
+            EspDictEntry
+        """
+        morpheme = self.pool[self.morpheme_offsets[slot]:self.key_offsets[slot + 1]]
+        return EspDictEntry.from_values(morpheme.decode("utf-8"),
+                                        self.part_of_speech[slot],
+                                        MEANING[self.meaning[slot]],
+                                        TRANSITIVITY[self.transitivity[slot]],
+                                        WITHOUT_ENDING[self.without_ending[slot]],
+                                        WITH_ENDING[self.with_ending[slot]],
+                                        SYNTHESIS[self.synthesis[slot]],
+                                        self.rarity[slot],
+                                        self.flags[self.flag[slot]])
+
+    def get(self, key, default = None):
+        slot = self.find_slot(key)
+        if slot < 0: return default
+        return self.entry_at(slot)
+
+    def __getitem__(self, key):
+        slot = self.find_slot(key)
+        if slot < 0: raise KeyError(key)
+        return self.entry_at(slot)
+
+    def __contains__(self, key):
+        return self.find_slot(key) >= 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        for slot in range(self.size):
+            yield self.key_at(slot)
+
+    def values(self):
+        for slot in range(self.size):
+            yield self.entry_at(slot)
+
+    def items(self):
+        for slot in range(self.size):
+            yield self.key_at(slot), self.entry_at(slot)
+
+# end of class CompactDictionary
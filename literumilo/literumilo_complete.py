@@ -0,0 +1,238 @@
+#! -*- coding: utf-8
+# literumilo_complete.py
+#
+# This module completes words, for typeahead in input fields. complete()
+# takes the beginning of a word (a prefix), and returns valid words which
+# start with it, most common first.
+#
+# The index has every word form which can be made from one morpheme of the
+# dictionary: the morpheme with each grammatical ending (see literumilo_ending.py),
+# or the morpheme alone, if it is valid without an ending. The forms are kept
+# in sorted lists, one list for each level of rank, and the forms which start
+# with a prefix are found by binary search (bisect) in each list. The levels are:
+#
+#   1. the dictionary form of each morpheme (hundo, granda, iri, kaj),
+#      by rarity (0 = very common, first)
+#   2. the other forms (hundoj, grandan, iris), by rarity
+#
+# If there are not enough of these, the completions continue with compound
+# words: a prefix morpheme and a form from the index ('malgr' -> 'malgranda'),
+# or a root and a form of a suffix ('hundet' -> 'hundeto', 'hundeta',
+# 'hundetoj'). Every completion is checked by is_valid_word(), so only valid
+# words are returned.
+#
+# The index is made when it is first needed, and made again if the dictionary
+# of the Checker changes. The tables of the Checker (the n-gram table) are
+# made at the same time, so the first completion is as fast as the others.
+# This takes about half a second. A Completer can be shared by threads.
+#
+# Example:
+#
+#     complete("hun", 5)    # ['hundo', 'Hungario', 'hungaro', 'huno', 'Hunano']
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+from bisect import bisect_left
+
+from .literumilo_entry import POS, Cap, Synthesis, WithEnding, WithoutEnding
+from .literumilo_ending import ENDINGS
+from .literumilo_utils import x_to_accent
+from .literumilo_check_word import get_checker
+
+LIMIT = 10           # default number of completions
+MAX_RARITY = 5
+CHECKS_PER_RESULT = 2   # compound candidates checked, per completion which is wanted
+
+# The ending of the dictionary form, by part of speech.
+DICTIONARY_ENDINGS = {
+    POS.Substantive: "o",
+    POS.SubstantiveVerb: "o",
+    POS.Verb: "i",
+    POS.Adjective: "a",
+    POS.Adverb: "e",
+}
+DEFAULT_ENDING = "o"
+# After the dictionary form, these endings come first.
+MAIN_ENDINGS = ("o", "a", "i", "e")
+
+def dictionary_ending(entry):
+    """Return: the ending of the dictionary form of a morpheme, eg. 'o' for 'hund'"""
+    return DICTIONARY_ENDINGS.get(entry.part_of_speech, DEFAULT_ENDING)
+
+def morpheme_forms(key, entry):
+    """Makes the word forms of a morpheme: the morpheme alone, if it is valid
+    without an ending, and the morpheme with each ending.
+    Params:
+        key - morpheme, eg. 'hund'
+        entry - its entry in the dictionary
+    Return:
+        list of forms. The first is the dictionary form (hundo, kaj), then
+        the forms with the MAIN_ENDINGS (hunda, hundi, hunde), then the others.
+    """
+    forms = []
+    if entry.without_ending == WithoutEnding.Yes:
+        forms.append(key)
+    if entry.with_ending == WithEnding.Yes:
+        first = dictionary_ending(entry)
+        endings = [first] + [ending for ending in MAIN_ENDINGS if ending != first]
+        endings += [ending.ending for ending in ENDINGS if ending.ending not in endings]
+        forms.extend(key + ending for ending in endings)
+    return forms
+
+def display_form(form, entry):
+    """Return: the form with the capitalization of the morpheme, eg. 'Kanado'"""
+    if entry.capitalization == Cap.Majuscule:
+        return form[:1].upper() + form[1:]
+    return form
+
+
+class CompletionIndex:
+    """The sorted word forms of a dictionary. See the description above."""
+
+    def __init__(self, dictionary, signature = None):
+        """
+        Params:
+            dictionary - a map of word data, indexed by morpheme
+            signature - signature of the dictionary (see Checker.dictionary_signature())
+        """
+        self.signature = signature
+        levels = [[] for n in range(2 * (MAX_RARITY + 1))]
+        prefixes = []
+        suffixes = []
+        for key, entry in dictionary.items():
+            rarity = min(MAX_RARITY, max(0, entry.rarity))
+            forms = morpheme_forms(key, entry)
+            if forms:
+                levels[rarity].append((forms[0], display_form(forms[0], entry)))
+            other = levels[MAX_RARITY + 1 + rarity]
+            for form in forms[1:]:
+                other.append((form, display_form(form, entry)))
+            if entry.synthesis == Synthesis.Prefix:
+                prefixes.append(key)
+            elif entry.synthesis == Synthesis.Suffix:
+                suffixes.append((rarity, key, forms))
+        self.levels = []    # list of (forms, display forms)
+        for level in levels:
+            level.sort()
+            self.levels.append(([form for form, display in level],
+                                [display for form, display in level]))
+        self.prefixes = sorted(prefixes, key = len, reverse = True)
+        # (suffix, forms of the suffix), eg. ('et', ['eto', 'eton', 'etoj'...])
+        self.suffixes = [(key, forms) for rarity, key, forms in sorted(suffixes)]
+
+    def __len__(self):
+        return sum(len(forms) for forms, displays in self.levels)
+
+    def iter_forms(self, prefix):
+        """Generator which yields the forms which start with the prefix, in order of rank.
+        Params:
+            prefix (lower case)
+        Return:
+            (form, display form) tuples
+        """
+        for forms, displays in self.levels:
+            index = bisect_left(forms, prefix)
+            length = len(forms)
+            while index < length:
+                form = forms[index]
+                if not form.startswith(prefix): break
+                yield form, displays[index]
+                index += 1
+
+# end of class CompletionIndex
+
+
+class Completer:
+    """Completes words. See the description above."""
+
+    def __init__(self, checker = None):
+        """
+        Params:
+            checker - Checker (None = default checker). Its dictionary is indexed.
+        """
+        self.checker = get_checker(checker)
+        self.index = None      # made when it is needed
+
+    def get_index(self):
+        """Return: the CompletionIndex. It is made again if the dictionary has changed.
+        The tables of the checker are made too, if they have not been made."""
+        index = self.index
+        signature = self.checker.dictionary_signature()
+        if index is None or index.signature != signature:
+            index = CompletionIndex(self.checker.dictionary, signature)
+            # The checker makes its n-gram table when it is first needed.
+            # It is made now, so the first completion is not slow.
+            self.checker.get_ngram_table()
+            self.index = index
+        return index
+
+    def complete(self, prefix, limit = LIMIT):
+        """Finds valid words which start with the prefix.
+        Params:
+            prefix - beginning of a word. Accents can be represented by 'x' (cx = ĉ).
+            limit - maximum number of words
+        Return:
+            list of words, most common first
+        """
+        prefix = x_to_accent(prefix.strip()).lower()
+        if not prefix or limit < 1: return []
+        index = self.get_index()
+        is_valid_word = self.checker.is_valid_word
+        results = []
+        seen = set()
+
+        def add(form, display):
+            if form in seen or not is_valid_word(form): return False
+            seen.add(form)
+            results.append(display)
+            return len(results) >= limit
+
+        for form, display in index.iter_forms(prefix):
+            if add(form, display): return results
+
+        # Compound words: prefix morpheme + word form, eg. mal + granda.
+        checks = CHECKS_PER_RESULT * (limit - len(results))
+        for morpheme in index.prefixes:
+            if len(prefix) <= len(morpheme) or not prefix.startswith(morpheme): continue
+            for form, display in index.iter_forms(prefix[len(morpheme):]):
+                if checks <= 0: break
+                checks -= 1
+                if add(morpheme + form, morpheme + form): return results
+
+        # Compound words: root + a form of a suffix, eg. hund + eto, hund + etoj.
+        dictionary = self.checker.dictionary
+        checks = CHECKS_PER_RESULT * (limit - len(results))
+        for end in range(len(prefix), 1, -1):
+            root = prefix[:end]
+            entry = dictionary.get(root)
+            if entry is None or entry.with_ending != WithEnding.Yes: continue
+            rest = prefix[end:]
+            for suffix, forms in index.suffixes:
+                if not (suffix.startswith(rest) or rest.startswith(suffix)): continue
+                for form in forms:
+                    if not form.startswith(rest): continue
+                    if checks <= 0: return results
+                    checks -= 1
+                    word = root + form
+                    if add(word, display_form(word, entry)): return results
+        return results
+
+# end of class Completer
+
+
+default_completer = None
+
+def complete(prefix, limit = LIMIT):
+    """Finds valid words which start with the prefix, with the default checker.
+    Params:
+        prefix - beginning of a word
+        limit - maximum number of words
+    Return:
+        list of words, most common first
+    """
+    global default_completer
+    if default_completer is None:
+        default_completer = Completer()
+    return default_completer.complete(prefix, limit)
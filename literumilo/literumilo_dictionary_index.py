@@ -0,0 +1,145 @@
+#! -*- coding: utf-8
+# literumilo_dictionary_index.py
+#
+# This module defines secondary indexes of the dictionary. The dictionary is
+# indexed by morpheme, but tools often need all morphemes with some property,
+# for example, all roots which represent people, or all morphemes with
+# limited synthesis. Without an index, that needs a scan of the whole
+# dictionary. A DictionaryIndex has, for each field of the entries (part of
+# speech, meaning, synthesis, rarity, capitalization, etc.), a map from each
+# value to the sorted morphemes which have that value.
+#
+# The index is read-only. A Checker makes it when it is first needed (see
+# Checker.get_dictionary_index()), and makes it again after the dictionary
+# has changed. The reloader makes it when it loads the dictionary.
+#
+# Example:
+#
+#     index = get_dictionary_index()
+#     people = index.query(meaning = PERSON_MEANINGS)
+#     limited = index.morphemes("synthesis", Synthesis.Limited)
+#     common_verbs = index.query(part_of_speech = POS.Verb, rarity = [0, 1])
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+FIELDS = ("part_of_speech", "meaning", "synthesis", "rarity", "capitalization",
+          "transitivity", "without_ending", "with_ending", "flag")
+
+# Types of criteria which mean 'any of these values'.
+COLLECTIONS = (set, frozenset, list, tuple)
+
+
+class DictionaryIndex:
+    """Secondary indexes of a dictionary. See the description above."""
+
+    def __init__(self, dictionary):
+        """
+        Params:
+            dictionary - a map of word data, indexed by morpheme
+        """
+        self.dictionary = dictionary
+        self.changes = getattr(dictionary, "changes", 0)    # see LayeredDictionary
+        postings = {field: {} for field in FIELDS}
+        keys = []
+        for key, entry in dictionary.items():
+            keys.append(key)
+            for field in FIELDS:
+                postings[field].setdefault(getattr(entry, field), []).append(key)
+        self.all_keys = tuple(sorted(keys))
+        # field -> value -> sorted tuple of morphemes
+        self.postings = {field: {value: tuple(sorted(morphemes))
+                                 for value, morphemes in values.items()}
+                         for field, values in postings.items()}
+        self.sets = {}     # (field, value) -> frozenset, made for queries
+
+    def __len__(self):
+        return len(self.all_keys)
+
+    def check_field(self, field):
+        """Raises a ValueError if the field is not indexed."""
+        if field not in self.postings:
+            raise ValueError("DictionaryIndex, unknown field: {}. Fields: {}".format(
+                             field, ", ".join(FIELDS)))
+
+    def morphemes(self, field, value):
+        """Finds the morphemes which have the given value.
+        Params:
+            field - eg. 'meaning'
+            value - eg. Meaning.PERSONO
+        Return:
+            sorted tuple of morphemes (keys of the dictionary)
+        """
+        self.check_field(field)
+        return self.postings[field].get(value, ())
+
+    def count(self, field, value):
+        """Return: the number of morphemes which have the given value"""
+        return len(self.morphemes(field, value))
+
+    def values(self, field):
+        """Finds the values of a field, and how many morphemes have each value.
+        Params:
+            field - eg. 'synthesis'
+        Return:
+            dict of value -> number of morphemes
+        """
+        self.check_field(field)
+        return {value: len(morphemes) for value, morphemes in self.postings[field].items()}
+
+    def matching_values(self, field, criterion):
+        """Return: list of the values of a field which match a criterion: a value,
+        a collection of values (set, list...), or a function which takes a value"""
+        self.check_field(field)
+        values = self.postings[field]
+        if callable(criterion) and not isinstance(criterion, type):
+            return [value for value in values if criterion(value)]
+        if isinstance(criterion, COLLECTIONS):
+            return [value for value in criterion if value in values]
+        return [criterion] if criterion in values else []
+
+    def value_set(self, field, value):
+        """Return: frozenset of the morphemes which have the given value"""
+        key = (field, value)
+        morphemes = self.sets.get(key)
+        if morphemes is None:
+            morphemes = frozenset(self.postings[field].get(value, ()))
+            self.sets[key] = morphemes
+        return morphemes
+
+    def query(self, **criteria):
+        """Finds the morphemes which match all criteria. A criterion is a
+        value, a collection of values (any of them), or a function which
+        takes a value and returns True or False. For example:
+            index.query(meaning = PERSON_MEANINGS, synthesis = Synthesis.Limited)
+            index.query(part_of_speech = POS.Verb, rarity = lambda rarity: rarity < 2)
+        Params:
+            field = criterion, for any of the FIELDS
+        Return:
+            sorted tuple of morphemes
+        """
+        if not criteria: return self.all_keys
+        groups = []
+        for field, criterion in criteria.items():
+            values = self.matching_values(field, criterion)
+            if len(values) == 1:
+                groups.append(self.postings[field][values[0]])
+            else:
+                groups.append(frozenset().union(*[self.value_set(field, value) for value in values]))
+        groups.sort(key = len)      # Start with the smallest group.
+        result = set(groups[0])
+        for group in groups[1:]:
+            if not result: break
+            result.intersection_update(group)
+        return tuple(sorted(result))
+
+    def entries(self, **criteria):
+        """Finds the entries which match all criteria (see query()).
+        Return:
+            list of (morpheme, EspDictEntry) tuples, sorted by morpheme
+        """
+        dictionary = self.dictionary
+        return [(key, dictionary[key]) for key in self.query(**criteria)]
+
+# end of class DictionaryIndex
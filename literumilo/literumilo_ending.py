@@ -4,7 +4,7 @@
 # Define the grammatical endings (finaĵoj) of Esperanto words.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-05-01
+# Last edit date: 2026-10-19
 
 from .literumilo_entry import *
 
@@ -33,6 +33,10 @@ ADJ_AJN = Ending("ajn", POS.Adjective)
 ADV_E = Ending("e", POS.Adverb)
 ADV_EN = Ending("en", POS.Adverb)
 
+# All grammatical endings.
+ENDINGS = [SUB_O, SUB_ON, SUB_OJ, SUB_OJN, VERB_IS, VERB_AS, VERB_OS, VERB_I,
+           VERB_U, VERB_US, ADJ_A, ADJ_AN, ADJ_AJ, ADJ_AJN, ADV_E, ADV_EN]
+
 def get_ending(word):
     """This function checks whether the given word has a valid Esperanto ending.
     If it does, an Ending object is returned. In not, it returns None.
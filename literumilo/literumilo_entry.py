@@ -4,7 +4,7 @@
 # This file defines an entry for the Esperanto dictionary.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-05-01
+# Last edit date: 2026-10-19
 #
 
 import sys
@@ -194,6 +194,15 @@ class Meaning(enum.Enum):
     GEOMETRIO = 118
 
 
+# Meanings which represent people, and animals. These sets can also be used
+# to query a DictionaryIndex, eg. index.query(meaning = PERSON_MEANINGS).
+PERSON_MEANINGS = frozenset([Meaning.PERSONO, Meaning.PARENCO, Meaning.ETNO, Meaning.PROFESIO,
+                             Meaning.RANGO, Meaning.REGANTO, Meaning.TITOLO, Meaning.POSTENO,
+                             Meaning.RELPOSTENO, Meaning.RELPROFESIO, Meaning.MITPERSONO])
+ANIMAL_MEANINGS = frozenset([Meaning.ANIMALO, Meaning.MAMULO, Meaning.BIRDO, Meaning.FISXO,
+                             Meaning.REPTILIO, Meaning.MITBESTO, Meaning.INSEKTO,
+                             Meaning.ARAKNIDO, Meaning.MOLUSKO, Meaning.AMFIBIO])
+
 def is_person(meaning):
     """This function checks whether the given meaning represents a person.
     Params:
@@ -201,18 +210,7 @@ def is_person(meaning):
     Return:
         True if person, False otherwise
     """
-    if meaning == Meaning.PERSONO: return True
-    if meaning == Meaning.PARENCO: return True
-    if meaning == Meaning.ETNO: return True
-    if meaning == Meaning.PROFESIO: return True
-    if meaning == Meaning.RANGO: return True
-    if meaning == Meaning.REGANTO: return True
-    if meaning == Meaning.TITOLO: return True
-    if meaning == Meaning.POSTENO: return True
-    if meaning == Meaning.RELPOSTENO: return True
-    if meaning == Meaning.RELPROFESIO: return True
-    if meaning == Meaning.MITPERSONO: return True
-    return False
+    return meaning in PERSON_MEANINGS
 # is_person()
 
 def is_animal(meaning):
@@ -222,17 +220,7 @@ def is_animal(meaning):
     Return:
         True if animal, False otherwise
     """
-    if meaning == Meaning.ANIMALO: return True
-    if meaning == Meaning.MAMULO: return True
-    if meaning == Meaning.BIRDO: return True
-    if meaning == Meaning.FISXO: return True
-    if meaning == Meaning.REPTILIO: return True
-    if meaning == Meaning.MITBESTO: return True
-    if meaning == Meaning.INSEKTO: return True
-    if meaning == Meaning.ARAKNIDO: return True
-    if meaning == Meaning.MOLUSKO: return True
-    if meaning == Meaning.AMFIBIO: return True
-    return False
+    return meaning in ANIMAL_MEANINGS
 # is_animal()
 
 class EspDictEntry:
@@ -335,6 +323,29 @@ class EspDictEntry:
         self.rarity = int(data_array[7])
         self.flag = data_array[8]
 
+    @classmethod
+    def from_values(cls, morpheme, part_of_speech, meaning, transitivity,
+                    without_ending, with_ending, synthesis, rarity, flag):
+        """This function creates an entry from values which have already
+        been parsed, for example, by a compact dictionary.
+        Params: morpheme, part of speech, meaning, transitivity, without-ending,
+                with-ending, synthesis, rarity, flag
+        Return: dictionary entry
+        """
+        entry = cls.__new__(cls)
+        entry.morpheme = morpheme
+        entry.length = len(morpheme)
+        entry.capitalization = entry.get_capitalization(morpheme)
+        entry.part_of_speech = part_of_speech
+        entry.meaning = meaning
+        entry.transitivity = transitivity
+        entry.without_ending = without_ending
+        entry.with_ending = with_ending
+        entry.synthesis = synthesis
+        entry.rarity = rarity
+        entry.flag = flag
+        return entry
+
     @classmethod
     def new_separator(cls, separator):
         """This function creates an entry to define a 'separator', that is, a grammatical
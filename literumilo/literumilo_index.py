@@ -0,0 +1,243 @@
+#! -*- coding: utf-8
+# literumilo_index.py
+#
+# This module is an analyzer for search engines. It divides a text into
+# index tokens, so that a document which has 'miskomprenitaj' can be found
+# by a query for 'kompren'. Each word is divided by check_word(), the
+# grammatical ending is removed, and the morphemes become tokens, with their
+# character offsets in the text and the position of the word.
+#
+# There are three kinds of output:
+#
+#   roots     - only the roots, eg. 'kompren'
+#               (If a word has no root, eg. 'ej.o', all its morphemes.)
+#   morphemes - all morphemes, eg. 'mis', 'kompren', 'it'
+#   affixes   - roots, and affixes marked with a hyphen, eg. 'mis-', 'kompren', '-it'
+#
+# Separators (fingr.o.montr.i) and endings are not tokens. A word which is
+# not valid is one token, in lower case. All tokens of a word have the same
+# position (the number of the word in the text), as synonyms do.
+#
+# The terms of each distinct word are cached, so a word is analyzed once.
+# tokens() yields the same IndexToken object again and again, changing its
+# fields, to avoid making an object for every token. (An indexer which keeps
+# tokens must copy them, with IndexToken.copy().) An IndexAnalyzer is used by
+# one thread at a time.
+#
+# Example:
+#
+#     analyzer = IndexAnalyzer(ROOTS)
+#     for token in analyzer.tokens("Ili miskomprenis la leteron."):
+#         print(token.term, token.start, token.end, token.position)
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+from .literumilo_entry import Synthesis
+from .literumilo_ending import ENDINGS
+from .literumilo_utils import WORD_PATTERN, is_hyphen
+from .literumilo_check_word import get_checker
+from .literumilo_stream import iter_chunks
+
+ROOTS = "roots"
+MORPHEMES = "morphemes"
+AFFIXES = "affixes"
+OUTPUTS = (ROOTS, MORPHEMES, AFFIXES)
+
+CACHE_SIZE = 100000     # distinct words in the cache, before it is cleared
+
+# Grammatical endings, and the accusative 'n' of pronouns (vi.n, li.n).
+ENDING_STRINGS = frozenset([ending.ending for ending in ENDINGS] + ["n"])
+SEPARATOR_STRINGS = frozenset(["o", "a", "e"])
+
+class IndexToken:
+    """An index token.
+    term - the morpheme (lower case), eg. 'kompren', or '-it' for affixes output
+    start, end - character offsets of the morpheme in the text
+    position - number of the word in the text (0, 1, 2...)
+    kind - 'root', 'prefix', 'suffix', or 'word' (for a word which is not valid)
+    """
+
+    __slots__ = ("term", "start", "end", "position", "kind")
+
+    def __init__(self, term = "", start = 0, end = 0, position = 0, kind = "root"):
+        self.term = term
+        self.start = start
+        self.end = end
+        self.position = position
+        self.kind = kind
+
+    def copy(self):
+        """Return: a copy of this token"""
+        return IndexToken(self.term, self.start, self.end, self.position, self.kind)
+
+    def __eq__(self, other):
+        return isinstance(other, IndexToken) and \
+            (self.term, self.start, self.end, self.position, self.kind) == \
+            (other.term, other.start, other.end, other.position, other.kind)
+
+    def __repr__(self):
+        return "IndexToken({!r}, {}, {}, {}, {!r})".format(self.term, self.start, self.end,
+                                                           self.position, self.kind)
+
+# end of class IndexToken
+
+
+def part_offsets(word, parts):
+    """Finds the offsets of the parts of a divided word in the original word,
+    which may have hyphens which were removed by the analysis.
+    Params:
+        word - original word, eg. 'mis-komprenis'
+        parts - eg. ['mis', 'kompren', 'is']
+    Return:
+        list of (start, end) tuples, or None if the parts do not match the word
+    """
+    offsets = []
+    position = 0
+    length = len(word)
+    for part in parts:
+        while position < length and is_hyphen(word[position]) and not is_hyphen(part[0]):
+            position += 1
+        start = position
+        position += len(part)
+        if position > length: return None
+        offsets.append((start, position))
+    return offsets
+
+
+def morpheme_kind(entry):
+    """Return: 'prefix', 'suffix' or 'root', for a dictionary entry (or None)"""
+    if entry is None: return "root"
+    if entry.synthesis == Synthesis.Prefix: return "prefix"
+    if entry.synthesis == Synthesis.Suffix or entry.synthesis == Synthesis.Participle:
+        return "suffix"
+    return "root"
+
+def classify_parts(parts, dictionary):
+    """Finds the kind of each morpheme of a divided word, and removes the
+    ending and separators.
+    Params:
+        parts - lower case, eg. ['mis', 'kompren', 'it', 'aj']
+        dictionary - a map of word data
+    Return:
+        (list of (index, morpheme, kind, entry) tuples, ending or None)
+    """
+    last = len(parts) - 1
+    ending = None
+    if last > 0 and parts[last] in ENDING_STRINGS:
+        ending = parts[last]
+        last -= 1
+    morphemes = []
+    for index in range(0, last + 1):
+        morpheme = parts[index]
+        if 0 < index < last and morpheme in SEPARATOR_STRINGS: continue
+        entry = dictionary.get(morpheme)
+        morphemes.append((index, morpheme, morpheme_kind(entry), entry))
+    return morphemes, ending
+
+
+class IndexAnalyzer:
+    """Divides text into index tokens. See the description above."""
+
+    def __init__(self, output = ROOTS, checker = None, cache_size = CACHE_SIZE):
+        """
+        Params:
+            output - ROOTS, MORPHEMES or AFFIXES
+            checker - Checker (None = default checker)
+            cache_size - maximum number of distinct words in the cache
+        """
+        if output not in OUTPUTS:
+            raise ValueError("IndexAnalyzer, bad output: {}".format(output))
+        self.output = output
+        self.checker = get_checker(checker)
+        self.cache_size = cache_size
+        self.cache = {}      # word -> tuple of (term, start, end, kind), offsets in the word
+        self.signature = self.checker.dictionary_signature()
+
+    def word_terms(self, word):
+        """Finds the index terms of a word, with offsets in the word.
+        Params:
+            word (original form)
+        Return:
+            tuple of (term, start, end, kind) tuples
+        """
+        terms = self.cache.get(word)
+        if terms is not None: return terms
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        terms = self.make_terms(word)
+        self.cache[word] = terms
+        return terms
+
+    def make_terms(self, word):
+        """Analyzes a word, and makes its index terms. (See word_terms().)"""
+        result = self.checker.check_word(word)
+        if not result.valid:
+            return ((word.lower(), 0, len(word), "word"),)
+        parts = result.word.split(".")
+        offsets = part_offsets(word, parts)
+        if offsets is None:    # The letters changed, eg. in lower case.
+            offsets = [(0, len(word))] * len(parts)
+        classified, ending = classify_parts([part.lower() for part in parts], self.checker.dictionary)
+        morphemes = [(morpheme, offsets[index][0], offsets[index][1], kind)
+                     for index, morpheme, kind, entry in classified]
+
+        output = self.output
+        if output == ROOTS:
+            roots = tuple(item for item in morphemes if item[3] == "root")
+            return roots if roots else tuple(morphemes)
+        if output == AFFIXES:
+            return tuple((morpheme + "-" if kind == "prefix" else
+                          "-" + morpheme if kind == "suffix" else morpheme, start, end, kind)
+                         for morpheme, start, end, kind in morphemes)
+        return tuple(morphemes)
+
+    def tokens(self, text, offset = 0, position = 0, reuse = True):
+        """Generator which yields the index tokens of a text.
+        Params:
+            text
+            offset - offset of the text in the document
+            position - position of the first word
+            reuse - True to yield the same IndexToken each time, with new values
+        Return:
+            IndexTokens
+        """
+        signature = self.checker.dictionary_signature()
+        if signature != self.signature:   # The dictionary has changed.
+            self.cache.clear()
+            self.signature = signature
+        token = IndexToken()
+        word_terms = self.word_terms
+        for match in WORD_PATTERN.finditer(text):
+            start = offset + match.start()
+            for term, term_start, term_end, kind in word_terms(match.group()):
+                if not reuse: token = IndexToken()
+                token.term = term
+                token.start = start + term_start
+                token.end = start + term_end
+                token.position = position
+                token.kind = kind
+                yield token
+            position += 1
+
+    def stream_tokens(self, stream, reuse = True):
+        """Generator which yields the index tokens of a text stream, chunk by chunk.
+        Params:
+            stream - text stream
+            reuse - True to yield the same IndexToken each time, with new values
+        Return:
+            IndexTokens (offsets are in the whole stream)
+        """
+        position = 0
+        for offset, chunk in iter_chunks(stream):
+            for token in self.tokens(chunk, offset, position, reuse):
+                yield token
+                position = token.position + 1
+
+    def terms(self, text):
+        """Return: list of the index terms of a text (eg. for a query)"""
+        return [term for match in WORD_PATTERN.finditer(text)
+                for term, start, end, kind in self.word_terms(match.group())]
+
+# end of class IndexAnalyzer
@@ -0,0 +1,196 @@
+#! -*- coding: utf-8
+# literumilo_input.py
+#
+# This module opens text files for analysis. Compressed files (gzip, bzip2,
+# xz, and zstd, if a zstd module is installed) are recognized by their first
+# bytes, and decompressed while they are read, so it is not necessary to
+# decompress them to disk first. The text is decoded with an explicit
+# encoding (UTF-8 by default), not the default encoding of the platform.
+#
+# A compressed file is decompressed by a background thread, which reads
+# blocks ahead of the analysis, so decompression overlaps with analysis.
+# (The decompressors release the GIL while they work.)
+#
+# Example:
+#
+#     with open_text("corpus.txt.gz") as fin:
+#         for line in fin: ...
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import io, bz2, gzip, lzma, queue, threading
+
+# zstd is optional. Python 3.14 has compression.zstd; older versions
+# need the 'zstandard' package.
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ENCODING = "utf-8"
+BLOCK_SIZE = 1 << 18    # bytes decompressed at one time by the background thread
+MAX_BLOCKS = 4          # blocks which can wait for the analysis
+
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def detect_compression(header):
+    """Recognizes a compressed file by its first bytes.
+    Params:
+        header - the first bytes of the file (at least 6)
+    Return:
+        'gzip', 'bzip2', 'xz', 'zstd', or None for uncompressed data
+    """
+    if header.startswith(GZIP_MAGIC): return "gzip"
+    if header.startswith(BZIP2_MAGIC): return "bzip2"
+    if header.startswith(XZ_MAGIC): return "xz"
+    if header.startswith(ZSTD_MAGIC): return "zstd"
+    return None
+
+def decompressing_reader(source, compression):
+    """Makes a binary stream which decompresses a file or a binary stream.
+    If source is a file name, the file is closed when the stream is closed.
+    Params:
+        source - file name, or binary stream
+        compression - 'gzip', 'bzip2', 'xz' or 'zstd'
+    Return:
+        binary stream
+    """
+    if compression == "gzip": return gzip.open(source, "rb")
+    if compression == "bzip2": return bz2.open(source, "rb")
+    if compression == "xz": return lzma.open(source, "rb")
+    if compression == "zstd":
+        if zstd is not None: return zstd.open(source, "rb")
+        if zstandard is not None:
+            if isinstance(source, str): source = open(source, "rb")
+            return zstandard.ZstdDecompressor().stream_reader(source)
+        raise ValueError("A zstd module is needed to read zstd files. (pip install zstandard)")
+    raise ValueError("Unknown compression: {}".format(compression))
+
+
+class PrefetchReader(io.RawIOBase):
+    """A binary stream which is read ahead by a background thread.
+    At most max_blocks blocks wait in a queue, so memory use is bounded.
+    """
+
+    def __init__(self, stream, block_size = BLOCK_SIZE, max_blocks = MAX_BLOCKS):
+        """
+        Params:
+            stream - binary stream, eg. gzip.GzipFile
+            block_size - bytes read at one time
+            max_blocks - blocks which can wait in the queue
+        """
+        super().__init__()
+        self.stream = stream
+        self.block_size = block_size
+        self.blocks = queue.Queue(max_blocks)
+        self.block = b""        # block which is being read
+        self.position = 0       # position in the block
+        self.end = False
+        self.error = None
+        self.failed = False     # True after the error has been raised by readinto()
+        self.stopped = False
+        self.thread = threading.Thread(target = self.fill, name = "literumilo-prefetch", daemon = True)
+        self.thread.start()
+
+    def put(self, block):
+        """Puts a block into the queue. Waits while the queue is full,
+        unless the reader has been closed."""
+        while not self.stopped:
+            try:
+                self.blocks.put(block, timeout = 0.1)
+                return
+            except queue.Full:
+                continue
+
+    def fill(self):
+        """Reads blocks from the stream. (Background thread.)
+        An empty block marks the end. None marks an error."""
+        try:
+            while not self.stopped:
+                block = self.stream.read(self.block_size)
+                self.put(block)
+                if not block: return
+        except Exception as error:
+            self.error = error
+            self.put(None)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.position == len(self.block):
+            if self.end: return 0
+            # The error is raised again by later calls. (The queue is empty.)
+            if self.failed: raise self.error
+            block = self.blocks.get()
+            if block is None:
+                self.failed = True
+                raise self.error
+            if not block:
+                self.end = True
+                return 0
+            self.block = block
+            self.position = 0
+        n = min(len(buffer), len(self.block) - self.position)
+        buffer[:n] = self.block[self.position:self.position + n]
+        self.position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self.stopped = True
+            self.thread.join()
+            self.stream.close()
+        super().close()
+
+# end of class PrefetchReader
+
+
+def open_binary_stream(stream, encoding = DEFAULT_ENCODING, prefetch = True):
+    """Makes a text stream from a binary stream, which might be compressed.
+    Params:
+        stream - binary stream with peek(), eg. sys.stdin.buffer
+        encoding - text encoding
+        prefetch - True to decompress in a background thread
+    Return:
+        text stream
+    """
+    compression = detect_compression(stream.peek(8)[:8])
+    if compression is None:
+        return io.TextIOWrapper(stream, encoding = encoding)
+    binary = decompressing_reader(stream, compression)
+    if prefetch:
+        binary = io.BufferedReader(PrefetchReader(binary))
+    return io.TextIOWrapper(binary, encoding = encoding)
+
+def open_text(path, encoding = DEFAULT_ENCODING, prefetch = True):
+    """Opens a text file for reading. The file may be compressed.
+    Params:
+        path - file name
+        encoding - text encoding
+        prefetch - True to decompress in a background thread
+    Return:
+        text stream
+    """
+    with open(path, "rb") as fin:
+        compression = detect_compression(fin.read(8))
+    if compression is None:
+        return open(path, "r", encoding = encoding)
+    binary = decompressing_reader(path, compression)
+    if prefetch:
+        binary = io.BufferedReader(PrefetchReader(binary))
+    return io.TextIOWrapper(binary, encoding = encoding)
+
+def read_text(path, encoding = DEFAULT_ENCODING):
+    """Reads a text file, which may be compressed. Return: text (str)"""
+    with open_text(path, encoding) as fin:
+        return fin.read()
@@ -0,0 +1,251 @@
+#! -*- coding: utf-8
+# literumilo_language.py
+#
+# This module is a fast gate for texts which mix Esperanto with other
+# languages. A foreign word is the slowest word for check_word(), because
+# every way of dividing it is tried before it is rejected. The gate classifies
+# each block of text (each line) as Esperanto or foreign before its words are
+# analyzed, and foreign blocks are skipped.
+#
+# The classification uses a model of character trigrams, made from the
+# dictionary: each morpheme, with the grammatical endings of its part of
+# speech (hund.o, hund.oj, hund.on...), weighted by frequency (rarity).
+# The score of a block is the average log-likelihood ratio of its letters,
+# P(letter | two letters before) / (1 / size of the alphabet), plus a bonus
+# for the letters ĉ, ĝ, ĥ, ĵ, ŝ and ŭ. Sentences of Esperanto score about 1.2
+# to 2.5, English and German about -2.5 to -0.5, Spanish, Italian and
+# Portuguese about -0.2 to 1.0. Blocks which score below the threshold are
+# foreign. The default threshold is low, because an Esperanto block which is
+# skipped loses its misspellings, but a foreign block which is analyzed only
+# costs time. Blocks with few letters can't be classified reliably, so they
+# are always analyzed.
+#
+# A LanguageGate keeps counts of the blocks it has classified. It is used by
+# one thread at a time.
+#
+# Example:
+#
+#     gate = LanguageGate()
+#     bad_words = analyze_string(crawled_text, False, language_gate = gate)
+#     print(gate.esperanto_blocks, gate.foreign_blocks, gate.short_blocks)
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import math
+from collections import Counter
+
+from .literumilo_entry import POS, WithEnding, WithoutEnding
+from .literumilo_utils import WORD_PATTERN
+from .literumilo_check_word import get_checker
+from .literumilo_markup import find_words
+from .literumilo_block_cache import split_into_blocks, LINE_END_PATTERN
+
+THRESHOLD = 0.8       # Blocks which score lower are foreign.
+MIN_LETTERS = 20      # Blocks with fewer letters are not classified.
+SMOOTHING = 0.01      # added to the count of every trigram
+ACCENT_WEIGHT = 20.0  # bonus per supersigned letter, relative to all letters
+CACHE_SIZE = 100000   # distinct words in the cache, before it is cleared
+
+ACCENTED = frozenset("ĉĝĥĵŝŭ")
+
+# Endings which are added to morphemes, to make training words.
+ENDINGS_BY_POS = {
+    POS.Substantive: ("o", "oj", "on", "ojn"),
+    POS.SubstantiveVerb: ("o", "as", "is"),
+    POS.Verb: ("i", "as", "is", "os", "us", "u"),
+    POS.Adjective: ("a", "aj", "an", "ajn"),
+    POS.Adverb: ("e",),
+}
+DEFAULT_ENDINGS = ("o",)
+
+def training_words(dictionary):
+    """Generator which makes training words from the dictionary.
+    Params:
+        dictionary - a map of word data, indexed by morpheme
+    Return:
+        (word, weight) tuples. Frequent morphemes (low rarity) weigh more.
+    """
+    for morpheme, entry in dictionary.items():
+        weight = 1 << (4 - min(4, max(0, entry.rarity)))
+        morpheme = morpheme.lower()
+        if entry.without_ending == WithoutEnding.Yes or entry.with_ending != WithEnding.Yes:
+            yield morpheme, weight
+        if entry.with_ending == WithEnding.Yes:
+            for ending in ENDINGS_BY_POS.get(entry.part_of_speech, DEFAULT_ENDINGS):
+                yield morpheme + ending, weight
+
+
+class LanguageModel:
+    """A character trigram model of Esperanto words. See the description above."""
+
+    def __init__(self, dictionary, smoothing = SMOOTHING):
+        """
+        Params:
+            dictionary - a map of word data, indexed by morpheme
+            smoothing - added to the count of every trigram
+        """
+        # The padded words of each weight are joined, and the trigrams of the
+        # joined text are counted. Trigrams with two spaces cross two words.
+        words_by_weight = {}
+        for word, weight in training_words(dictionary):
+            words_by_weight.setdefault(weight, []).append(word)
+        trigrams = Counter()
+        alphabet = set(" ")
+        for weight, words in words_by_weight.items():
+            text = " " + "  ".join(words) + " "
+            alphabet.update(text)
+            counts = Counter(map("".join, zip(text, text[1:], text[2:])))
+            for trigram, count in counts.items():
+                if "  " not in trigram: trigrams[trigram] += count * weight
+        bigrams = Counter()
+        for trigram, count in trigrams.items():
+            bigrams[trigram[:2]] += count
+        size = len(alphabet) + 1     # + 1 for letters which are not in the alphabet
+        # Log-likelihood ratios: log2(P(trigram | bigram) * size of the alphabet)
+        self.trigram_scores = {trigram: math.log2((count + smoothing) /
+                                                  (bigrams[trigram[:2]] + smoothing * size) * size)
+                               for trigram, count in trigrams.items()}
+        self.unseen_scores = {bigram: math.log2(smoothing / (count + smoothing * size) * size)
+                              for bigram, count in bigrams.items()}
+        self.cache = {}      # word -> (sum of scores, letters, supersigned letters)
+
+    def word_score(self, word):
+        """Scores the letters of a word.
+        Params:
+            word
+        Return:
+            (sum of the log-likelihood ratios, number of letters, number of supersigned letters)
+        """
+        score = self.cache.get(word)
+        if score is not None: return score
+        if len(self.cache) >= CACHE_SIZE:
+            self.cache.clear()
+        padded = " " + word.lower() + " "
+        trigram_scores = self.trigram_scores
+        unseen_scores = self.unseen_scores
+        total = 0.0
+        for i in range(0, len(padded) - 2):
+            trigram = padded[i:i + 3]
+            value = trigram_scores.get(trigram)
+            if value is None: value = unseen_scores.get(trigram[:2], 0.0)
+            total += value
+        accented = sum(1 for letter in padded if letter in ACCENTED)
+        score = (total, len(word) + 1, accented)
+        self.cache[word] = score
+        return score
+
+    def score(self, words):
+        """Scores a list of words (eg. of a sentence).
+        Params:
+            words
+        Return:
+            (score, number of letters). The score is 0.0 if there are no letters.
+        """
+        total = 0.0
+        letters = 0
+        accented = 0
+        word_score = self.word_score
+        for word in words:
+            word_total, word_letters, word_accented = word_score(word)
+            total += word_total
+            letters += word_letters
+            accented += word_accented
+        if letters == 0: return 0.0, 0
+        return total / letters + ACCENT_WEIGHT * accented / letters, letters
+
+# end of class LanguageModel
+
+
+class LanguageGate:
+    """Classifies blocks of text as Esperanto or foreign, and counts them.
+    See the description above."""
+
+    def __init__(self, threshold = THRESHOLD, checker = None, min_letters = MIN_LETTERS):
+        """
+        Params:
+            threshold - blocks which score lower are foreign
+            checker - Checker (None = default checker). The model is made from its dictionary.
+            min_letters - blocks with fewer letters are not classified (they are analyzed)
+        """
+        self.threshold = threshold
+        self.checker = get_checker(checker)
+        self.min_letters = min_letters
+        self.model = None         # made when it is needed
+        self.signature = None     # see Checker.dictionary_signature()
+        self.esperanto_blocks = 0
+        self.foreign_blocks = 0
+        self.short_blocks = 0
+
+    def settings(self):
+        """Return: the settings which affect the classification (tuple)"""
+        return (self.threshold, self.min_letters)
+
+    def get_model(self):
+        """Return: the LanguageModel. It is made again if the dictionary has changed."""
+        signature = self.checker.dictionary_signature()
+        if self.model is None or signature != self.signature:
+            self.model = LanguageModel(self.checker.dictionary)
+            self.signature = signature
+        return self.model
+
+    def score(self, block, markup = None):
+        """Return: (score, number of letters) of a block of text.
+        Markup is not scored (see literumilo_markup.py)."""
+        words = WORD_PATTERN.findall(block) if markup is None else find_words(block, markup)
+        return self.get_model().score(words)
+
+    def is_esperanto(self, block, markup = None):
+        """Classifies a block of text, and counts it.
+        Params:
+            block of text, eg. a line or a paragraph
+            markup - format of the text (see literumilo_markup.py), or None
+        Return:
+            True if the block is Esperanto, or too short to classify.
+            False if it is foreign.
+        """
+        score, letters = self.score(block, markup)
+        if letters < self.min_letters:
+            self.short_blocks += 1
+            return True
+        if score < self.threshold:
+            self.foreign_blocks += 1
+            return False
+        self.esperanto_blocks += 1
+        return True
+
+    def split(self, text, markup = None):
+        """Generator which divides a text into lines, and classifies them.
+        If the text has markup, spans of markup (eg. code blocks) which
+        have several lines are not divided.
+        Params:
+            text
+            markup - format of the text (see literumilo_markup.py), or None
+        Return:
+            (block, is_esperanto) tuples. The blocks, joined together, are the text.
+        """
+        for block in split_into_blocks(text, markup, LINE_END_PATTERN):
+            yield block, self.is_esperanto(block, markup)
+
+    def counts(self):
+        """Return: the counts of blocks (esperanto, foreign, short)"""
+        return (self.esperanto_blocks, self.foreign_blocks, self.short_blocks)
+
+    def add_counts(self, counts):
+        """Adds counts of blocks, eg. from the gate of a worker process.
+        Params:
+            counts - (esperanto, foreign, short), see counts()
+        """
+        esperanto, foreign, short = counts
+        self.esperanto_blocks += esperanto
+        self.foreign_blocks += foreign
+        self.short_blocks += short
+
+    def reset_counts(self):
+        """Sets the counts of blocks to 0."""
+        self.esperanto_blocks = 0
+        self.foreign_blocks = 0
+        self.short_blocks = 0
+
+# end of class LanguageGate
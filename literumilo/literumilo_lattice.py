@@ -0,0 +1,319 @@
+#! -*- coding: utf-8
+# literumilo_lattice.py
+#
+# This module finds all valid divisions of a word into morphemes. The search
+# in find_morpheme() stops at the first valid division, but some applications
+# (disambiguation, hyphenation, search) need every valid analysis.
+#
+# make_lattice() builds a morpheme lattice for a word: a graph whose nodes are
+# positions in the word (without its grammatical ending), and whose edges are
+# morphemes from the dictionary (or separators, see find_morpheme()). The graph
+# is made in one pass, from the end of the word to the start, so each part of
+# the word is looked up once. Edges which cannot lead to the end of the word,
+# or cannot be reached from the start, are removed.
+#
+# Not every path through the lattice is a valid word, because the synthesis
+# of suffixes depends on the morphemes before them, and the synthesis of
+# prefixes on the morphemes after them. MorphemeLattice.n_best() searches the
+# paths lazily, cheapest first (the sum of the rarity of the morphemes, see
+# rarity_cost() in literumilo_order.py), and checks suffixes as each path grows,
+# and prefixes when it is complete. It yields Segmentations. The edges of a
+# Segmentation have the part of speech after synthesis, eg. -ad makes a verb.
+#
+# A lattice has a valid segmentation if and only if check_word() finds the
+# word valid. The word is handled as in Checker.analyze_word(): exceptions,
+# abbreviations, words without endings, and roots with an ending are also
+# segmentations.
+#
+# Example:
+#
+#     for segmentation in n_best("ĉiutage", 3):
+#         print(segmentation.word, segmentation.cost)
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import heapq
+from itertools import count, islice
+
+from .literumilo_entry import *
+from .literumilo_ending import get_ending
+from .literumilo_suffix import check_suffix
+from .literumilo_scan_morphemes import scan_morphemes
+from .literumilo_morpheme_list import MorphemeList
+from .literumilo_utils import is_word_char, is_hyphen, remove_hyphens, part_boundaries
+from .literumilo_check_word import EXCEPTIONS, get_checker
+
+# Separators (grammatical endings between morphemes), which are never changed.
+SEPARATORS = {letter: EspDictEntry.new_separator(letter) for letter in "oae"}
+
+class LatticeEdge:
+    """A morpheme in a lattice, from position start to end in the word.
+    entry is the dictionary entry. part_of_speech is the part of speech after
+    synthesis, which can be different from entry.part_of_speech.
+    """
+
+    __slots__ = ("start", "end", "entry", "part_of_speech")
+
+    def __init__(self, start, end, entry, part_of_speech = None):
+        self.start = start
+        self.end = end
+        self.entry = entry
+        self.part_of_speech = entry.part_of_speech if part_of_speech is None else part_of_speech
+
+    def key(self):
+        """Return: (start, end, morpheme, part of speech), to compare edges"""
+        return (self.start, self.end, self.entry.morpheme, self.part_of_speech)
+
+    def __repr__(self):
+        return "LatticeEdge({}, {}, {!r}, {})".format(self.start, self.end,
+                                                      self.entry.morpheme, self.part_of_speech)
+
+# end of class LatticeEdge
+
+
+class Segmentation:
+    """A valid division of a word into morphemes.
+    edges - LatticeEdges (empty for exceptions and abbreviations)
+    ending - the grammatical ending (Ending), or None
+    cost - the sum of the rarity of the morphemes
+    parts - the morphemes and the ending, eg. ('mis', 'dir', 'it', 'a')
+            (An edge can have more than one morpheme, eg. 'liter.um'.)
+    """
+
+    __slots__ = ("edges", "ending", "cost", "parts")
+
+    def __init__(self, edges, ending, cost, parts):
+        self.edges = edges
+        self.ending = ending
+        self.cost = cost
+        self.parts = parts
+
+    @property
+    def word(self):
+        """The word divided into morphemes, eg. 'mis.dir.it.a'."""
+        return ".".join(self.parts)
+
+    @property
+    def boundaries(self):
+        """Offsets of the boundaries between morphemes (tuple of int)."""
+        return part_boundaries(self.parts)
+
+    def __repr__(self):
+        return "Segmentation({!r}, {})".format(self.word, self.cost)
+
+# end of class Segmentation
+
+
+def edge_parts(word, edge):
+    """Return: the morphemes of an edge (tuple of str). An entry of the
+    dictionary can be a compound, such as 'liter.um', which is two morphemes."""
+    text = word[edge.start:edge.end]
+    if "." not in edge.entry.morpheme: return (text,)
+    parts = []
+    position = 0
+    for piece in edge.entry.morpheme.split("."):
+        parts.append(text[position:position + len(piece)])
+        position += len(piece)
+    return tuple(parts)
+
+def make_edges(stem, dictionary):
+    """Makes the edges of a lattice, with the same rules as find_morpheme():
+    a morpheme which is not last has at least 2 letters, and leaves at least
+    2 letters. The first morpheme is never the whole stem. (A root with an
+    ending is handled by make_lattice().) A separator is never first.
+    Params:
+        stem - the word without its ending (lower case)
+        dictionary - a map of word data
+    Return:
+        dict: start position -> list of LatticeEdges
+    """
+    length = len(stem)
+    edges = {}
+    reaches_end = [False] * (length + 1)
+    reaches_end[length] = True
+    for start in range(length - 1, -1, -1):
+        rest = stem[start:]
+        found = []
+        if start > 0:
+            entry = dictionary.get(rest)
+            if entry and entry.synthesis != Synthesis.No:
+                found.append(LatticeEdge(start, length, entry))
+        for size in range(len(rest) - 2, 1, -1):
+            if not reaches_end[start + size]: continue
+            entry = dictionary.get(rest[:size])
+            if entry and entry.synthesis != Synthesis.No:
+                found.append(LatticeEdge(start, start + size, entry))
+        if start > 0 and len(rest) >= 3 and reaches_end[start + 1]:
+            separator = SEPARATORS.get(rest[0])
+            if separator: found.append(LatticeEdge(start, start + 1, separator))
+        if found:
+            edges[start] = found
+            reaches_end[start] = True
+    # Remove the edges which cannot be reached from the start.
+    reached = {0}
+    for start in sorted(edges):
+        if start in reached:
+            reached.update(edge.end for edge in edges[start])
+    return {start: found for start, found in edges.items() if start in reached}
+
+
+class MorphemeLattice:
+    """All divisions of a word into morphemes. See the description above."""
+
+    def __init__(self, word, ending = None, edges = None, whole = ()):
+        """
+        Params:
+            word - lower case, without hyphens
+            ending - grammatical ending (Ending), or None
+            edges - dict: start position -> list of LatticeEdges
+            whole - Segmentations which are not paths in the lattice
+                    (eg. exceptions, a root with an ending)
+        """
+        self.word = word
+        self.ending = ending
+        self.stem = word[:len(word) - ending.length] if ending else word
+        self.edges = edges if edges is not None else {}
+        self.whole = list(whole)
+
+    def n_best(self, n = None):
+        """Generator which yields valid Segmentations, cheapest first.
+        Segmentations of equal cost are ordered by the number of morphemes.
+        Params:
+            n - maximum number of segmentations (None = all)
+        Return:
+            Segmentations
+        """
+        return islice(self.iter_segmentations(), n)
+
+    def iter_segmentations(self):
+        """Generator which yields all valid Segmentations, cheapest first.
+        A path is (position, edges, entries, copied), where entries are the
+        entries of a MorphemeList after the synthesis of suffixes, and copied
+        are its copied flags. (See MorphemeList.get_mutable().)
+        """
+        serial = count()
+        heap = [(segmentation.cost, len(segmentation.parts), next(serial), segmentation)
+                for segmentation in self.whole]
+        if self.edges: heap.append((0, 0, next(serial), (0, (), (), ())))
+        heapq.heapify(heap)
+        length = len(self.stem)
+        while heap:
+            cost, size, _, item = heapq.heappop(heap)
+            if isinstance(item, Segmentation):
+                yield item
+                continue
+            position, path, entries, copied = item
+            index = len(path)
+            if index >= MorphemeList.MAX_MORPHEMES: continue
+            for edge in self.edges.get(position, ()):
+                entry = edge.entry
+                morpheme_list = MorphemeList(self.ending)
+                morpheme_list.morphemes[:index] = entries
+                morpheme_list.copied[:index] = copied
+                morpheme_list.put(index, entry)
+                if entry.synthesis == Synthesis.Suffix and \
+                   not check_suffix(entry.morpheme, index, morpheme_list):
+                    continue
+                new_cost = cost + entry.rarity
+                new_path = path + (edge,)
+                new_entries = tuple(morpheme_list.morphemes[:index + 1])
+                if edge.end == length:
+                    if not scan_morphemes(morpheme_list): continue
+                    heapq.heappush(heap, (new_cost, index + 1, next(serial),
+                                          self.make_segmentation(new_path, new_entries, new_cost)))
+                else:
+                    new_copied = tuple(morpheme_list.copied[:index + 1])
+                    heapq.heappush(heap, (new_cost, index + 1, next(serial),
+                                          (edge.end, new_path, new_entries, new_copied)))
+
+    def make_segmentation(self, path, entries, cost):
+        """Makes a Segmentation from a path of edges, with the part of speech
+        of each morpheme after synthesis."""
+        stem = self.stem
+        edges = tuple(LatticeEdge(edge.start, edge.end, edge.entry, entry.part_of_speech)
+                      for edge, entry in zip(path, entries))
+        parts = tuple(part for edge in edges for part in edge_parts(stem, edge)) + (self.ending.ending,)
+        return Segmentation(edges, self.ending, cost, parts)
+
+    def segmentations(self):
+        """Return: list of all valid Segmentations, cheapest first"""
+        return list(self.iter_segmentations())
+
+    def valid_edges(self):
+        """Return: the edges which are in at least one valid segmentation,
+        sorted by position (list of LatticeEdges). Together they are the
+        lattice of the valid segmentations only."""
+        edges = {}
+        for segmentation in self.iter_segmentations():
+            for edge in segmentation.edges:
+                edges.setdefault(edge.key(), edge)
+        return [edges[key] for key in sorted(edges, key = lambda key: key[:3])]
+
+    def is_valid(self):
+        """Return: True if the word has a valid segmentation"""
+        return next(self.iter_segmentations(), None) is not None
+
+    def __iter__(self):
+        return self.iter_segmentations()
+
+# end of class MorphemeLattice
+
+
+def make_lattice(original_word, checker = None):
+    """Makes the morpheme lattice of a word.
+    Params:
+        original word
+        checker - Checker (None = default checker)
+    Return:
+        MorphemeLattice
+    """
+    dictionary = get_checker(checker).dictionary
+
+    if len(original_word) == 1:   # Just a letter or hyphen.
+        whole = [Segmentation((), None, 0, (original_word,))] if is_word_char(original_word) else []
+        return MorphemeLattice(original_word, whole = whole)
+
+    # Abbreviations, such as n-r.oj, s-in.oj
+    if len(original_word) > 2 and is_hyphen(original_word[1]):
+        entry = dictionary.get(original_word)
+        whole = [Segmentation((), None, entry.rarity, tuple(entry.morpheme.split(".")))] if entry else []
+        return MorphemeLattice(original_word, whole = whole)
+
+    word = remove_hyphens(original_word).lower()
+    if len(word) < 5 and word in EXCEPTIONS:
+        return MorphemeLattice(word, whole = [Segmentation((), None, 0, tuple(EXCEPTIONS[word].split(".")))])
+
+    whole = []
+    # Words without a grammatical ending, eg. 'ne', 'dum', 'post'.
+    entry = dictionary.get(word)
+    if entry and entry.without_ending == WithoutEnding.Yes:
+        edge = LatticeEdge(0, len(word), entry)
+        whole.append(Segmentation((edge,), None, entry.rarity, edge_parts(word, edge)))
+
+    ending = get_ending(word)
+    if ending is None:
+        return MorphemeLattice(word, whole = whole)
+    stem = word[:len(word) - ending.length]
+    entry = dictionary.get(stem)
+    if entry:
+        # A root with an ending. (If the root does not take an ending,
+        # Checker.analyze_word() does not divide the word.)
+        if entry.with_ending != WithEnding.Yes:
+            return MorphemeLattice(word, ending, whole = whole)
+        edge = LatticeEdge(0, len(stem), entry)
+        whole.append(Segmentation((edge,), ending, entry.rarity,
+                                  edge_parts(stem, edge) + (ending.ending,)))
+    return MorphemeLattice(word, ending, make_edges(stem, dictionary), whole)
+
+def n_best(word, n = None, checker = None):
+    """Generator which yields the valid segmentations of a word, cheapest first.
+    Params:
+        word
+        n - maximum number of segmentations (None = all)
+        checker - Checker (None = default checker)
+    Return:
+        Segmentations
+    """
+    return make_lattice(word, checker).n_best(n)
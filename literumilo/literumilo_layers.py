@@ -0,0 +1,145 @@
+#! -*- coding: utf-8
+# literumilo_layers.py
+#
+# This module defines a layered dictionary: a base dictionary (from
+# data/vortaro.tsv) with overlays on top of it. An overlay has extra
+# morphemes, for example, names of customers or technical roots, in the
+# same 9-column format as vortaro.tsv (see make_dictionary()). An entry in
+# an overlay replaces an entry with the same key in lower layers.
+#
+# The base dictionary is never copied or changed. The merged entries of
+# all overlays are kept in one small dict, which is checked first, so a
+# lookup costs at most two dict lookups. The merged dict is never changed
+# in place: adding or removing an overlay makes a new one, and replaces the
+# old one in one assignment, so a lookup by another thread never sees an
+# overlay which is half added or half removed. This takes time proportional
+# to the size of the overlays.
+#
+# Usually, overlays are added to a Checker, which also updates its
+# n-gram table and caches (see Checker.add_overlay()):
+#
+#     checker.add_overlay("tenant", read_dictionary_file("tenant.tsv"))
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import threading
+
+class LayeredDictionary:
+    """A read-only view of a base dictionary and a stack of overlays.
+    It has the same lookup interface as a dict.
+    """
+
+    def __init__(self, base):
+        """
+        Params:
+            base - a map of word data, indexed by morpheme
+        """
+        self.base = base
+        self.layers = []    # (name, overlay) tuples, from bottom to top
+        self.merged = {}    # key -> entry of the top overlay which has the key
+        self.changes = 0    # number of overlays added or removed
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def layer_names(self):
+        """Return: names of the overlays, from bottom to top (list)"""
+        return [name for name, overlay in self.layers]
+
+    def add_layer(self, name, overlay):
+        """Puts an overlay on top of the others.
+        Params:
+            name - name of the overlay (str), eg. 'tenant-42'
+            overlay - a map of word data, indexed by morpheme (see make_dictionary())
+        """
+        with self.lock:
+            if name in self.layer_names():
+                raise ValueError("LayeredDictionary, duplicate layer: {}".format(name))
+            merged = dict(self.merged)
+            merged.update(overlay)
+            self.layers = self.layers + [(name, overlay)]
+            self.merged = merged
+            self.changes += 1
+
+    def remove_layer(self, name):
+        """Removes an overlay. The entries of lower layers (or the base)
+        become visible again.
+        Params:
+            name - name of the overlay
+        Return:
+            the overlay which was removed
+        """
+        with self.lock:
+            names = self.layer_names()
+            if name not in names:
+                raise KeyError(name)
+            index = names.index(name)
+            overlay = self.layers[index][1]
+            layers = self.layers[:index] + self.layers[index + 1:]
+            merged = {}
+            for layer_name, lower in layers:
+                merged.update(lower)
+            self.layers = layers
+            self.merged = merged
+            self.changes += 1
+            return overlay
+
+    def rebase(self, base):
+        """Makes a layered dictionary with the same overlays on a new base,
+        for example, when the base dictionary is reloaded.
+        Params:
+            base - a map of word data, indexed by morpheme
+        Return:
+            LayeredDictionary
+        """
+        with self.lock:
+            layered = LayeredDictionary(base)
+            layered.layers = list(self.layers)
+            layered.merged = dict(self.merged)
+            layered.changes = self.changes
+            return layered
+
+    def get(self, key, default = None):
+        entry = self.merged.get(key)
+        if entry is not None: return entry
+        return self.base.get(key, default)
+
+    def __getitem__(self, key):
+        entry = self.merged.get(key)
+        if entry is not None: return entry
+        return self.base[key]
+
+    def __contains__(self, key):
+        return key in self.merged or key in self.base
+
+    def __len__(self):
+        return len(self.base) + sum(1 for key in self.merged if key not in self.base)
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        for key, entry in self.items():
+            yield key
+
+    def values(self):
+        for key, entry in self.items():
+            yield entry
+
+    def items(self):
+        merged = dict(self.merged)
+        for key, entry in self.base.items():
+            yield key, merged.pop(key, entry)
+        for key, entry in merged.items():
+            yield key, entry
+
+# end of class LayeredDictionary
@@ -0,0 +1,215 @@
+#! -*- coding: utf-8
+# literumilo_lexicon.py
+#
+# Most words in real text are a single root with a grammatical ending
+# (hund.o, skrib.is), or a short, common compound word. This module
+# defines a lexicon of such full word forms, which check_word() consults
+# before it does any analysis.
+#
+# The lexicon is made by an offline build step. Every morpheme which can
+# take an ending (KF) is combined with every grammatical ending, every
+# morpheme which is valid without an ending (SF) is added as is, and a
+# configurable list of frequent derived words can be added. Each form is
+# analyzed by check_word(), and only valid forms are kept, so the lexicon
+# gives exactly the same results as the analysis.
+#
+# The forms are kept in a sorted list, and found by binary search.
+# Each division into morphemes is stored as an integer bit mask, which
+# marks the positions of the periods. To build a lexicon file, run:
+#
+# python3 -m literumilo.literumilo_lexicon lexicon.tsv [derived_words.txt]
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import sys
+from array import array
+from bisect import bisect_left
+
+from .literumilo_entry import WithEnding, WithoutEnding
+from .literumilo_ending import ENDINGS
+
+MAX_FORM_LENGTH = 63   # The bit mask has 64 bits.
+
+def segmentation_to_mask(segmentation):
+    """Converts a division into morphemes to a bit mask.
+    For example, 'hund.et.o' becomes binary 10100. (Bit 2 means that
+    there is a period before the letter at index 2.)
+    Params:
+        segmentation, eg. 'hund.et.o'
+    Return:
+        bit mask (int)
+    """
+    mask = 0
+    index = 0
+    for ch in segmentation:
+        if ch == ".":
+            mask |= 1 << index
+        else:
+            index += 1
+    return mask
+
+def mask_to_segmentation(form, mask):
+    """Inserts periods into a word form, according to the bit mask.
+    Params:
+        word form, eg. 'hundeto'
+        bit mask
+    Return:
+        segmentation, eg. 'hund.et.o'
+    """
+    if mask == 0: return form
+    parts = []
+    start = 0
+    while mask:
+        index = (mask & -mask).bit_length() - 1   # lowest bit
+        parts.append(form[start:index])
+        start = index
+        mask &= mask - 1
+    parts.append(form[start:])
+    return ".".join(parts)
+
+def mask_to_boundaries(mask):
+    """Converts a bit mask to a tuple of boundaries (offsets of periods).
+    Params:
+        bit mask
+    Return:
+        boundaries, eg. (4, 6) for 'hund.et.o'
+    """
+    boundaries = []
+    while mask:
+        boundaries.append((mask & -mask).bit_length() - 1)   # lowest bit
+        mask &= mask - 1
+    return tuple(boundaries)
+
+class Lexicon:
+    """A read-only map from full word forms (lower case) to their
+    division into morphemes. The forms are in a sorted list, and the
+    divisions are bit masks in a parallel array.
+    """
+
+    def __init__(self, forms_and_segmentations):
+        """
+        Params:
+            iterable of (form, segmentation) tuples
+        """
+        pairs = sorted(set(forms_and_segmentations))
+        self.forms = [form for form, segmentation in pairs]
+        self.masks = array("Q", [segmentation_to_mask(seg) for form, seg in pairs])
+
+    def __len__(self):
+        return len(self.forms)
+
+    def get(self, word):
+        """Finds a word form in the lexicon.
+        Params:
+            word (lower case, without hyphens)
+        Return:
+            division into morphemes (str), or None if not found
+        """
+        forms = self.forms
+        index = bisect_left(forms, word)
+        if index < len(forms) and forms[index] == word:
+            return mask_to_segmentation(word, self.masks[index])
+        return None
+
+    def find(self, word):
+        """Finds a word form in the lexicon, and returns the boundaries
+        between its morphemes, without making a string.
+        Params:
+            word (lower case, without hyphens)
+        Return:
+            boundaries (tuple of offsets), or None if not found
+        """
+        forms = self.forms
+        index = bisect_left(forms, word)
+        if index < len(forms) and forms[index] == word:
+            return mask_to_boundaries(self.masks[index])
+        return None
+
+    def items(self):
+        """Generates (form, segmentation) tuples, in sorted order."""
+        for form, mask in zip(self.forms, self.masks):
+            yield form, mask_to_segmentation(form, mask)
+
+    def save(self, filename):
+        """Saves the lexicon as tab separated values: form, segmentation.
+        Params:
+            file name
+        """
+        with open(filename, "w", encoding = "utf-8") as fout:
+            for form, segmentation in self.items():
+                fout.write("{}\t{}\n".format(form, segmentation))
+
+# end of class Lexicon
+
+
+def load_lexicon(filename):
+    """Loads a lexicon file made by Lexicon.save().
+    Params:
+        file name
+    Return:
+        Lexicon
+    """
+    pairs = []
+    with open(filename, "r", encoding = "utf-8") as fin:
+        for line in fin:
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) == 2:
+                pairs.append((columns[0], columns[1]))
+    return Lexicon(pairs)
+
+
+def generate_forms(dictionary):
+    """Generates the word forms of a dictionary: morphemes with all
+    grammatical endings (if they accept an ending), and morphemes which
+    are valid without an ending.
+    Params:
+        dictionary - a map of word data, indexed by morpheme
+    Return:
+        word forms (lower case)
+    """
+    for key, entry in dictionary.items():
+        if entry.without_ending == WithoutEnding.Yes:
+            yield key
+        if entry.with_ending == WithEnding.Yes:
+            for ending in ENDINGS:
+                yield key + ending.ending
+
+
+def build_lexicon(dictionary, check_word, derived_words = ()):
+    """Builds a lexicon of full word forms. Each form is analyzed, and
+    only valid forms are kept.
+    Params:
+        dictionary - a map of word data, indexed by morpheme
+        check_word - the function which analyzes a word
+        derived_words - frequent derived words to add (optional)
+    Return:
+        Lexicon
+    """
+    pairs = []
+    forms = list(generate_forms(dictionary))
+    forms.extend(word.lower() for word in derived_words)
+    for form in forms:
+        # Words with hyphens are not looked up in the lexicon.
+        if len(form) > MAX_FORM_LENGTH or "-" in form or "­" in form: continue
+        result = check_word(form)
+        if result.valid:
+            pairs.append((form, result.word))
+    return Lexicon(pairs)
+
+# ----------------------------------------------------
+# Program starts here.
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m literumilo.literumilo_lexicon lexicon.tsv [derived_words.txt]")
+        sys.exit(0)
+    from .literumilo_check_word import check_word, default_checker
+    derived = []
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "r", encoding = "utf-8") as fin:
+            derived = [line.strip() for line in fin if line.strip()]
+    lexicon = build_lexicon(default_checker.dictionary, check_word, derived)
+    lexicon.save(sys.argv[1])
+    print("{} forms saved to {}.".format(len(lexicon), sys.argv[1]))
@@ -4,7 +4,7 @@
 # Module to load an Esperanto dictionary for spell checking.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-05-01
+# Last edit date: 2026-10-19
 #
 
 import os, sys
@@ -12,6 +12,7 @@ import enum
 
 from .literumilo_utils import x_to_accent
 from .literumilo_entry import *
+from .literumilo_compact import CompactDictionary
 
 DICTIONARY_FN = 'data/vortaro.tsv'
 NL = '\n'
@@ -71,18 +72,41 @@ def make_dictionary(lines):
     return esperanto_dictionary;
 
 
-def load_dictionary():
-    """Read in the Esperanto dictionary file (tab separated values),
-    and produce a dictionary, indexed by morpheme.
+def read_dictionary_file(path):
+    """Reads a dictionary file (tab separated values, 9 columns, see
+    make_dictionary()), and produces a dictionary, indexed by morpheme.
+    Params:
+        path of file
+    Return:
+        dictionary of morphemes (dict)
     """
     lines = []
-    this_path = os.path.abspath(os.path.dirname(__file__))
-    dict_path = os.path.join(this_path, DICTIONARY_FN)
-    with open(dict_path, 'r') as fp:
+    with open(path, 'r', encoding = 'utf-8') as fp:
         for line in fp:
             lines.append(line.strip())
     return make_dictionary(lines)
 
+
+def dictionary_path():
+    """Return: path of the Esperanto dictionary file (data/vortaro.tsv)"""
+    this_path = os.path.abspath(os.path.dirname(__file__))
+    return os.path.join(this_path, DICTIONARY_FN)
+
+
+def load_dictionary(compact = False):
+    """Read in the Esperanto dictionary file (tab separated values),
+    and produce a dictionary, indexed by morpheme.
+    Params:
+        compact - True for a CompactDictionary (see literumilo_compact.py),
+                  which uses much less memory; False for a dict
+    Return:
+        dictionary of morphemes
+    """
+    dictionary = read_dictionary_file(dictionary_path())
+    if compact:
+        return CompactDictionary(dictionary)
+    return dictionary
+
 # ----------------------------------------------------
 # Program starts here.
 
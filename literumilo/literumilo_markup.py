@@ -0,0 +1,131 @@
+#! -*- coding: utf-8
+# literumilo_markup.py
+#
+# This module finds the words of a text which has markup (HTML, Markdown or
+# LaTeX), in one pass, without removing the markup first. One regular
+# expression matches either a span which must be skipped, or a word. Skipped
+# spans are never checked, and in morpheme mode they are copied to the output
+# unchanged.
+#
+# These spans are skipped in all formats ('text' too):
+#
+#   URLs (http://..., www...), e-mail addresses, and numbers, or tokens
+#   which contain digits (mp3, 2020a)
+#
+# html     - tags with their attributes (<a href="...">), comments, entities
+#            (&amp;), and the elements script, style, pre and code
+# markdown - fenced code blocks (``` or ~~~), code spans (`x`), link targets
+#            ([text](target)), autolinks (<http://...>), and HTML, as above
+# latex    - comments (% ...), math ($...$, $$...$$, \[...\], \(...\)),
+#            verbatim environments, commands (\textbf), and the arguments of
+#            commands which are not text, eg. \label{...}, \begin{...}
+#
+# Example:
+#
+#     analyze_string(html, False, markup = "html")
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import re
+
+from .literumilo_utils import WORD_PATTERN
+
+COMMON_SPANS = [
+    r"(?:https?|ftp)://[^\s<>\"'`)\]]+",        # URL
+    r"www\.[^\s<>\"'`)\]]+",                     # URL without a scheme
+    r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+",             # e-mail address
+    r"\w*\d\w*",                                 # number, or a token with digits
+]
+
+HTML_SPANS = [
+    r"(?s:<!--.*?-->)",                                        # comment
+    r"(?si:<(?P<element>script|style|pre|code)\b.*?</(?P=element)\s*>)",
+    r"</?[A-Za-z!][^>]*>",                                     # tag
+    r"&#?\w+;",                                                # entity
+]
+
+MARKDOWN_SPANS = [
+    r"(?s:^[ \t]*(?P<fence>`{3,}|~{3,}).*?^[ \t]*(?P=fence))", # fenced code block
+    r"``[^`]*``",                                              # code span
+    r"`[^`\n]*`",                                              # code span
+    r"\]\([^)\s]*(?:\s+\"[^\"]*\")?\)",                        # link target
+    r"<(?:https?|ftp|mailto):[^>]*>",                          # autolink
+] + HTML_SPANS
+
+LATEX_SPANS = [
+    r"(?<!\\)%.*",                                             # comment
+    r"(?s:\$\$.*?\$\$)",                                       # display math
+    r"(?<!\\)\$[^$]*\$",                                       # inline math
+    r"(?s:\\\[.*?\\\])",                                       # display math
+    r"(?s:\\\(.*?\\\))",                                       # inline math
+    r"(?s:\\begin\{(?P<verbatim>verbatim|lstlisting|minted|comment)\}.*?\\end\{(?P=verbatim)\})",
+    # commands whose first argument is not text
+    r"\\(?:begin|end|label|ref|eqref|pageref|cite|citep|citet|usepackage|documentclass|"
+    r"includegraphics|input|include|bibliography|bibliographystyle|url|href|"
+    r"newcommand|renewcommand|setlength|hspace|vspace)\*?\s*(?:\[[^\]]*\])?\{[^}]*\}",
+    r"\\(?:[A-Za-z]+\*?|.)",                                   # command, or escaped character
+]
+
+MARKUP_SPANS = {
+    "text": [],
+    "html": HTML_SPANS,
+    "markdown": MARKDOWN_SPANS,
+    "latex": LATEX_SPANS,
+}
+
+MARKUP_FORMATS = tuple(MARKUP_SPANS)
+
+# Most tokens are words, so the word is tried first. If the word continues
+# as a span which is skipped (mp3, foo.bar@ekz.org, www.ekz.org, https://),
+# the spans are tried, and then the word again ('fallback').
+WORD_GUARD = r"(?![\w@+]|\.\w|://)"
+WORD_GROUPS = ("word", "fallback")
+
+patterns = {}    # compiled patterns, by markup format
+
+def skip_pattern_source(markup):
+    """Return: a regular expression (str) for the spans which are skipped
+    in the given format"""
+    if markup not in MARKUP_SPANS:
+        raise ValueError("Unknown markup: {}. Use one of: {}".format(markup, ", ".join(MARKUP_FORMATS)))
+    return "|".join(MARKUP_SPANS[markup] + COMMON_SPANS)
+
+def markup_pattern(markup):
+    """Makes the pattern for a markup format. A match is either a span to skip,
+    or a word, in the group 'word' or 'fallback' (match.lastgroup).
+    Params:
+        markup - 'text', 'html', 'markdown' or 'latex'
+    Return:
+        compiled regular expression
+    """
+    pattern = patterns.get(markup)
+    if pattern is None:
+        word = WORD_PATTERN.pattern
+        source = "(?P<word>{}){}|(?:{})|(?P<fallback>{})".format(word, WORD_GUARD,
+                                                               skip_pattern_source(markup), word)
+        pattern = re.compile(source, re.MULTILINE)
+        patterns[markup] = pattern
+    return pattern
+
+def find_words(text, markup):
+    """Return: list of the words of a text with markup (skipped spans are not words)"""
+    return [match.group() for match in markup_pattern(markup).finditer(text)
+            if match.lastgroup in WORD_GROUPS]
+
+def substitute_words(text, markup, function):
+    """Replaces each word of a text with markup by function(word). Skipped
+    spans are copied unchanged.
+    Params:
+        text
+        markup - 'text', 'html', 'markdown' or 'latex'
+        function - takes a word, and returns its replacement
+    Return:
+        text (str)
+    """
+    def replace(match):
+        if match.lastgroup in WORD_GROUPS:
+            return function(match.group())
+        return match.group()
+    return markup_pattern(markup).sub(replace, text)
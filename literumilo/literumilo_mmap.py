@@ -0,0 +1,72 @@
+#! -*- coding: utf-8
+# literumilo_mmap.py
+#
+# This module analyzes a large UTF-8 text file in place, with a memory map.
+# Functions such as analyze_file() read the whole file into a string, and
+# build a second string for the result. Here, the mapped file is scanned for
+# words with a regular expression over bytes, so there is never a string of
+# the whole file. Only the words are decoded, and the results are reported
+# with byte offsets into the file.
+#
+# BYTE_WORD_PATTERN matches the same words as WORD_PATTERN (literumilo_utils.py),
+# in UTF-8: ASCII letters and hyphens, the soft hyphen (U+00AD, c2 ad),
+# and the letters U+00C0 to U+02AF (c3 80 to ca af).
+#
+# Example:
+#
+#     for offset, word, result in iter_file_mmap("corpus.txt"):
+#         if not result.valid: print(offset, word)
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import os, re, mmap
+
+from .literumilo_check_word import get_checker
+
+BYTE_WORD_PATTERN = re.compile(rb"(?:[a-zA-Z\-]|\xc2\xad|[\xc3-\xc9][\x80-\xbf]|\xca[\x80-\xaf])+")
+
+def iter_words_mmap(filename):
+    """Generator which finds the words of a UTF-8 file, with a memory map.
+    Params:
+        file name
+    Return:
+        (byte offset, word) tuples
+    """
+    if os.path.getsize(filename) == 0: return   # An empty file cannot be mapped.
+    with open(filename, "rb") as fin:
+        with mmap.mmap(fin.fileno(), 0, access = mmap.ACCESS_READ) as buffer:
+            for match in BYTE_WORD_PATTERN.finditer(buffer):
+                yield match.start(), match.group().decode("utf-8")
+
+def iter_file_mmap(filename, mode = True, checker = None):
+    """Generator which analyzes the words of a UTF-8 file, with a memory map.
+    Params:
+        file name
+        mode - True = every word (morphological analyzer),
+               False = misspelled words only (spell checker)
+        checker - Checker (None = default checker)
+    Return:
+        (byte offset, word, AnalysisResult) tuples, in the order of the file
+    """
+    check_word = get_checker(checker).check_word
+    for offset, word in iter_words_mmap(filename):
+        result = check_word(word)
+        if mode or not result.valid:
+            yield offset, word, result
+
+def analyze_file_mmap(filename, mode, checker = None):
+    """Analyzes a UTF-8 file with a memory map. (See iter_file_mmap().)
+    Params:
+        file name
+        mode - True = morphological analyzer, False = spell checker
+        checker - Checker (None = default checker)
+    Return:
+        mode True: list of (byte offset, word divided into morphemes, valid)
+        mode False: list of (byte offset, misspelled word)
+    """
+    if mode:
+        return [(offset, result.word, result.valid)
+                for offset, word, result in iter_file_mmap(filename, True, checker)]
+    return [(offset, word) for offset, word, result in iter_file_mmap(filename, False, checker)]
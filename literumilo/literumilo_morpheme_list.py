@@ -4,19 +4,30 @@
 # This file is a list of morphemes for the Esperanto spell checker.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-05-17
+# Last edit date: 2026-10-19
+
+import copy
+
+from .literumilo_order import longest_first
+from .literumilo_utils import part_boundaries
 
 class MorphemeList:
     """The list of morphemes contains up to 9 dictionary entries,
     an index to the last entry, and the word's ending.
+    It also holds the ordering policy for candidate morphemes, and
+    counts how many candidates were tried and rejected (backtracks).
+    A morpheme list belongs to one analysis, so it is never shared by threads.
     """
 
     MAX_MORPHEMES = 9    # The maximum number of morphemes in a compound word.
 
-    def __init__(self, ending):
+    def __init__(self, ending, order = longest_first):
         self.ending = ending
         self.last_index = 0
         self.morphemes =  [None] * self.MAX_MORPHEMES
+        self.copied = [False] * self.MAX_MORPHEMES   # True if the entry is a private copy.
+        self.order = order
+        self.backtracks = 0
 
     def get_last_index(self):
         """Getter for last index."""
@@ -38,6 +49,17 @@ class MorphemeList:
             morpheme_str += "." + self.morphemes[index].morpheme
         return morpheme_str + "." + self.ending.ending
 
+    def boundaries(self):
+        """This method returns the boundaries between the collected morphemes
+        (and the ending), as offsets into the word. This is equivalent to
+        display_form(), but no string is made.
+        Return:
+            boundaries (tuple of int)
+        """
+        parts = [self.morphemes[index].morpheme for index in range(0, self.last_index + 1)]
+        parts.append(self.ending.ending)
+        return part_boundaries(parts)
+
     def count_separators(self):
         """This method scans the collected morphemes in morpheme_list
         to determine how many separators vowels there are. For example,
@@ -54,14 +76,26 @@ class MorphemeList:
 
     def get(self, index):
         if (index >= self.MAX_MORPHEMES):
-            print("MorphemeList, get(), bad index")
-            sys.exit(0)
+            raise IndexError("MorphemeList, get(), bad index")
         return self.morphemes[index]
 
+    def get_mutable(self, index):
+        """Returns the entry at the given index, for modification. The first
+        time, the entry is copied, because dictionary entries are shared by
+        all analyses (and threads), and must not be changed.
+        """
+        if (index >= self.MAX_MORPHEMES):
+            raise IndexError("MorphemeList, get_mutable(), bad index")
+        entry = self.morphemes[index]
+        if entry is not None and not self.copied[index]:
+            entry = copy.copy(entry)
+            self.morphemes[index] = entry
+            self.copied[index] = True
+        return entry
+
     def put(self, index, entry):
         if (index >= self.MAX_MORPHEMES):
-            print("MorphemeList, put(), bad index")
-            sys.exit(0)
+            raise IndexError("MorphemeList, put(), bad index")
         self.last_index = index
         self.morphemes[index] = entry
-
+        self.copied[index] = False
@@ -0,0 +1,142 @@
+#! -*- coding: utf-8
+# literumilo_negative_cache.py
+#
+# The most expensive result of check_word() is a failure, because the search
+# for a valid division of a compound word must try every possibility. In a
+# large collection of documents, the same foreign names and typos appear
+# again and again. This module defines a negative cache, which remembers
+# words which are known to be invalid.
+#
+# The cache does not keep the words. It keeps a fingerprint of each word:
+# the first bytes of its hash (blake2b), as an integer. The size of the
+# fingerprints is chosen from the capacity and the false-positive rate
+# (error_rate): the chance that a word which is not in the cache matches a
+# fingerprint is at most capacity / 2 ** bits. A false positive would make
+# a valid compound word invalid, so the default rate is very low (10^-12,
+# 8 bytes per fingerprint for 100,000 words).
+#
+# Memory is bounded by two generations. New fingerprints are added to the
+# current generation. When it is full (half of the capacity), it becomes
+# the old generation, and the previous old generation is dropped. A word
+# which is found in the old generation is moved to the current one, so
+# frequent words stay in the cache, and only words which have not been
+# seen for a while are removed.
+#
+# The cache can be saved to a file and loaded again, so it can be shared by
+# several runs. It can be shared by threads. Changes are made under a lock.
+# Lookups take no lock; at worst, a lookup during a change misses a word.
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import json, math, hashlib, threading
+
+CAPACITY = 100000
+ERROR_RATE = 1e-12
+
+def fingerprint_size(capacity, error_rate):
+    """Return: the number of bytes of a fingerprint, for the given
+    capacity and false-positive rate"""
+    bits = math.log2(capacity / error_rate)
+    return max(4, min(16, int(math.ceil(bits / 8))))
+
+class NegativeCache:
+    """A cache of words which are known to be invalid. It holds at most
+    'capacity' fingerprints. See the description above.
+    """
+
+    def __init__(self, capacity = CAPACITY, error_rate = ERROR_RATE):
+        """
+        Params:
+            capacity - maximum number of invalid words
+            error_rate - maximum false-positive rate, eg. 1e-12
+        """
+        if capacity < 2 or not (0.0 < error_rate < 1.0):
+            raise ValueError("NegativeCache, bad capacity or error rate")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.digest_size = fingerprint_size(capacity, error_rate)
+        self.current = set()    # fingerprints of the current generation
+        self.old = set()        # fingerprints of the old generation
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def fingerprint(self, word):
+        """Return: the fingerprint of a word (int)"""
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size = self.digest_size).digest()
+        return int.from_bytes(digest, "little")
+
+    def add_fingerprint(self, fingerprint):
+        """Adds a fingerprint to the current generation. (Takes the lock.)"""
+        with self.lock:
+            if len(self.current) >= self.capacity // 2:
+                self.old = self.current
+                self.current = set()
+            self.current.add(fingerprint)
+
+    def add(self, word):
+        """Adds an invalid word (lower case) to the cache."""
+        fingerprint = self.fingerprint(word)
+        if fingerprint in self.current: return
+        self.add_fingerprint(fingerprint)
+
+    def __contains__(self, word):
+        fingerprint = self.fingerprint(word)
+        if fingerprint in self.current: return True
+        if fingerprint in self.old:
+            self.add_fingerprint(fingerprint)    # It is still used.
+            return True
+        return False
+
+    def __len__(self):
+        return len(self.current | self.old)
+
+    def clear(self):
+        """Removes all words."""
+        with self.lock:
+            self.current = set()
+            self.old = set()
+
+    def save(self, filename):
+        """Saves the cache to a file (JSON), so that it can be shared.
+        Params:
+            file name
+        """
+        with self.lock:
+            old = sorted(self.old - self.current)
+            current = sorted(self.current)
+        data = {"capacity": self.capacity, "error_rate": self.error_rate,
+                "digest_size": self.digest_size, "old": old, "current": current}
+        with open(filename, "w", encoding = "utf-8") as fout:
+            json.dump(data, fout)
+
+    @classmethod
+    def load(cls, filename):
+        """Loads a cache which was saved by save().
+        Params:
+            file name
+        Return:
+            NegativeCache
+        """
+        with open(filename, "r", encoding = "utf-8") as fin:
+            data = json.load(fin)
+        try:
+            cache = cls(data["capacity"], data["error_rate"])
+            if cache.digest_size != data["digest_size"]:
+                raise ValueError("NegativeCache, bad file: {}".format(filename))
+            cache.old = set(data["old"])
+            cache.current = set(data["current"])
+        except (KeyError, TypeError):
+            raise ValueError("NegativeCache, bad file: {}".format(filename))
+        return cache
+
+# end of class NegativeCache
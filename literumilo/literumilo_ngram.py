@@ -0,0 +1,120 @@
+#! -*- coding: utf-8
+# literumilo_ngram.py
+#
+# This module makes a table of the character bigrams and trigrams which can
+# occur in a compound word. A compound word is a sequence of morphemes from
+# the dictionary (and perhaps a separator vowel), followed by a grammatical
+# ending. Before find_morpheme() divides a word, the word is checked against
+# this table. If the word contains a bigram or trigram which is not in the
+# table, it cannot be divided, so it is rejected immediately.
+#
+# The table is built from all morphemes which can join with others. N-grams
+# inside a morpheme are collected, as well as n-grams which cross a boundary
+# between morphemes, or between the last morpheme and the ending. Therefore,
+# no valid word is ever rejected.
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+from .literumilo_entry import Synthesis
+from .literumilo_ending import ENDINGS
+
+SEPARATORS = ["o", "a", "e"]   # See EspDictEntry.new_separator().
+
+def add_ngrams(table, s):
+    """Adds all bigrams and trigrams of the string s to the table."""
+    length = len(s)
+    for i in range(0, length - 1):
+        table.add(s[i:i + 2])
+        if i < length - 2:
+            table.add(s[i:i + 3])
+
+class NgramTable(set):
+    """A set of the bigrams and trigrams which can occur in a compound word.
+    The table also keeps the heads and tails of the units, so that more
+    morphemes can be added later, in time proportional to their number.
+    """
+
+    def __init__(self, ngrams = ()):
+        super().__init__(ngrams)
+        self.heads = set()   # The first one or two letters of a unit or ending.
+        self.tails = set()   # The last one or two letters of a unit.
+
+    def add_units(self, units):
+        """Adds morphemes (or separators) which can join with others.
+        Params:
+            units - list of strings, eg. ['hund', 'et']
+        """
+        new_heads = set()
+        new_tails = set()
+        for unit in units:
+            add_ngrams(self, unit)
+            new_heads.add(unit[:2])
+            new_heads.add(unit[:1])
+            new_tails.add(unit[-2:])
+            new_tails.add(unit[-1:])
+        self.join(new_heads, new_tails)
+
+    def join(self, new_heads, new_tails):
+        """Adds the n-grams which cross a boundary between a tail and a head,
+        for the new heads and tails.
+        """
+        # A separator has only one letter, so the last two letters of a unit
+        # might be the last letter of a morpheme and a separator, and vice versa.
+        for separator in SEPARATORS:
+            for tail in list(new_tails):
+                new_tails.add(tail[-1:] + separator)
+            for head in list(new_heads):
+                new_heads.add(separator + head[:1])
+        new_heads -= self.heads
+        new_tails -= self.tails
+        old_tails = list(self.tails)
+        self.heads |= new_heads
+        self.tails |= new_tails
+        # N-grams which cross a boundary.
+        for tail in new_tails:
+            for head in self.heads:
+                add_ngrams(self, tail + head)
+        for tail in old_tails:
+            for head in new_heads:
+                add_ngrams(self, tail + head)
+
+# end of class NgramTable
+
+
+def make_ngram_table(dictionary):
+    """Makes a table of the bigrams and trigrams which can occur in a
+    compound word (with its ending).
+    Params:
+        dictionary - a map of word data, indexed by morpheme
+    Return:
+        NgramTable (a set of n-grams)
+    """
+    table = NgramTable()
+    for ending in ENDINGS:
+        add_ngrams(table, ending.ending)
+        table.heads.add(ending.ending[:2])
+        table.heads.add(ending.ending[:1])
+    units = [key for key, entry in dictionary.items() if entry.synthesis != Synthesis.No]
+    units.extend(SEPARATORS)
+    table.add_units(units)
+    return table
+# make_ngram_table
+
+
+def passes_ngram_filter(word, table):
+    """Checks whether all the bigrams and trigrams of a word are in the
+    n-gram table. This takes O(length of word) time.
+    Params:
+        word (lower case, without hyphens)
+        table of n-grams
+    Return:
+        True if the word might be valid, False if it cannot be valid
+    """
+    length = len(word)
+    for i in range(0, length - 2):
+        if word[i:i + 3] not in table: return False
+    if length == 2 and word not in table: return False
+    return True
+# passes_ngram_filter
@@ -0,0 +1,88 @@
+#! -*- coding: utf-8
+# literumilo_order.py
+#
+# This module defines the order in which find_morpheme() tries candidate
+# morphemes when it divides a compound word. An ordering policy is a function
+# which takes an iterable of candidates, that is, (size, entry) tuples, and
+# returns them in the order they should be tried.
+#
+# The candidates are generated from the longest possible morpheme to the
+# shortest. The default policy, longest_first(), leaves them in that order,
+# so the analysis is exactly the same as the original algorithm.
+#
+# The other policies rank candidates by a cost, for example by the rarity
+# of the morpheme (0 = very common, 4 = rare). Because the search is
+# exhaustive over the same candidates, a word is valid under any policy
+# if and only if it is valid under longest_first(). However, when a word
+# can be divided in more than one way, the first valid division found
+# might be different.
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+
+def longest_first(candidates):
+    """This ordering policy tries the longest morpheme first.
+    It returns the candidates unchanged (lazily), so the results are
+    identical to the original search.
+    Params:
+        candidates - iterable of (size, entry) tuples, longest first
+    Return:
+        candidates in order
+    """
+    return candidates
+# longest_first
+
+
+class CostOrder:
+    """An ordering policy made from a cost function. Candidates with a lower
+    cost are tried first. Candidates of equal cost are tried longest first,
+    because the sort is stable. (A class, rather than a closure, so that a
+    Checker which uses it can be pickled.)
+    """
+
+    def __init__(self, cost):
+        """
+        Params:
+            cost - a function which takes (size, entry) and returns a number
+        """
+        self.cost = cost
+
+    def __call__(self, candidates):
+        cost = self.cost
+        return sorted(candidates, key=lambda candidate: cost(*candidate))
+
+# end of class CostOrder
+
+
+def cost_order(cost):
+    """This function creates an ordering policy from a cost function.
+    See CostOrder.
+    Params:
+        cost - a function which takes (size, entry) and returns a number
+    Return:
+        ordering policy
+    """
+    return CostOrder(cost)
+# cost_order
+
+
+def rarity_cost(size, entry):
+    """A cost function based on the rarity column of the dictionary.
+    Common morphemes (rarity 0) are tried before rare ones (rarity 4).
+    Params:
+        size of morpheme
+        dictionary entry
+    Return:
+        cost (int)
+    """
+    return entry.rarity
+# rarity_cost
+
+by_rarity = cost_order(rarity_cost)
+
+ORDERING_POLICIES = {
+    "longest": longest_first,
+    "rarity": by_rarity,
+}
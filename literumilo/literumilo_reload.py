@@ -0,0 +1,133 @@
+#! -*- coding: utf-8
+# literumilo_reload.py
+#
+# This module reloads the Esperanto dictionary when its file changes, so
+# that a long-running program (eg. a server) gets the changes without a
+# restart. A DictionaryReloader polls the file (data/vortaro.tsv, or another
+# path) in a background thread. When the file has changed, the dictionary
+# and the tables derived from it (n-gram table, lexicon) are made in the
+# background, and then given to the Checker in one step (swap_state()).
+# Analyses which have started finish with the old dictionary. The negative
+# cache is cleared, and the version of the dictionary increases.
+#
+# If the Checker has overlays (see Checker.add_overlay()), they are put on
+# the new dictionary before the tables are made, so the lexicon agrees with
+# the overlays. Overlays cannot be added or removed during a reload.
+#
+# Example:
+#
+#     reloader = DictionaryReloader(interval = 10.0)
+#     reloader.start()
+#     ...
+#     print(checker.version, checker.load_time)
+#     reloader.stop()
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import os, sys, time, threading
+
+from .literumilo_load import read_dictionary_file, dictionary_path
+from .literumilo_compact import CompactDictionary
+from .literumilo_lexicon import build_lexicon
+from .literumilo_layers import LayeredDictionary
+from .literumilo_check_word import Checker, DictionaryState, get_checker
+
+RELOAD_INTERVAL = 5.0   # seconds between checks of the dictionary file
+
+def file_signature(path):
+    """Return: (modification time, size) of a file, or None if it does not exist"""
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return (status.st_mtime_ns, status.st_size)
+
+
+class DictionaryReloader:
+    """Reloads the dictionary of a Checker when the dictionary file changes."""
+
+    def __init__(self, checker = None, path = None, interval = RELOAD_INTERVAL, compact = False):
+        """
+        Params:
+            checker - Checker (None = default checker)
+            path - dictionary file (None = data/vortaro.tsv)
+            interval - seconds between checks of the file
+            compact - True to load a CompactDictionary
+        """
+        self.checker = get_checker(checker)
+        self.path = dictionary_path() if path is None else path
+        self.interval = interval
+        self.compact = compact
+        # The checker's dictionary is assumed to come from the current file.
+        self.signature = file_signature(self.path)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def make_state(self):
+        """Loads the dictionary file, puts the overlays of the checker on it,
+        and makes the derived tables. If the checker has a lexicon, a new
+        lexicon is built with the same word forms.
+        Return:
+            DictionaryState
+        """
+        load_time = time.time()
+        dictionary = read_dictionary_file(self.path)
+        if self.compact:
+            dictionary = CompactDictionary(dictionary)
+        old_dictionary = self.checker.dictionary
+        if isinstance(old_dictionary, LayeredDictionary):
+            dictionary = old_dictionary.rebase(dictionary)
+        state = DictionaryState(dictionary, load_time = load_time)
+        state.get_ngram_table()
+        state.get_dictionary_index()
+        old_lexicon = self.checker.lexicon
+        if old_lexicon is not None:
+            builder = Checker(dictionary)
+            state.lexicon = build_lexicon(dictionary, builder.check_word, old_lexicon.forms)
+        return state
+
+    def reload(self):
+        """Reloads the dictionary now. Analyses continue during the reload,
+        but overlays cannot be added or removed until it is finished."""
+        signature = file_signature(self.path)
+        with self.checker.update_lock:
+            self.checker.swap_state(self.make_state())
+        self.signature = signature
+
+    def check(self):
+        """Reloads the dictionary if the file has changed.
+        Return:
+            True if the dictionary was reloaded
+        """
+        signature = file_signature(self.path)
+        if signature is None or signature == self.signature:
+            return False
+        self.reload()
+        return True
+
+    def run(self):
+        """Checks the file every 'interval' seconds, until stop() is called."""
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as error:
+                # Keep the old dictionary. Try again at the next check.
+                print("Could not reload {}: {}".format(self.path, error), file = sys.stderr)
+
+    def start(self):
+        """Starts checking the file in a background thread."""
+        if self.thread is not None: return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target = self.run, name = "literumilo-reload", daemon = True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the background thread."""
+        if self.thread is None: return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+# end of class DictionaryReloader
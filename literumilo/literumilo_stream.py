@@ -0,0 +1,210 @@
+#! -*- coding: utf-8
+# literumilo_stream.py
+#
+# This module analyzes text streams (files, or standard input) chunk by
+# chunk, and writes the results as soon as each chunk has been analyzed.
+# It is used by the command line program (see main() in literumilo.py).
+#
+# There are two output formats:
+#
+#   text - the analyzed text (morpheme mode), or the misspelled words,
+#          each word once (spell checking mode)
+#   json - one JSON record per line, for example:
+#          {"file": "a.txt", "offset": 25, "token": "hundoj",
+#           "segmentation": "hund.o.j", "valid": true}
+#          In morpheme mode, there is a record for every word. In spell
+#          checking mode, there are records only for misspelled words.
+#          The offset is the position of the word in the text (characters).
+#
+# If the markup of the text is given (html, markdown, latex), markup, code,
+# URLs and numbers are skipped (see literumilo_markup.py). A code block or
+# comment can be longer than a chunk, so such a stream is read as one chunk.
+#
+# If a language gate is given (see literumilo_language.py), lines which are
+# not Esperanto are skipped (copied unchanged in morpheme mode). In JSON
+# output, each skipped line has a record, for example:
+#          {"file": "a.txt", "offset": 120, "length": 64, "foreign": true}
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import io, os, json
+
+from .literumilo_utils import WORD_PATTERN
+from .literumilo_check_word import get_checker
+from .literumilo_input import open_text, DEFAULT_ENCODING
+from .literumilo_markup import markup_pattern, find_words, substitute_words, WORD_GROUPS
+from .literumilo_language import LanguageGate
+
+LINES_PER_CHUNK = 1000   # lines of a file which are analyzed together
+STDIN_NAME = "-"         # file name of standard input
+
+def iter_chunks(stream, lines_per_chunk = LINES_PER_CHUNK):
+    """Generator which reads lines from a text stream, and yields chunks of
+    up to lines_per_chunk lines. A chunk is yielded as soon as its lines
+    have been read, so this works for pipes and terminals.
+    Params:
+        stream - text stream
+        lines_per_chunk
+    Return:
+        (offset, chunk) tuples - offset of the chunk in the text, chunk of text
+    """
+    offset = 0
+    lines = []
+    for line in iter(stream.readline, ""):
+        lines.append(line)
+        if len(lines) >= lines_per_chunk:
+            chunk = "".join(lines)
+            yield offset, chunk
+            offset += len(chunk)
+            lines = []
+    if lines:
+        yield offset, "".join(lines)
+
+def make_record(filename, offset, token, result):
+    """Return: a JSON record (str) for one analyzed word"""
+    return json.dumps({"file": filename, "offset": offset, "token": token,
+                       "segmentation": result.word, "valid": result.valid},
+                      ensure_ascii = False)
+
+def make_foreign_record(filename, offset, block):
+    """Return: a JSON record (str) for a line which is not Esperanto"""
+    return json.dumps({"file": filename, "offset": offset, "length": len(block), "foreign": True},
+                      ensure_ascii = False)
+
+def format_chunk(chunk, offset, filename, mode, output_format, seen, checker, prefix = "",
+                 markup = None, language_gate = None):
+    """Analyzes a chunk of text, and formats the output.
+    Params:
+        chunk of text
+        offset of the chunk
+        filename - name for JSON records
+        mode - True = morphological analyzer, False = spell checker
+        output_format - 'text' or 'json'
+        seen - set of misspelled words which have been written (text, spell checking)
+        checker - Checker
+        prefix - for text output of misspelled words, eg. 'file.txt:'
+        markup - format of the text: 'text', 'html', 'markdown', 'latex', or None
+        language_gate - LanguageGate, or None
+    Return:
+        output (str)
+    """
+    if language_gate is not None:
+        outputs = []
+        for block, is_esperanto in language_gate.split(chunk, markup):
+            if is_esperanto:
+                outputs.append(format_chunk(block, offset, filename, mode, output_format,
+                                            seen, checker, prefix, markup))
+            elif output_format == "json":
+                outputs.append(make_foreign_record(filename, offset, block) + "\n")
+            elif mode:
+                outputs.append(block)
+            offset += len(block)
+        return "".join(outputs)
+    if output_format == "json":
+        records = []
+        pattern = WORD_PATTERN if markup is None else markup_pattern(markup)
+        for match in pattern.finditer(chunk):
+            if markup is not None and match.lastgroup not in WORD_GROUPS: continue
+            token = match.group()
+            result = checker.check_word(token)
+            if mode or not result.valid:
+                records.append(make_record(filename, offset + match.start(), token, result))
+                records.append("\n")
+        return "".join(records)
+    if mode:
+        if markup is not None:
+            return substitute_words(chunk, markup, lambda word: checker.check_word(word).word)
+        return WORD_PATTERN.sub(lambda match: checker.check_word(match.group()).word, chunk)
+    lines = []
+    tokens = WORD_PATTERN.findall(chunk) if markup is None else find_words(chunk, markup)
+    for token in tokens:
+        if token not in seen and not checker.is_valid_word(token):
+            seen.add(token)
+            lines.append("{}{}\n".format(prefix, token))
+    return "".join(lines)
+
+def analyze_stream(stream, out, mode, output_format = "text", filename = STDIN_NAME,
+                   prefix = "", checker = None, lines_per_chunk = LINES_PER_CHUNK, markup = None,
+                   language_gate = None):
+    """Analyzes a text stream chunk by chunk. The output of each chunk is
+    written and flushed as soon as the chunk has been analyzed.
+    Params:
+        stream - text stream, eg. sys.stdin
+        out - output stream, eg. sys.stdout
+        mode - True = morphological analyzer, False = spell checker
+        output_format - 'text' or 'json'
+        filename - name for JSON records
+        prefix - for text output of misspelled words, eg. 'file.txt:'
+        checker - Checker (None = default checker)
+        lines_per_chunk - 1 for line-buffered output
+        markup - format of the text (see format_chunk()). The stream is read as one chunk.
+        language_gate - LanguageGate, to skip lines which are not Esperanto
+    """
+    checker = get_checker(checker)
+    seen = set()
+    chunks = iter_chunks(stream, lines_per_chunk) if markup is None else [(0, stream.read())]
+    for offset, chunk in chunks:
+        output = format_chunk(chunk, offset, filename, mode, output_format, seen, checker,
+                              prefix, markup, language_gate)
+        if output:
+            out.write(output)
+            out.flush()
+
+def analyze_path(path, mode, output_format = "text", prefix = "", checker = None,
+                 encoding = DEFAULT_ENCODING, markup = None, language_gate = None):
+    """Analyzes a file, and returns the output as a string. (This is the
+    job of a worker process, when several files are analyzed in parallel.)
+    The file may be compressed. See literumilo_input.py.
+    For a description of parameters see analyze_stream().
+    Return:
+        output (str)
+    """
+    out = io.StringIO()
+    with open_text(path, encoding) as fin:
+        analyze_stream(fin, out, mode, output_format, path, prefix, checker, markup = markup,
+                       language_gate = language_gate)
+    return out.getvalue()
+
+worker_gates = {}   # language gates of a worker process, by settings
+
+def analyze_path_with_gate(path, mode, output_format = "text", prefix = "",
+                           encoding = DEFAULT_ENCODING, markup = None, gate_settings = None):
+    """Analyzes a file, and skips lines which are not Esperanto. (This is
+    the job of a worker process.) Only the settings of the gate are sent to
+    the worker. The gate is made in the worker, once for each setting, and
+    the counts of blocks are returned, so they can be added together.
+    Params:
+        gate_settings - (threshold, min_letters), see LanguageGate.settings()
+        For a description of other parameters see analyze_stream().
+    Return:
+        (output (str), counts of blocks), see LanguageGate.counts()
+    """
+    gate = worker_gates.get(gate_settings)
+    if gate is None:
+        threshold, min_letters = gate_settings
+        gate = LanguageGate(threshold, min_letters = min_letters)
+        worker_gates[gate_settings] = gate
+    gate.reset_counts()
+    output = analyze_path(path, mode, output_format, prefix, None, encoding, markup, gate)
+    return output, gate.counts()
+
+def expand_paths(paths):
+    """Generator which yields the files of a list of paths. Folders are
+    searched recursively, in sorted order. Hidden files and folders
+    (names which begin with a period) are skipped.
+    Params:
+        list of file and folder names
+    Return:
+        file names
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for folder, folders, files in os.walk(path):
+            folders[:] = sorted(name for name in folders if not name.startswith("."))
+            for name in sorted(files):
+                if not name.startswith("."):
+                    yield os.path.join(folder, name)
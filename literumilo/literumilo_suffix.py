@@ -8,9 +8,11 @@
 # on the morphemes which come before it.
 #
 # Note: Some of the functions below may modify the entries in morpheme_list.
+# They get the entry with morpheme_list.get_mutable(), which makes a private
+# copy, so the entries of the dictionary itself are never changed.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-05-02
+# Last edit date: 2026-10-19
 #
 
 from .literumilo_entry import *
@@ -28,7 +30,7 @@ def check_acx(index, morpheme_list):
     """
     # If aĉ is the first element, it's OK. Treat it as an adjective.
     if index == 0:
-        current_entry = morpheme_list.get(index)
+        current_entry = morpheme_list.get_mutable(index)
         if current_entry:
             current_entry.part_of_speech = POS.Adjective
             return True
@@ -46,7 +48,7 @@ def check_acx(index, morpheme_list):
     # If 'kri-as' is intransitive, then 'kri-aĉ-as' is also intransitive.
     # It is necessary to transfer the POS (Verb, Substantive),
     # transitivity (etc.) from the previous entry to the aĉ entry.
-    current_entry = morpheme_list.get(index)
+    current_entry = morpheme_list.get_mutable(index)
     if current_entry:
         if pos <= POS.Adjective or pos == POS.Participle:
             current_entry.part_of_speech = pos
@@ -75,7 +77,7 @@ def check_ad(index, morpheme_list):
         transitivity = previous_entry.transitivity
     else: return False
 
-    current_entry = morpheme_list.get(index)
+    current_entry = morpheme_list.get_mutable(index)
     if current_entry and (pos <= POS.Verb):
         current_entry.part_of_speech = POS.Verb
         current_entry.transitivity = transitivity
@@ -163,7 +165,7 @@ def check_ec(index, morpheme_list):
         pos = previous_entry.part_of_speech
     else: return False
 
-    current_entry = morpheme_list.get(index)
+    current_entry = morpheme_list.get_mutable(index)
     if current_entry:
         if pos <= POS.SubstantiveVerb or \
             pos == POS.Adjective or \
@@ -193,7 +195,7 @@ def check_eg_et(index, morpheme_list):
         transitivity = previous_entry.transitivity;
     else: return False
 
-    current_entry = morpheme_list.get(index)
+    current_entry = morpheme_list.get_mutable(index)
     if current_entry:
         if  pos <= POS.Adjective:
             current_entry.part_of_speech = pos
@@ -303,7 +305,7 @@ def check_estr(index, morpheme_list):
     """
 
     if index == 0:
-        current_entry = morpheme_list.get(index)
+        current_entry = morpheme_list.get_mutable(index)
         if current_entry:
             current_entry.part_of_speech = POS.Substantive
             current_entry.meaning = Meaning.PERSONO
@@ -315,7 +317,7 @@ def check_estr(index, morpheme_list):
         pos = previous_entry.part_of_speech
     else: return False
 
-    current_entry = morpheme_list.get(index)
+    current_entry = morpheme_list.get_mutable(index)
     if current_entry:
         if  pos <= POS.SubstantiveVerb:
             current_entry.part_of_speech = POS.Substantive
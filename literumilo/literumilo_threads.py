@@ -0,0 +1,100 @@
+#! -*- coding: utf-8
+# literumilo_threads.py
+#
+# This module analyzes words and texts with a pool of threads. All threads
+# share one dictionary in memory, so there is no cost for copying or pickling
+# the dictionary, as there would be with a pool of processes.
+#
+# The analyzer is thread safe:
+#
+#   - The dictionary is never changed by an analysis. The suffix checks
+#     change a copy of an entry (see MorphemeList.get_mutable()).
+#   - Each analysis has its own MorphemeList.
+#   - The negative cache and the statistics are changed under a lock.
+#
+# With the GIL, the threads take turns, so there is little speed-up. With a
+# free-threaded build of CPython (3.13t and later), the threads run on
+# separate cores. To compare, run: python3 -m literumilo.benchmark
+#
+# Author: Klivo Lendon
+# Last edit date: 2026-10-19
+#
+
+import os, sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .literumilo import analyze_chunk, split_into_chunks, format_word_list, WORDS_PER_CHUNK
+from .literumilo_check_word import get_checker
+from .literumilo_input import read_text, DEFAULT_ENCODING
+
+WORDS_PER_BATCH = 1000   # number of words sent to check_words() in one job
+
+def is_free_threaded():
+    """Return: True if the interpreter is running without the GIL"""
+    return hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled()
+
+def run_jobs(function, jobs, executor, max_workers):
+    """Runs function(job) for each job, in the given executor, or in a new
+    thread pool with max_workers threads.
+    Return:
+        list of results, in the order of the jobs
+    """
+    if executor is not None:
+        return list(executor.map(function, jobs))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers = max_workers) as pool:
+        return list(pool.map(function, jobs))
+
+def check_words_threaded(words, executor = None, max_workers = None,
+                         words_per_batch = WORDS_PER_BATCH, checker = None):
+    """Threaded check_words(). The words are divided into batches, and
+    each batch is analyzed by a thread.
+    Params:
+        words - list of words
+        executor - concurrent.futures executor (None = new thread pool)
+        max_workers - number of threads in a new pool (None = number of CPUs)
+        words_per_batch
+        checker - Checker (None = default checker)
+    Return:
+        list of AnalysisResult, one for each word
+    """
+    words = list(words)
+    batches = [words[i:i + words_per_batch] for i in range(0, len(words), words_per_batch)]
+    results = []
+    check_words = get_checker(checker).check_words
+    for batch_results in run_jobs(check_words, batches, executor, max_workers):
+        results.extend(batch_results)
+    return results
+
+def analyze_string_threaded(text, mode, executor = None, max_workers = None,
+                            words_per_chunk = WORDS_PER_CHUNK, checker = None):
+    """Threaded analyze_string(). The result is the same.
+    Params:
+        text
+        mode - True = morphological analyzer, False = spell checker
+        executor - concurrent.futures executor (None = new thread pool)
+        max_workers - number of threads in a new pool (None = number of CPUs)
+        words_per_chunk
+        checker - Checker (None = default checker)
+    Return:
+        analyzed text, or list of misspelled words (str)
+    """
+    chunks = list(split_into_chunks(text, words_per_chunk))
+    results = run_jobs(lambda chunk: analyze_chunk(chunk, mode, checker), chunks, executor, max_workers)
+    if mode: return "".join(results)
+    bad_words = set()
+    for words in results:
+        bad_words |= words
+    return format_word_list(bad_words)
+
+def analyze_file_threaded(filename, mode, executor = None, max_workers = None,
+                          words_per_chunk = WORDS_PER_CHUNK, checker = None,
+                          encoding = DEFAULT_ENCODING):
+    """Threaded analyze_file(). The file may be compressed.
+    For a description of parameters see analyze_string_threaded().
+    Return:
+        analyzed text, or list of misspelled words (str)
+    """
+    text = read_text(filename, encoding)
+    return analyze_string_threaded(text, mode, executor, max_workers, words_per_chunk, checker)
@@ -4,9 +4,11 @@
 # This module contains a few utility functions for the Esperanto spell checker 'literumilo'.
 #
 # Author: Klivo Lendon
-# Last edit date: 2020-11-11
+# Last edit date: 2026-10-19
 #
 
+import re
+
 def accepts_hat(letter):
     """This function tests whether the given letter can accept an accent (hat).
     For example, 'c' can take an accent (ĉ).
@@ -47,6 +49,10 @@ def accent_letter(letter):
     if letter == 'U': return 'Ŭ'
     return '?'
 
+# A regular expression which matches a run of word characters.
+# The characters are the same as those accepted by is_word_char().
+WORD_PATTERN = re.compile("[a-zA-Z\u00c0-\u02af\u00ad-]+")
+
 def is_word_char(ch):
     """This function returns True for word characters such as 'abc',
     and False for others, such as punctuation and white space.
@@ -126,3 +132,47 @@ def restore_capitals(original, analyzed):
             index += 1
     return result
 # end of restore_capitals
+
+
+def part_boundaries(parts):
+    """Finds the boundaries between morphemes, as offsets into the word
+    without periods. A part may contain periods itself. (Compound entries
+    in the dictionary, such as 'abat.ej', do.) For example, the parts
+    'abat.ej' and 'o' give the boundaries (4, 6), for 'abat.ej.o'.
+    Params:
+        parts - sequence of morphemes (and the ending)
+    Return:
+        boundaries (tuple of int)
+    """
+    boundaries = []
+    position = 0
+    for part in parts:
+        if "." in part:
+            for piece in part.split("."):
+                position += len(piece)
+                boundaries.append(position)
+        else:
+            position += len(part)
+            boundaries.append(position)
+    if boundaries: boundaries.pop()   # No boundary at the end.
+    return tuple(boundaries)
+# end of part_boundaries
+
+def insert_periods(word, boundaries):
+    """Inserts periods into a word at the given boundaries.
+    For example, 'abatejo' and (4, 6) give 'abat.ej.o'.
+    Params:
+         word without periods
+         boundaries (offsets)
+    Return:
+         word divided into morphemes
+    """
+    if not boundaries: return word
+    parts = []
+    start = 0
+    for boundary in boundaries:
+        parts.append(word[start:boundary])
+        start = boundary
+    parts.append(word[start:])
+    return ".".join(parts)
+# end of insert_periods
@@ -1,19 +1,45 @@
 #! -*- coding: utf-8
 # test_literumilo.py
 #
-# This module runs a few unit tests for literumilo. From folder 'literumilo' run:
+# This module runs a few unit tests for literumilo. From the folder above
+# 'literumilo' run:
 #
-# python3 -m unittest tests/test_literumilo.py 
+# python3 -m unittest literumilo.tests.test_literumilo
 #
 # Author: Klivo Lendon
 # Last edit date: 2020-05-10
 #
 
-import unittest, os
+import unittest, os, io, json, tempfile, asyncio, pickle, gzip, bz2, lzma
 
-from literumilo import analyze_file
-from literumilo_check_word import check_word
-from literumilo_utils import x_to_accent
+from literumilo import analyze_file, analyze_string
+from literumilo.literumilo_check_word import Checker, check_word, check_words, is_valid_word
+from literumilo.literumilo_utils import x_to_accent, WORD_PATTERN
+from literumilo import literumilo_check_word
+from literumilo.literumilo_order import longest_first, by_rarity
+from literumilo.literumilo_ngram import passes_ngram_filter
+from literumilo.literumilo_negative_cache import NegativeCache
+from literumilo.literumilo_lexicon import build_lexicon, load_lexicon
+from literumilo.literumilo_compact import CompactDictionary
+from literumilo.literumilo_load import read_dictionary_file, make_dictionary
+from literumilo.literumilo_reload import DictionaryReloader
+from literumilo.literumilo_stream import analyze_stream, analyze_path_with_gate, expand_paths
+from literumilo.literumilo_input import open_text, PrefetchReader
+from literumilo.literumilo_mmap import analyze_file_mmap
+from literumilo.literumilo_aggregate import TopCounter, ExactCounter, count_bad_words
+from literumilo.literumilo_checkpoint import analyze_corpus, merge_counts, read_checkpoint
+from literumilo.literumilo_lattice import make_lattice, n_best
+from literumilo.literumilo_entry import POS
+from literumilo.literumilo_index import IndexAnalyzer, ROOTS, MORPHEMES, AFFIXES
+from literumilo import literumilo_columns
+from literumilo.literumilo_columns import analyze_column
+from literumilo.literumilo_block_cache import BlockCache, split_into_blocks
+from literumilo.literumilo_markup import find_words
+from literumilo.literumilo_language import LanguageGate
+from literumilo.literumilo_entry import Meaning, Synthesis, PERSON_MEANINGS, is_person
+from literumilo.literumilo_async import check_word_async, analyze_string_async
+from literumilo.literumilo_threads import check_words_threaded, analyze_string_threaded
+from literumilo.literumilo_complete import Completer, complete
 
 FILENAME = "test.txt"
 
@@ -48,3 +74,667 @@ class TestLiterumilo(unittest.TestCase):
 
     # end of test_check_word()
 
+    def test_search_order(self):
+
+        words = ['miskomprenitaj', 'malsanulejo', 'ĉirkaŭiris', 'kuraciisto', 'vortto']
+        expected = [check_word(w).valid for w in words]
+        literumilo_check_word.set_search_order(by_rarity)
+        try:
+            self.assertEqual([check_word(w).valid for w in words], expected)
+        finally:
+            literumilo_check_word.set_search_order(longest_first)
+        self.assertEqual(check_word('miskomprenitaj').word, 'mis.kompren.it.aj')
+
+
+    def test_ngram_filter(self):
+
+        table = literumilo_check_word.get_ngram_table()
+        for word in ['miskomprenitaj', 'fingromontri', 'ĝustatempe', 'malsanulejo']:
+            self.assertTrue(passes_ngram_filter(word, table))
+        self.assertFalse(passes_ngram_filter('qwertyo', table))
+
+        count = literumilo_check_word.get_statistics()["ngram_rejections"]
+        result = check_word('qwertyo')
+        self.assertEqual(result.valid, False)
+        self.assertEqual(result.word, 'qwertyo')
+        self.assertEqual(literumilo_check_word.get_statistics()["ngram_rejections"], count + 1)
+
+    def test_negative_cache(self):
+
+        cache = NegativeCache(capacity = 100)
+        literumilo_check_word.set_negative_cache(cache)
+        try:
+            self.assertEqual(check_word('kuraciisto').valid, False)
+            self.assertTrue('kuraciisto' in cache)
+            count = literumilo_check_word.get_statistics()["negative_cache_hits"]
+            self.assertEqual(check_word('Kuraciisto').word, 'Kuraciisto')
+            self.assertEqual(literumilo_check_word.get_statistics()["negative_cache_hits"], count + 1)
+            self.assertEqual(check_word('miskomprenitaj').valid, True)
+            self.assertFalse('miskomprenitaj' in cache)
+        finally:
+            literumilo_check_word.set_negative_cache(None)
+
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'cache.json')
+            cache.save(filename)
+            loaded = NegativeCache.load(filename)
+            self.assertTrue('kuraciisto' in loaded)
+            self.assertEqual(len(loaded), len(cache))
+
+        small = NegativeCache(capacity = 2)
+        for word in ('abcx', 'abcy', 'abcz'):
+            small.add(word)
+        self.assertTrue(len(small) <= 2 and 'abcz' in small)
+        # Words which are used stay in the cache. The others are removed.
+        small = NegativeCache(capacity = 4)
+        for word in ('abca', 'abcb', 'abcc'):
+            small.add(word)
+        self.assertTrue('abca' in small)
+        small.add('abcd')
+        self.assertEqual(['abca' in small, 'abcb' in small, 'abcd' in small], [True, False, True])
+        self.assertEqual(NegativeCache().digest_size, 8)
+
+    def test_lexicon(self):
+
+        dictionary = literumilo_check_word.esperanto_dictionary
+        small_dictionary = {key: dictionary[key] for key in ['hund', 'ne', 'kompren']}
+        lexicon = build_lexicon(small_dictionary, check_word, ['miskomprenitaj'])
+        self.assertEqual(lexicon.get('hundojn'), 'hund.ojn')
+        self.assertEqual(lexicon.get('ne'), 'ne')
+        self.assertEqual(lexicon.get('miskomprenitaj'), 'mis.kompren.it.aj')
+        self.assertEqual(lexicon.get('katoj'), None)
+
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'lexicon.tsv')
+            lexicon.save(filename)
+            lexicon = load_lexicon(filename)
+
+        literumilo_check_word.set_lexicon(lexicon)
+        try:
+            count = literumilo_check_word.get_statistics()["lexicon_hits"]
+            self.assertEqual(check_word('Miskomprenitaj').word, 'Mis.kompren.it.aj')
+            self.assertEqual(check_word('katoj').word, 'kat.oj')
+            self.assertEqual(literumilo_check_word.get_statistics()["lexicon_hits"], count + 1)
+        finally:
+            literumilo_check_word.set_lexicon(None)
+
+    def test_compact_dictionary(self):
+
+        dictionary = literumilo_check_word.esperanto_dictionary
+        compact = CompactDictionary(dictionary)
+        self.assertEqual(len(compact), len(dictionary))
+        for key in ['hund', 'kompren', 'mis', 'it', 'abatej']:
+            self.assertEqual(compact.get(key).__dict__, dictionary[key].__dict__)
+        self.assertEqual(compact.get('hundo'), None)
+        self.assertFalse('xyz' in compact)
+        # Keys with the same CRC-32 (ucecjar, eppjlub) must not prevent the perfect hash.
+        colliding = dict(dictionary)
+        colliding['ucecjar'] = dictionary['hund']
+        colliding['eppjlub'] = dictionary['kat']
+        compact_colliding = CompactDictionary(colliding)
+        self.assertEqual(len(compact_colliding), len(colliding))
+        self.assertEqual(compact_colliding['ucecjar'].morpheme, 'hund')
+        self.assertEqual(compact_colliding['eppjlub'].morpheme, 'kat')
+
+        literumilo_check_word.set_dictionary(compact)
+        try:
+            self.assertEqual(check_word('miskomprenitaj').word, 'mis.kompren.it.aj')
+            self.assertEqual(check_word('kuraciisto').valid, False)
+        finally:
+            literumilo_check_word.set_dictionary(dictionary)
+
+    def test_check_words(self):
+
+        words = ['Lin', 'forgesitaj', 'ne', 'n-rojn', 'kuraciisto', 'hundo', 'forgesitaj',
+                 'a', 'Vin', 'mis-komprenita', 'ĉiutage', 'xyz', 'hundn']
+        results = check_words(words)
+        self.assertEqual(len(results), len(words))
+        for word, result in zip(words, results):
+            expected = check_word(word)
+            self.assertEqual((result.word, result.valid), (expected.word, expected.valid))
+        self.assertTrue(results[1] is results[6])
+
+    def test_valid_only(self):
+
+        self.assertTrue(is_valid_word('Miskomprenitaj'))
+        self.assertTrue(is_valid_word('lin'))
+        self.assertFalse(is_valid_word('kuraciisto'))
+
+        result = check_word('RIĈULO')
+        self.assertEqual(result.boundaries, (3, 5))
+        self.assertEqual(result.word, 'RIĈ.UL.O')
+        self.assertEqual(check_word('abatejo').word, 'abat.ej.o')
+
+    def test_async(self):
+
+        text = "Birdoj (Aves) estas klaso de vertebruloj kun ĉirkaŭ 9 ĝis 10 mil vivantaj specioj."
+        result = asyncio.run(analyze_string_async(text, True, words_per_chunk = 3))
+        self.assertEqual(result, analyze_string(text, True))
+        result = asyncio.run(analyze_string_async(text, False, words_per_chunk = 3))
+        self.assertEqual(result, 'Aves\n')
+        result = asyncio.run(check_word_async('miskomprenitaj'))
+        self.assertEqual(result.word, 'mis.kompren.it.aj')
+
+    def test_threads(self):
+
+        entry = literumilo_check_word.esperanto_dictionary['kompren']
+        before = vars(entry).copy()
+        words = ['miskomprenitaj', 'forgesitaj', 'kuraciisto', 'Lin', 'ĉiutage', 'xyz'] * 50
+        results = check_words_threaded(words, max_workers = 4, words_per_batch = 7)
+        for word, result in zip(words, results):
+            expected = check_word(word)
+            self.assertEqual((result.word, result.valid), (expected.word, expected.valid))
+        self.assertEqual(vars(entry), before)   # The dictionary is not changed.
+        text = "Birdoj (Aves) estas klaso de vertebruloj kun ĉirkaŭ 9 ĝis 10 mil vivantaj specioj."
+        result = analyze_string_threaded(text, True, max_workers = 3, words_per_chunk = 2)
+        self.assertEqual(result, analyze_string(text, True))
+
+    def test_checker(self):
+
+        dictionary = dict(literumilo_check_word.esperanto_dictionary)
+        del dictionary['kompren']
+        strict = Checker(dictionary)
+        self.assertFalse(strict.is_valid_word('miskomprenitaj'))
+        self.assertTrue(is_valid_word('miskomprenitaj'))   # The default checker is not changed.
+        self.assertEqual(analyze_string('Li miskomprenis.', False, strict), 'miskomprenis\n')
+        self.assertEqual(analyze_string('Li miskomprenis.', False), '')
+
+        checker = Checker(dictionary, search_order = by_rarity, negative_cache = NegativeCache())
+        checker.check_word('kuraciisto')
+        copy = pickle.loads(pickle.dumps(checker))
+        self.assertEqual(copy.check_word('miskomprenitaj').valid, False)
+        self.assertEqual(copy.check_word('forgesitaj').word, 'forges.it.aj')
+        self.assertTrue('kuraciisto' in copy.negative_cache)
+
+        # A new dictionary turns off the lexicon, which was built from the old one.
+        checker.lexicon = build_lexicon(dictionary, checker.check_word, ['forgesitaj'])
+        checker.set_dictionary(literumilo_check_word.esperanto_dictionary)
+        self.assertEqual(checker.lexicon, None)
+        self.assertTrue(checker.is_valid_word('miskomprenitaj'))
+
+    def test_overlay(self):
+
+        base = literumilo_check_word.esperanto_dictionary
+        checker = Checker(base, negative_cache = NegativeCache())
+        self.assertFalse(checker.is_valid_word('zorgloj'))
+        self.assertFalse(checker.is_valid_word('zorglejo'))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "overlay.tsv")
+            with open(path, "w", encoding = "utf-8") as fout:
+                fout.write("zorgl\tSUBST\tN\tN\tN\tKF\tNLM\t4\tR\n")
+                fout.write("hund\tSUBST\tN\tN\tN\tN\tNLM\t0\tR\n")
+            checker.add_overlay("tenant", read_dictionary_file(path))
+        self.assertEqual(checker.check_word('zorglejo').word, 'zorgl.ej.o')
+        self.assertTrue(checker.is_valid_word('zorgloj'))
+        self.assertFalse(checker.is_valid_word('hundo'))   # replaced by the overlay
+        self.assertTrue(is_valid_word('hundo'))            # The base is not changed.
+        self.assertFalse('zorgl' in base)
+        merged = checker.dictionary.merged
+        checker.remove_overlay("tenant")
+        self.assertTrue('zorgl' in merged)      # replaced, not changed in place
+        self.assertFalse(checker.is_valid_word('zorglejo'))
+        self.assertTrue(checker.is_valid_word('hundo'))
+
+    def test_reload(self):
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "vortaro.tsv")
+            with open(path, "w", encoding = "utf-8") as fout:
+                fout.write("hund\tSUBST\tN\tN\tN\tKF\tNLM\t0\tR\n")
+                fout.write("et\tSUFIKSO\tN\tN\tN\tKF\tS\t0\tR\n")
+            checker = Checker(read_dictionary_file(path), negative_cache = NegativeCache())
+            overlay = read_dictionary_file(path)
+            checker.add_overlay("tenant", {"kat": overlay["hund"]})
+            reloader = DictionaryReloader(checker, path)
+            self.assertFalse(reloader.check())
+            self.assertFalse(checker.is_valid_word('zorgloj'))
+            self.assertEqual(checker.version, 1)
+            with open(path, "a", encoding = "utf-8") as fout:
+                fout.write("zorgl\tSUBST\tN\tN\tN\tKF\tNLM\t4\tR\n")
+            self.assertTrue(reloader.check())
+        self.assertEqual(checker.version, 2)
+        self.assertTrue(checker.is_valid_word('zorgloj'))
+        self.assertTrue(checker.is_valid_word('katoj'))   # The overlay is kept.
+        self.assertEqual(len(checker.negative_cache), 0)
+
+        # The new lexicon is built with the overlays.
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "vortaro.tsv")
+            with open(path, "w", encoding = "utf-8") as fout:
+                fout.write("hund\tSUBST\tN\tN\tN\tKF\tNLM\t0\tR\n")
+            checker = Checker(read_dictionary_file(path))
+            checker.add_overlay("tenant", make_dictionary(["hund\tSUBST\tN\tN\tN\tN\tNLM\t0\tR"]))
+            checker.lexicon = build_lexicon(checker.dictionary, checker.check_word)
+            self.assertFalse(checker.is_valid_word('hundo'))
+            with open(path, "a", encoding = "utf-8") as fout:
+                fout.write("kat\tSUBST\tN\tN\tN\tKF\tNLM\t0\tR\n")
+            DictionaryReloader(checker, path).reload()
+        self.assertTrue(checker.lexicon is not None)
+        self.assertFalse(checker.is_valid_word('hundo'))
+        self.assertTrue(checker.is_valid_word('katoj'))
+
+    def test_stream(self):
+
+        text = "Birdoj estas vertebruloj.\nLa xyz dormas, xyz.\n"
+        out = io.StringIO()
+        analyze_stream(io.StringIO(text), out, True, lines_per_chunk = 1)
+        self.assertEqual(out.getvalue(), analyze_string(text, True))
+        out = io.StringIO()
+        analyze_stream(io.StringIO(text), out, False)
+        self.assertEqual(out.getvalue(), 'xyz\n')
+        out = io.StringIO()
+        analyze_stream(io.StringIO(text), out, True, "json", "t.txt", lines_per_chunk = 1)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 7)
+        self.assertEqual(records[4], {"file": "t.txt", "offset": 29, "token": "xyz",
+                                      "segmentation": "xyz", "valid": False})
+        self.assertEqual(records[1]["segmentation"], "est.as")
+
+        with tempfile.TemporaryDirectory() as folder:
+            os.mkdir(os.path.join(folder, "b"))
+            for name in ("b/c.txt", "a.txt", ".hidden"):
+                open(os.path.join(folder, name), "w").close()
+            files = [os.path.relpath(f, folder) for f in expand_paths([folder])]
+        self.assertEqual(files, ["a.txt", os.path.join("b", "c.txt")])
+
+    def test_compressed_input(self):
+
+        text = "Ĉirkaŭ 9 ĝis 10 mil vivantaj specioj de birdoj. Xyz.\n" * 2000
+        expected = analyze_string(text, True)
+        with tempfile.TemporaryDirectory() as folder:
+            for module, extension in ((gzip, ".gz"), (bz2, ".bz2"), (lzma, ".xz")):
+                path = os.path.join(folder, "text.txt" + extension)
+                with module.open(path, "wt", encoding = "utf-8") as fout:
+                    fout.write(text)
+                self.assertEqual(analyze_file(path, True), expected)
+                with open_text(path) as fin:
+                    self.assertEqual(fin.readline(), text.splitlines(True)[0])
+            path = os.path.join(folder, "text16.txt")
+            with open(path, "w", encoding = "utf-16") as fout:
+                fout.write(text)
+            self.assertEqual(analyze_file(path, False, encoding = "utf-16"), "Xyz\n")
+
+        # After an error, later reads raise it again. (They must not wait.)
+        class BadStream(io.RawIOBase):
+            def read(self, size = -1): raise OSError("bad data")
+        reader = PrefetchReader(BadStream())
+        buffer = bytearray(10)
+        for _ in range(2):
+            with self.assertRaises(OSError): reader.readinto(buffer)
+        reader.close()
+
+    def test_mmap(self):
+
+        text = "Ĉirkaŭ 9 ĝis 10 mil vivantaj specioj (Xyz) de birdoj.\n"
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "text.txt")
+            with open(path, "w", encoding = "utf-8") as fout:
+                fout.write(text)
+            analysis = analyze_file_mmap(path, True)
+            bad_words = analyze_file_mmap(path, False)
+            empty = os.path.join(folder, "empty.txt")
+            open(empty, "w").close()
+            self.assertEqual(analyze_file_mmap(empty, True), [])
+        data = text.encode("utf-8")
+        self.assertEqual(bad_words, [(data.index(b"Xyz"), "Xyz")])
+        self.assertEqual([word for offset, word, valid in analysis],
+                         [check_word(word).word for word in WORD_PATTERN.findall(text)])
+        self.assertEqual(analysis[1], (data.index("ĝis".encode("utf-8")), "ĝis", True))
+
+    def test_aggregate(self):
+
+        words = []
+        for i in range(1, 60):
+            words.extend(["xq{}".format(i)] * (600 // i))
+        words = [words[(i * 7919) % len(words)] for i in range(len(words))]
+        exact = {}
+        for word in words:
+            exact[word] = exact.get(word, 0) + 1
+        expected = sorted(exact.items(), key = lambda item: (-item[1], item[0]))
+
+        with ExactCounter(memory_limit = 5) as counter:
+            for word in words:
+                counter.add(word)
+            self.assertTrue(len(counter.runs) > 1)
+            self.assertEqual([(w, c) for w, c, e in counter.report()], expected)
+        self.assertFalse(os.path.exists(counter.folder))
+        counter = ExactCounter(memory_limit = 5)
+        folder = counter.folder
+        for word in words[:20]:
+            counter.add(word)
+        del counter          # not closed; the folder is deleted anyway
+        self.assertFalse(os.path.exists(folder))
+
+        counter = TopCounter(20)
+        for word in words:
+            counter.add(word)
+        report = counter.report(5)
+        self.assertEqual([w for w, c, e in report], [w for w, c in expected[:5]])
+        for word, count, error in counter.report():
+            self.assertTrue(count - error <= exact[word] <= count)
+        # Any word more frequent than total / capacity is kept.
+        for word, count in expected:
+            if count > counter.total / counter.capacity:
+                self.assertTrue(word in counter)
+
+        counter = TopCounter(10)
+        count_bad_words("Hundoj kaj xyz, xyz kaj qqq.", counter)
+        self.assertEqual(counter.report(), [("xyz", 2, 0), ("qqq", 1, 0)])
+        counter = TopCounter(10)
+        count_bad_words("<p class='qqq'>Hundoj kaj xyz, <code>zzz</code></p>", counter, markup = "html")
+        self.assertEqual(counter.report(), [("xyz", 1, 0)])
+        counter = TopCounter(10)
+        gate = LanguageGate()
+        count_bad_words("La registaro anoncis novajn leĝojn por protekti la xyz.\n"
+                        "The government announced new laws to protect the forests.\n", counter,
+                        language_gate = gate)
+        self.assertEqual((counter.report(), gate.foreign_blocks), ([("xyz", 1, 0)], 1))
+
+    def test_checkpoint(self):
+
+        text = "".join("Hundoj kaj katoj {} ludas.\nLa xy-z estas bela.\n".format(
+                       "xq" if i % 3 else "ĉiutage") for i in range(40))
+        dictionary = literumilo_check_word.default_checker.dictionary
+
+        class Interrupted(Exception): pass
+        class InterruptingChecker(Checker):
+            # Stops the analysis after a number of words.
+            def __init__(self, words):
+                super().__init__(dictionary)
+                self.words = words
+            def check_word(self, word):
+                self.words -= 1
+                if self.words < 0: raise Interrupted()
+                return super().check_word(word)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "corpus.txt.gz")
+            with gzip.open(path, "wt", encoding = "utf-8") as fout:
+                fout.write(text)
+            whole = os.path.join(folder, "whole")
+            parts = os.path.join(folder, "parts")
+            shards = analyze_corpus(path, whole, True, shard_bytes = 200)
+            self.assertTrue(shards > 3)
+            with self.assertRaises(Interrupted):
+                analyze_corpus(path, parts, True, InterruptingChecker(70), shard_bytes = 200)
+            checkpoint = read_checkpoint(parts)
+            self.assertTrue(0 < checkpoint["shard"] < shards)
+            self.assertFalse(checkpoint["complete"])
+            self.assertEqual(analyze_corpus(path, parts, True, shard_bytes = 200), shards)
+            self.assertEqual(read_checkpoint(parts)["offset"], len(text.encode("utf-8")))
+            for name in ("whole", "parts"):
+                output = ""
+                for shard in range(shards):
+                    with open(os.path.join(folder, name, "shard-{:05d}.txt".format(shard)),
+                              encoding = "utf-8") as fin:
+                        output += fin.read()
+                self.assertEqual(output, analyze_string(text, True))
+            with merge_counts(parts) as counter:
+                self.assertEqual(counter.report(2), [("xy-z", 40, 0), ("xq", 26, 0)])
+            # The spell checking mode counts the same tokens.
+            analyze_corpus(path, os.path.join(folder, "spell"), False, shard_bytes = 200)
+            with merge_counts(os.path.join(folder, "spell")) as counter:
+                self.assertEqual(counter.report(2), [("xy-z", 40, 0), ("xq", 26, 0)])
+            # A different dictionary cannot continue the analysis.
+            changed = dict(dictionary.items())
+            del changed["hund"]
+            with self.assertRaises(ValueError):
+                analyze_corpus(path, parts, True, Checker(changed), shard_bytes = 200)
+            # The settings of the language gate are part of the checkpoint.
+            with self.assertRaises(ValueError):
+                analyze_corpus(path, parts, True, shard_bytes = 200, language_gate = LanguageGate())
+            gated = os.path.join(folder, "gated")
+            analyze_corpus(path, gated, False, shard_bytes = 200, language_gate = LanguageGate(-100.0))
+            with merge_counts(gated) as counter:
+                self.assertEqual(counter.report(2), [("xy-z", 40, 0), ("xq", 26, 0)])
+            analyze_corpus(path, gated, False, shard_bytes = 200, restart = True,
+                           language_gate = LanguageGate(100.0))
+            with merge_counts(gated) as counter:     # Short lines are not skipped.
+                self.assertEqual(counter.report(), [("xy-z", 40, 0)])
+            # A changed input cannot continue the analysis.
+            with gzip.open(path, "wt", encoding = "utf-8") as fout:
+                fout.write(text + "Kaj plu.\n")
+            with self.assertRaises(ValueError):
+                analyze_corpus(path, parts, True, shard_bytes = 200)
+
+    def test_lattice(self):
+
+        words = ["forgesitaj", "ĉiutage", "malsanulejo", "fingromontri", "Literumilo",
+                 "vin", "ne", "kurado", "hundaĉoj", "xyzabc", "malhundo", "n-roj"]
+        for word in words:
+            result = check_word(word)
+            segmentations = make_lattice(word).segmentations()
+            self.assertEqual(result.valid, len(segmentations) > 0)
+            if result.valid:
+                self.assertTrue(result.word.lower() in [s.word for s in segmentations])
+            costs = [s.cost for s in segmentations]
+            self.assertEqual(costs, sorted(costs))
+
+        # -ad makes a verb of the morpheme before it.
+        segmentation = next(n_best("martelado"))
+        self.assertEqual(segmentation.word, "martel.ad.o")
+        self.assertEqual(segmentation.edges[1].part_of_speech, POS.Verb)
+        self.assertEqual(segmentation.boundaries, (6, 8))
+
+        lattice = make_lattice("fingromontri")
+        self.assertEqual(len(list(lattice.n_best(1))), 1)
+        edges = [(edge.start, edge.end) for edge in lattice.valid_edges()]
+        self.assertEqual(edges, [(0, 5), (5, 6), (6, 11)])
+
+    def test_index(self):
+
+        text = "Ili mis-komprenis\nla fingromontrilon, xyz."
+        analyzer = IndexAnalyzer(ROOTS)
+        tokens = [token.copy() for token in analyzer.tokens(text)]
+        self.assertEqual([(t.term, t.position) for t in tokens],
+                         [("ili", 0), ("kompren", 1), ("la", 2), ("fingr", 3), ("montr", 3),
+                          ("xyz", 4)])
+        for token in tokens:
+            self.assertEqual(text[token.start:token.end].replace("-", "").lower(),
+                             token.term)
+        self.assertEqual(tokens[-1].kind, "word")
+        self.assertEqual(IndexAnalyzer(MORPHEMES).terms("miskomprenitaj"), ["mis", "kompren", "it"])
+        self.assertEqual(IndexAnalyzer(AFFIXES).terms("miskomprenitaj"), ["mis-", "kompren", "-it"])
+
+        # Streams give the same tokens, with offsets in the whole stream.
+        stream_tokens = [token.copy() for token in analyzer.stream_tokens(io.StringIO(text))]
+        self.assertEqual(stream_tokens, tokens)
+        # Reused tokens are the same object.
+        tokens = analyzer.tokens(text)
+        self.assertTrue(next(tokens) is next(tokens))
+
+    def test_columns(self):
+
+        words = ["Miskomprenitaj", "hundo", "ne", "xyzq", "hundo", "fingromontri", "ĉiutage"]
+        batch = analyze_column(iter(words))
+        self.assertEqual(len(batch), len(words))
+        results = [check_word(word) for word in words]
+        self.assertEqual(list(batch.valid), [int(result.valid) for result in results])
+        self.assertEqual(batch.segmentation.to_list(), [result.word for result in results])
+        self.assertEqual(batch.root.to_list(), ["kompren", "hund", "ne", "", "hund", "montr", "tag"])
+        self.assertEqual(batch.ending.to_list(), ["aj", "o", "", "", "o", "i", "e"])
+        self.assertEqual(list(batch.pos), [POS.Adjective, POS.Substantive, POS.Adverb, 0,
+                                           POS.Substantive, POS.Verb, POS.Adverb])
+        self.assertEqual(list(batch.morphemes), [3, 1, 1, 0, 1, 2, 2])
+        self.assertEqual(batch.meaning[1], batch.meaning[4])
+        self.assertEqual(batch.root[-1], "tag")
+        self.assertEqual(list(batch.root.offsets[:3]), [0, 7, 11])
+        self.assertEqual(len(analyze_column([])), 0)
+
+        if literumilo_columns.numpy is None:
+            self.assertRaises(ImportError, batch.to_numpy)
+        else:
+            self.assertEqual(list(batch.to_numpy()["pos"]), list(batch.pos))
+        if literumilo_columns.pyarrow is None:
+            self.assertRaises(ImportError, batch.to_arrow)
+        else:
+            self.assertEqual(batch.to_arrow().column(2).to_pylist(), batch.root.to_list())
+
+    def test_block_cache(self):
+
+        paragraphs = ["Hundoj kaj katoj xyz.\n", "La knabo ludas.\n  \n", "Fingromontri qqq.\n"]
+        text = "\n".join(paragraphs)
+        self.assertEqual("".join(split_into_blocks(text)), text)
+        self.assertEqual(len(list(split_into_blocks(text))), 3)
+
+        checker = Checker(literumilo_check_word.default_checker.dictionary)
+        for mode in (True, False):
+            cache = BlockCache()
+            self.assertEqual(analyze_string(text, mode, checker, cache), analyze_string(text, mode, checker))
+            self.assertEqual((cache.hits, cache.misses), (0, 3))
+            revised = text.replace("ludas", "ludis")
+            self.assertEqual(analyze_string(revised, mode, checker, cache),
+                             analyze_string(revised, mode, checker))
+            self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        # The cache is cleared when the dictionary changes.
+        self.assertTrue(len(cache) > 0)
+        checker.add_overlay("test", {})
+        self.assertEqual(analyze_string(text, False, checker, cache), analyze_string(text, False, checker))
+        self.assertEqual(len(cache), 3)
+
+        # Results are not reused after the search order or the lexicon changes.
+        checker.search_order = by_rarity
+        analyze_string(text, False, checker, cache)
+        self.assertEqual((cache.hits, len(cache)), (2, 6))
+        checker.search_order = longest_first
+        checker.lexicon = build_lexicon(checker.dictionary, checker.check_word, ["ludas"])
+        analyze_string(text, False, checker, cache)
+        self.assertEqual((cache.hits, len(cache)), (2, 3))
+
+    def test_markup(self):
+
+        html = '<p class="xyz">Hundoj &amp; <a href="http://ekz.org/qqq">katoj</a>.</p>\n' \
+               '<!-- zzz -->\n<pre>\nqqq\n\nzzz\n</pre> Skribu al ana@ekz.org je 10h aŭ mp3.'
+        self.assertEqual(find_words(html, "html"), ["Hundoj", "katoj", "Skribu", "al", "je", "aŭ"])
+        divided = analyze_string(html, True, markup = "html")
+        self.assertEqual(divided, html.replace("Hundoj", "Hund.oj").replace("katoj", "kat.oj")
+                                      .replace("Skribu", "Skrib.u"))
+        self.assertEqual(analyze_string(html, False, markup = "html"), "")
+        self.assertEqual(set(analyze_string(html, False).split()), {"amp", "class", "href", "http",
+                         "mp", "org", "pre", "qqq", "xyz", "zzz", "--"})
+
+        markdown = "Vidu [la paĝon](https://ekz.org/qqq) kaj `zzz`.\n\n```\nqqq\n\nzzz\n```\n\nFino.\n"
+        self.assertEqual(find_words(markdown, "markdown"), ["Vidu", "la", "paĝon", "kaj", "Fino"])
+        self.assertEqual(len(list(split_into_blocks(markdown, "markdown"))), 3)
+        cache = BlockCache()
+        self.assertEqual(analyze_string(markdown, True, None, cache, "markdown"),
+                         analyze_string(markdown, True, markup = "markdown"))
+
+        latex = "\\section{Enkonduko} La \\textbf{hundo} $x^2$ \\cite{qqq} kuras. % zzz\n" \
+                "\\begin{verbatim}\nqqq\n\\end{verbatim}\n"
+        self.assertEqual(find_words(latex, "latex"), ["Enkonduko", "La", "hundo", "kuras"])
+        self.assertEqual(find_words("hundo.Kato mp3 www.ekz.org", "text"), ["hundo", "Kato"])
+        self.assertRaises(ValueError, find_words, "", "rtf")
+
+        out = io.StringIO()
+        analyze_stream(io.StringIO(html), out, True, "json", markup = "html")
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record["token"] for record in records], find_words(html, "html"))
+        self.assertEqual(html[records[1]["offset"]:].split("<")[0], "katoj")
+
+    def test_language_gate(self):
+
+        esperanto = ["Mi ŝatas legi librojn pri historio, sed mia fratino preferas fikcion.",
+                     "La registaro anoncis novajn leĝojn por protekti la naturon kaj arbarojn."]
+        foreign = ["The government announced new laws to protect nature and the forests.",
+                   "Der Hund läuft mit seinem Besitzer im Park, und die Kinder spielen am See."]
+        gate = LanguageGate()
+        for line in esperanto: self.assertTrue(gate.is_esperanto(line))
+        for line in foreign: self.assertFalse(gate.is_esperanto(line))
+        self.assertTrue(gate.is_esperanto("Hello world."))     # too short to classify
+        self.assertEqual((gate.esperanto_blocks, gate.foreign_blocks, gate.short_blocks), (2, 2, 1))
+
+        text = "\n".join([esperanto[0], foreign[0], "Ĉi tiu vrto.", foreign[1], esperanto[1]]) + "\n"
+        gate.reset_counts()
+        self.assertEqual(analyze_string(text, False, language_gate = gate), "vrto\n")
+        self.assertEqual((gate.esperanto_blocks, gate.foreign_blocks, gate.short_blocks), (2, 2, 1))
+        divided = analyze_string(text, True, language_gate = gate)
+        self.assertTrue(foreign[0] in divided and "histori.o" in divided)
+        # Results which are reused from a block cache are counted by the gate.
+        cache = BlockCache()
+        for _ in range(2):
+            gate.reset_counts()
+            self.assertEqual(analyze_string(text, True, None, cache, None, gate), divided)
+            self.assertEqual(gate.counts(), (2, 2, 1))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(set(analyze_string(text, False, language_gate = LanguageGate(-10.0)).split()),
+                         set(analyze_string(text, False).split()))
+
+        out = io.StringIO()
+        analyze_stream(io.StringIO(text), out, False, "json", language_gate = gate)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record.get("token") for record in records], [None, "vrto", None])
+        self.assertEqual(text[records[0]["offset"]:][:records[0]["length"]], foreign[0] + "\n")
+
+        # The job of a worker process: only the settings of the gate are sent,
+        # and the counts are returned.
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "text.txt")
+            with open(path, "w", encoding = "utf-8") as fout:
+                fout.write(text)
+            output, counts = analyze_path_with_gate(path, False, gate_settings = gate.settings())
+        self.assertEqual((output, counts), ("vrto\n", (2, 2, 1)))
+        gate.reset_counts()
+        gate.add_counts(counts)
+        gate.add_counts(counts)
+        self.assertEqual(gate.counts(), (4, 4, 2))
+
+    def test_dictionary_index(self):
+
+        checker = Checker(literumilo_check_word.default_checker.dictionary)
+        index = checker.get_dictionary_index()
+        dictionary = checker.dictionary
+        self.assertEqual(len(index), len(dictionary))
+        people = index.query(meaning = PERSON_MEANINGS)
+        self.assertEqual(people, tuple(sorted(key for key, entry in dictionary.items()
+                                              if is_person(entry.meaning))))
+        self.assertTrue("student" in people and "hund" not in people)
+        self.assertEqual(index.morphemes("synthesis", Synthesis.Limited),
+                         tuple(sorted(key for key, entry in dictionary.items()
+                                      if entry.synthesis == Synthesis.Limited)))
+        common_verbs = index.query(part_of_speech = POS.Verb, rarity = lambda rarity: rarity == 0)
+        self.assertTrue(len(common_verbs) > 0)
+        for key, entry in index.entries(part_of_speech = POS.Verb, rarity = lambda rarity: rarity == 0):
+            self.assertEqual((entry.part_of_speech, entry.rarity), (POS.Verb, 0))
+        self.assertEqual(sum(index.values("meaning").values()), len(dictionary))
+        self.assertEqual(index.query(meaning = Meaning.PERSONO, flag = "nothing"), ())
+        self.assertEqual(index.query(), tuple(sorted(dictionary.keys())))
+        self.assertRaises(ValueError, index.query, colour = "red")
+        self.assertTrue(checker.get_dictionary_index() is index)
+
+        # The index is made again when the dictionary changes.
+        checker.add_overlay("test", make_dictionary(["zorgl\tSUBST\tPERSONO\tN\tN\tKF\tNLM\t4\tR"]))
+        self.assertTrue("zorgl" in checker.get_dictionary_index().query(meaning = Meaning.PERSONO))
+        checker.remove_overlay("test")
+        self.assertFalse("zorgl" in checker.get_dictionary_index().query(meaning = Meaning.PERSONO))
+
+    def test_complete(self):
+
+        for prefix in ("hun", "gr", "ma", "kur", "a"):
+            words = complete(prefix, 8)
+            self.assertTrue(0 < len(words) <= 8)
+            self.assertEqual(len(words), len(set(words)))
+            for word in words:
+                self.assertTrue(word.lower().startswith(prefix))
+                self.assertTrue(is_valid_word(word.lower()))
+        self.assertEqual(complete("hun")[0], "hundo")
+        # The dictionary form comes before the other forms.
+        words = complete("hund", 20)
+        self.assertTrue(words.index("hundo") < words.index("hundoj"))
+        self.assertTrue(all(word.startswith("ĉ") for word in complete("cxe")))
+        self.assertTrue({"hundeto", "hundeta", "hundetoj"} <= set(complete("hundet")))
+        self.assertEqual(complete("hundetoj"), ["hundetoj", "hundetojn"])
+        self.assertTrue("malgranda" in complete("malgrand"))
+        self.assertEqual(complete("zzz"), [])
+        self.assertEqual(complete(""), [])
+        self.assertEqual(complete("hun", 0), [])
+
+        # The index is made again when the dictionary changes.
+        checker = Checker(literumilo_check_word.default_checker.dictionary)
+        completer = Completer(checker)
+        self.assertEqual(completer.complete("zorgl"), [])
+        checker.add_overlay("test", make_dictionary(["zorgl\tSUBST\tPERSONO\tN\tN\tKF\tNLM\t4\tR"]))
+        self.assertEqual(completer.complete("zorgl")[0], "zorglo")
+        checker.remove_overlay("test")
+        self.assertEqual(completer.complete("zorgl"), [])
@@ -24,5 +24,5 @@ setuptools.setup(
         "License :: Public Domain",
         "Operating System :: OS Independent",
     ],
-    python_requires = '>=3.5',
+    python_requires = '>=3.7',
 )